@@ -0,0 +1,103 @@
+"""
+Timing, result files and baseline comparison for the benchmark suite.
+"""
+
+from __future__ import annotations
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils.metrics import percentile
+
+
+def measure(fn: Callable[[], Any], min_time: float = 1.0, warmup: int = 3,
+            min_runs: int = 5, max_runs: int = 100_000) -> Dict[str, float]:
+    """Call ``fn`` repeatedly for at least ``min_time`` seconds and summarise the
+    per-call wall time in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_runs and (len(samples) < min_runs or time.perf_counter() < deadline):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return summarize(samples)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    n = len(ordered)
+    mean = sum(ordered) / n if n else 0.0
+    median = percentile(ordered, 50)
+    return {
+        "runs": n,
+        "min_ms": round(ordered[0], 6) if n else 0.0,
+        "median_ms": round(median, 6),
+        "mean_ms": round(mean, 6),
+        "p95_ms": round(percentile(ordered, 95), 6),
+        "max_ms": round(ordered[-1], 6) if n else 0.0,
+        "ops_per_s": round(1000.0 / median, 2) if median > 0 else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    info: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "commit": _git_commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    for module in ("numpy", "cv2", "mediapipe", "PySide6"):
+        mod = sys.modules.get(module)
+        if mod is not None:
+            info[module] = getattr(mod, "__version__", None)
+    return info
+
+
+def save(path: str, results: Dict[str, Dict[str, float]]) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"environment": environment(), "results": results}, fh, indent=2, sort_keys=True)
+
+
+def load(path: str) -> Dict[str, Dict[str, float]]:
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)["results"]
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float, min_delta_ms: float = 0.01) -> List[Dict[str, Any]]:
+    """One row per benchmark present in both runs; ``regression`` is set when the
+    median is slower than the baseline by more than ``tolerance`` (e.g. 0.15 = 15%)
+    and by more than ``min_delta_ms`` in absolute terms (ignores timer noise on
+    microsecond-scale benchmarks)."""
+    rows: List[Dict[str, Any]] = []
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        base = baseline[name]["median_ms"]
+        cur = results[name]["median_ms"]
+        ratio = cur / base if base > 0 else 1.0
+        rows.append({
+            "name": name,
+            "baseline_ms": base,
+            "current_ms": cur,
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1.0 + tolerance and (cur - base) > min_delta_ms,
+        })
+    return rows
@@ -0,0 +1,225 @@
+"""
+Benchmark suite for the core pipeline stages. Runs without a camera.
+
+    python -m benchmarks.run                          # all benchmarks -> bench_results.json
+    python -m benchmarks.run --only detect            # subset (substring match)
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --tolerance 0.15
+
+With ``--baseline`` the exit code is 1 when any benchmark's median is slower
+than the baseline by more than the tolerance.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+# Allow running this file directly (python benchmarks/run.py)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import cv2
+import numpy as np
+
+from benchmarks import harness
+from src.utils.synthetic_hands import SyntheticHandGenerator
+from src.utils.types import HandLandmarks
+
+Case = Tuple[str, Callable[[float], Dict[str, float]]]
+
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+
+def landmark_stream(n_hands: int, frames: int = 600, seed: int = 0) -> List[Tuple[float, List[HandLandmarks]]]:
+    """Deterministic (timestamp, hands) frames from the synthetic generator:
+    1 hand waving, 2 hands making a heart, more hands adding idle/open-palm tracks."""
+    gen = SyntheticHandGenerator(seed=seed)
+    tracks = []
+    if n_hands == 1:
+        tracks = [gen.track("wave")]
+    elif n_hands >= 2:
+        tracks = [gen.track("heart")]
+        for i in range(n_hands - 2):
+            extra = "idle" if i % 2 == 0 else "open_palm"
+            tracks.append(gen.track(extra, center=(150.0 + 250.0 * i, 300.0)))
+    batch = gen.scene(frames, tracks, noise=1.5)
+    return list(batch.iter_frames())
+
+
+def test_image(width: int, height: int) -> np.ndarray:
+    """Fixed test image: the app icon letterboxed into a ``width`` x ``height`` frame."""
+    icon = cv2.imread(os.path.join(ROOT, "assets", "app_icon.png"))
+    frame = np.full((height, width, 3), 40, dtype=np.uint8)
+    if icon is not None:
+        side = min(width, height) * 2 // 3
+        icon = cv2.resize(icon, (side, side))
+        y, x = (height - side) // 2, (width - side) // 2
+        frame[y:y + side, x:x + side] = icon
+    return frame
+
+
+def _cycle(items: List[Any]) -> Iterator[Any]:
+    while True:
+        for item in items:
+            yield item
+
+
+def detect_cases() -> List[Case]:
+    from src.core.gesture_detector import GestureDetector
+
+    cases: List[Case] = []
+    for n in (0, 1, 2, 4):
+        def bench(min_time: float, n: int = n) -> Dict[str, float]:
+            detector = GestureDetector()
+            frames = _cycle(landmark_stream(n))
+
+            def step() -> None:
+                now, hands = next(frames)
+                detector.detect(hands, now=now)
+            return harness.measure(step, min_time)
+        cases.append((f"detect.hands{n}", bench))
+    return cases
+
+
+def tracker_cases() -> List[Case]:
+    cases: List[Case] = []
+    state: Dict[str, Any] = {}
+
+    def tracker() -> Any:
+        if "tracker" not in state:
+            from src.core.hand_tracker import HandTracker
+            state["tracker"] = HandTracker()
+        return state["tracker"]
+
+    for w, h in RESOLUTIONS:
+        def bench_process(min_time: float, w: int = w, h: int = h) -> Dict[str, float]:
+            frame = test_image(w, h)
+            t = tracker()
+            return harness.measure(lambda: t.process(frame), min_time)
+        cases.append((f"tracker.process.{w}x{h}", bench_process))
+
+    for n in (1, 2):
+        def bench_draw(min_time: float, n: int = n) -> Dict[str, float]:
+            frame = test_image(1280, 720)
+            hands = landmark_stream(n, frames=1)[0][1]
+            t = tracker()
+            return harness.measure(lambda: t.draw(frame, hands), min_time)
+        cases.append((f"tracker.draw.hands{n}", bench_draw))
+    return cases
+
+
+def video_widget_cases() -> List[Case]:
+    cases: List[Case] = []
+    sizes = [((1280, 720), (960, 540)), ((1920, 1080), (1600, 900))]
+    for (fw, fh), (ww, wh) in sizes:
+        def bench(min_time: float, fw: int = fw, fh: int = fh, ww: int = ww, wh: int = wh) -> Dict[str, float]:
+            from PySide6 import QtWidgets
+            from src.ui.video_widget import VideoWidget
+            app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+            widget = VideoWidget()
+            widget.resize(ww, wh)
+            widget.show()
+            app.processEvents()
+            # nessun pacing: ogni frame viene convertito, scalato e ridisegnato
+            widget._refresh_interval = lambda: 0.0  # type: ignore[method-assign]
+            frame = test_image(fw, fh)
+
+            def step() -> None:
+                widget.show_frame(frame)
+                widget.repaint()
+            result = harness.measure(step, min_time)
+            widget.close()
+            app.processEvents()
+            return result
+        cases.append((f"video_widget.show_frame.{fw}x{fh}@{ww}x{wh}", bench))
+    return cases
+
+
+def capture_cases() -> List[Case]:
+    from src.core.fake_capture import SyntheticCapture
+    from src.core.video_capture import VideoCaptureThread
+
+    class _SyntheticThread(VideoCaptureThread):
+        def __init__(self, width: int, height: int, fps: int) -> None:
+            super().__init__(fps=fps)
+            self._size = (width, height)
+
+        def _open(self) -> Any:
+            return SyntheticCapture(*self._size, fps=self.fps)
+
+    cases: List[Case] = []
+    for fps in (30, 120):
+        def bench(min_time: float, fps: int = fps) -> Dict[str, float]:
+            capture = _SyntheticThread(1920, 1080, fps)
+            capture.start()
+            # second reader thread competing for the frame lock, like a secondary consumer
+            stop = threading.Event()
+
+            def contender() -> None:
+                while not stop.is_set():
+                    capture.read()
+            other = threading.Thread(target=contender, daemon=True)
+            other.start()
+            try:
+                return harness.measure(capture.read, min_time)
+            finally:
+                stop.set()
+                other.join(timeout=1.0)
+                capture.stop()
+        cases.append((f"capture.read.1920x1080@{fps}fps", bench))
+    return cases
+
+
+def all_cases() -> List[Case]:
+    return detect_cases() + tracker_cases() + video_widget_cases() + capture_cases()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", action="append", default=[], help="run benchmarks whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds spent timing each benchmark")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the results")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown vs baseline (0.15 = 15%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.01,
+                        help="ignore slowdowns smaller than this many milliseconds")
+    parser.add_argument("--save-baseline", help="also write the results to this baseline file")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    args = parser.parse_args(argv)
+
+    cases = [(name, fn) for name, fn in all_cases()
+             if not args.only or any(part in name for part in args.only)]
+    if args.list:
+        for name, _ in cases:
+            print(name)
+        return 0
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, fn in cases:
+        results[name] = fn(args.min_time)
+        r = results[name]
+        print(f"{name:<48} median {r['median_ms']:9.3f} ms  p95 {r['p95_ms']:9.3f} ms  ({r['runs']} runs)",
+              file=sys.stderr)
+
+    harness.save(args.output, results)
+    if args.save_baseline:
+        harness.save(args.save_baseline, results)
+
+    if args.baseline:
+        rows = harness.compare(results, harness.load(args.baseline), args.tolerance, args.min_delta_ms)
+        print(json.dumps({"comparison": rows}, indent=2))
+        regressions = [row["name"] for row in rows if row["regression"]]
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,72 +1,180 @@
-"""
-Background initialization manager for heavy components.
-Avoids blocking the UI thread during startup.
-"""
-
-from __future__ import annotations
-import threading
-import time
-from typing import Optional, Callable, Any
-from PySide6 import QtCore
-
-
-class BackgroundInitializer(QtCore.QObject):
-    """Manages background initialization of heavy components."""
-    
-    # Signals
-    handTrackerReady = QtCore.Signal(object)  # HandTracker instance
-    videoCaptureReady = QtCore.Signal(object)  # VideoCaptureThread instance
-    allComponentsReady = QtCore.Signal()
-    
-    def __init__(self, parent: Optional[QtCore.QObject] = None) -> None:
-        super().__init__(parent)
-        self._hand_tracker: Optional[Any] = None
-        self._video_capture: Optional[Any] = None
-        self._is_initializing = False
-        self._initialization_thread: Optional[threading.Thread] = None
-    
-    def start_initialization(self) -> None:
-        """Start background initialization of components."""
-        if self._is_initializing:
-            return
-            
-        self._is_initializing = True
-        self._initialization_thread = threading.Thread(
-            target=self._initialize_components,
-            daemon=True
-        )
-        self._initialization_thread.start()
-    
-    def _initialize_components(self) -> None:
-        """Initialize components in background thread."""
-        try:
-            # Initialize HandTracker (heavy MediaPipe import)
-            from src.core.hand_tracker import HandTracker
-            self._hand_tracker = HandTracker()
-            self.handTrackerReady.emit(self._hand_tracker)
-            
-            # Initialize VideoCaptureThread
-            from src.core.video_capture import VideoCaptureThread
-            self._video_capture = VideoCaptureThread()
-            self.videoCaptureReady.emit(self._video_capture)
-            
-            # All components ready
-            self.allComponentsReady.emit()
-            
-        except Exception as e:
-            print(f"Background initialization error: {e}")
-        finally:
-            self._is_initializing = False
-    
-    def get_hand_tracker(self) -> Optional[Any]:
-        """Get initialized HandTracker or None if not ready."""
-        return self._hand_tracker
-    
-    def get_video_capture(self) -> Optional[Any]:
-        """Get initialized VideoCaptureThread or None if not ready."""
-        return self._video_capture
-    
-    def is_ready(self) -> bool:
-        """Check if all components are ready."""
-        return (self._hand_tracker is not None and 
-                self._video_capture is not None)
+"""
+Background initialization manager for heavy components.
+Avoids blocking the UI thread during startup.
+"""
+
+from __future__ import annotations
+import threading
+from typing import Optional, Any, Dict, List, Tuple
+from PySide6 import QtCore
+
+from src.core.component_graph import ComponentGraph, ComponentResult, ComponentSpec, GraphListener
+
+
+def _probe_camera(deps: Dict[str, Any]) -> Any:
+    from src.core.calibration import load_profile, probe_camera_modes
+    if load_profile() is not None:
+        return None  # macchina già calibrata: niente da provare
+    # prima che la cattura venga consegnata: la camera è ancora libera
+    return probe_camera_modes(0)
+
+
+def _load_or_calibrate(deps: Dict[str, Any], display_size: Tuple[int, int],
+                       session_started: threading.Event) -> Any:
+    from src.core.calibration import calibrate, default_profile_path, load_profile, save_profile
+    profile = load_profile()
+    if profile is not None:
+        return profile
+    # primo avvio su questa macchina: misura una volta e salva
+    modes = deps.get("camera_modes")  # None se la prova della camera è fallita o scaduta
+    if session_started.is_set():
+        print("Calibration: a session is already running, postponed to the next launch")
+        return None
+    print("Calibration: no profile for this machine, calibrating...")
+    try:
+        profile = calibrate(probe_camera=False, display_size=display_size, camera_modes=modes or [])
+    except Exception as e:
+        # senza profilo si parte dalle impostazioni predefinite
+        print(f"Calibration failed: {e}")
+        return None
+    if session_started.is_set():
+        # tempi misurati accanto a cattura e inferenza: non rappresentano la macchina
+        print("Calibration: a session started while measuring, profile discarded")
+        return None
+    if modes is None:
+        print("Calibration: camera not probed, profile used for this launch only")
+        return profile
+    save_profile(profile)
+    print(f"Calibration: profile saved to {default_profile_path()}")
+    return profile
+
+
+def _create_hand_tracker(deps: Dict[str, Any], warmup_size: Optional[Tuple[int, int]] = None) -> Any:
+    from src.core.hand_tracker import HandTracker  # heavy MediaPipe import
+    from src.core.video_capture import PREFERRED_RESOLUTIONS
+    profile = deps.get("profile")
+    if profile is not None:
+        tracker = HandTracker(model_complexity=profile.model_complexity, inference_width=profile.inference_width)
+        warmup_size = warmup_size or profile.capture_resolution
+    else:
+        tracker = HandTracker()
+    # modelli pronti prima del primo frame reale, su frame sintetici: la camera resta spenta
+    width, height = warmup_size or PREFERRED_RESOLUTIONS[0]
+    tracker.warm_up(width, height)
+    return tracker
+
+
+def _create_video_capture(deps: Dict[str, Any]) -> Any:
+    from src.core.video_capture import VideoCaptureThread
+    return VideoCaptureThread()
+
+
+def default_components(warmup_size: Optional[Tuple[int, int]] = None,
+                       display_size: Tuple[int, int] = (1100, 700),
+                       session_started: Optional[threading.Event] = None) -> List[ComponentSpec]:
+    """Components of the gesture page. Only the video capture is needed for the
+    UI to become interactive. On the first launch it is handed out after the
+    camera modes are probed (bounded by a timeout), so the probe has the camera
+    to itself; the rest of the calibration (tracker and display timings) runs
+    in the background and is discarded, not saved, if a session starts
+    (``session_started``) before it ends. The hand tracker waits for the
+    profile and loads with its settings, or with the defaults."""
+    session_started = session_started or threading.Event()
+    return [
+        ComponentSpec("camera_modes", _probe_camera, timeout_s=15.0, required=False),
+        ComponentSpec("video_capture", _create_video_capture, depends_on=("camera_modes",),
+                      optional_deps=("camera_modes",), timeout_s=10.0, retries=2),
+        ComponentSpec("profile", lambda deps: _load_or_calibrate(deps, display_size, session_started),
+                      depends_on=("camera_modes",), optional_deps=("camera_modes",), timeout_s=60.0,
+                      required=False),
+        ComponentSpec("hand_tracker", lambda deps: _create_hand_tracker(deps, warmup_size),
+                      depends_on=("profile",), optional_deps=("profile",), timeout_s=60.0, retries=1,
+                      required=False),
+    ]
+
+
+class BackgroundInitializer(QtCore.QObject):
+    """Manages background initialization of heavy components."""
+
+    # Signals
+    handTrackerReady = QtCore.Signal(object)  # HandTracker instance
+    videoCaptureReady = QtCore.Signal(object)  # VideoCaptureThread instance
+    componentReady = QtCore.Signal(str, object, float)  # name, instance, elapsed ms
+    componentFailed = QtCore.Signal(str, str)  # name, error
+    progress = QtCore.Signal(int, int)  # done, total
+    interactiveReady = QtCore.Signal()  # required (minimal) components ready
+    allComponentsReady = QtCore.Signal()
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None,
+                 components: Optional[List[ComponentSpec]] = None) -> None:
+        super().__init__(parent)
+        # impostato da GesturePage.start(): la calibrazione non misura accanto a una sessione
+        self.session_started = threading.Event()
+        self._components = (components if components is not None
+                            else default_components(session_started=self.session_started))
+        self._graph: Optional[ComponentGraph] = None
+        self.timings_ms: Dict[str, float] = {}
+        # stato già raggiunto, per chi si collega dopo i segnali
+        self.interactive = False
+        self.all_ready = False
+
+    def start_initialization(self) -> None:
+        """Start background initialization of components."""
+        if self._graph is not None:
+            return
+        listener = GraphListener(
+            on_ready=self._on_ready,
+            on_failed=self._on_failed,
+            on_progress=self.progress.emit,
+            on_required_ready=self._on_required_ready,
+            on_finished=self._on_finished,
+        )
+        self._graph = ComponentGraph(self._components, listener)
+        self._graph.start()
+
+    def _on_ready(self, result: ComponentResult) -> None:
+        self.timings_ms[result.name] = result.elapsed_s * 1000.0
+        warmup = getattr(result.value, "warmup_ms", None)
+        if warmup:
+            self.timings_ms[f"{result.name}.warmup"] = warmup["total_ms"]
+            print(f"Hand tracker warm-up: first {warmup['first_ms']:.0f}ms, detection "
+                  f"{warmup['detection_ms']:.0f}ms, tracking {warmup['tracking_ms']:.0f}ms/frame"
+                  + ("" if warmup["tracked"] else " (synthetic hand not detected, tracking path skipped)"))
+        self.componentReady.emit(result.name, result.value, result.elapsed_s * 1000.0)
+        if result.name == "hand_tracker":
+            self.handTrackerReady.emit(result.value)
+        elif result.name == "video_capture":
+            self.videoCaptureReady.emit(result.value)
+
+    def _on_required_ready(self) -> None:
+        self.interactive = True
+        self.interactiveReady.emit()
+
+    def _on_failed(self, result: ComponentResult) -> None:
+        print(f"Background initialization error ({result.name}): {result.error}")
+        self.componentFailed.emit(result.name, result.error or "")
+
+    def _on_finished(self, results: Dict[str, ComponentResult]) -> None:
+        if all(r.ok for r in results.values()):
+            self.all_ready = True
+            self.allComponentsReady.emit()
+
+    def get_component(self, name: str) -> Optional[Any]:
+        return self._graph.get(name) if self._graph is not None else None
+
+    def get_hand_tracker(self) -> Optional[Any]:
+        """Get initialized HandTracker or None if not ready."""
+        return self.get_component("hand_tracker")
+
+    def get_profile(self) -> Optional[Any]:
+        """Loaded or freshly calibrated PerformanceProfile, None if unavailable."""
+        return self.get_component("profile")
+
+    def get_video_capture(self) -> Optional[Any]:
+        """Get initialized VideoCaptureThread or None if not ready."""
+        return self.get_component("video_capture")
+
+    def is_ready(self) -> bool:
+        """Check if all components are ready."""
+        return (self.get_hand_tracker() is not None and
+                self.get_video_capture() is not None)
@@ -0,0 +1,304 @@
+"""
+One-time hardware calibration and the persisted performance profile.
+
+On the first launch on a machine the background initializer probes the
+camera modes, times ``HandTracker.process`` at the ladder's inference widths
+and both model complexities, and estimates the per-frame presentation cost;
+the highest-quality settings that fit one camera frame interval are written
+to ``~/.topini/profile.json`` (``TOPINI_PROFILE``) and simply loaded on later
+launches. ``python -m src.tools.calibrate`` reruns it.
+"""
+
+from __future__ import annotations
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.quality_controller import DEFAULT_LADDER, QualityLevel
+
+PROFILE_VERSION = 1
+
+
+@dataclass
+class PerformanceProfile:
+    capture_resolution: Optional[Tuple[int, int]]
+    capture_fps: float
+    inference_width: Optional[int]
+    model_complexity: int
+    inference_every: int
+    level: str  # livello della scala di QualityController da cui partire
+    camera_modes: List[Dict[str, Any]] = field(default_factory=list)
+    tracker_ms: Dict[str, float] = field(default_factory=dict)
+    present_ms: Dict[str, float] = field(default_factory=dict)
+    machine: Dict[str, Any] = field(default_factory=dict)
+    created: str = ""
+    version: int = PROFILE_VERSION
+
+    def quality_level(self) -> QualityLevel:
+        return QualityLevel(self.level, self.inference_width, self.model_complexity,
+                            self.inference_every, self.capture_resolution)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PerformanceProfile":
+        res = data.get("capture_resolution")
+        return cls(
+            capture_resolution=tuple(res) if res else None,  # type: ignore[arg-type]
+            capture_fps=float(data.get("capture_fps", 30.0)),
+            inference_width=data.get("inference_width"),
+            model_complexity=int(data.get("model_complexity", 1)),
+            inference_every=int(data.get("inference_every", 1)),
+            level=str(data.get("level", DEFAULT_LADDER[0].name)),
+            camera_modes=list(data.get("camera_modes", [])),
+            tracker_ms=dict(data.get("tracker_ms", {})),
+            present_ms=dict(data.get("present_ms", {})),
+            machine=dict(data.get("machine", {})),
+            created=str(data.get("created", "")),
+            version=int(data.get("version", 0)),
+        )
+
+
+def default_profile_path() -> str:
+    return os.environ.get("TOPINI_PROFILE") or os.path.join(os.path.expanduser("~"), ".topini", "profile.json")
+
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        "node": platform.node(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": sys.version.split()[0],
+    }
+
+
+def load_profile(path: Optional[str] = None) -> Optional[PerformanceProfile]:
+    """The saved profile, or None if missing, unreadable, outdated or from another machine."""
+    path = path or default_profile_path()
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            profile = PerformanceProfile.from_dict(json.load(fh))
+    except (OSError, ValueError, TypeError) as e:
+        if os.path.exists(path):
+            print(f"Calibration: ignoring unreadable profile {path}: {e}")
+        return None
+    if profile.version != PROFILE_VERSION:
+        return None
+    # stessa installazione copiata su un'altra macchina: ricalibra
+    if profile.machine.get("node") != platform.node() or profile.machine.get("cpu_count") != os.cpu_count():
+        return None
+    return profile
+
+
+def save_profile(profile: PerformanceProfile, path: Optional[str] = None) -> str:
+    path = path or default_profile_path()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(profile.to_dict(), fh, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+# --- measurements -----------------------------------------------------------
+
+def probe_camera_modes(device_index: int = 0, resolutions: Optional[List[Tuple[int, int]]] = None,
+                       frames: int = 10) -> List[Dict[str, Any]]:
+    """Try each resolution on the camera and measure the frame rate it delivers.
+
+    Returns one entry per distinct mode actually obtained: width, height,
+    requested size and measured fps. Empty if the camera cannot be opened.
+    """
+    import cv2
+    from src.core.video_capture import PREFERRED_RESOLUTIONS, VideoCaptureThread
+
+    cap = VideoCaptureThread(device_index)._open()
+    if cap is None or not cap.isOpened():
+        if cap is not None:
+            cap.release()
+        return []
+    modes: List[Dict[str, Any]] = []
+    seen = set()
+    try:
+        for width, height in resolutions or PREFERRED_RESOLUTIONS:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            cap.set(cv2.CAP_PROP_FPS, 30)
+            actual = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+            if actual in seen:
+                continue
+            for _ in range(3):  # il primo frame dopo un cambio di modo è lento
+                cap.read()
+            stamps = []
+            for _ in range(frames):
+                ok, _frame = cap.read()
+                if ok:
+                    stamps.append(time.perf_counter())
+            seen.add(actual)
+            fps = (len(stamps) - 1) / (stamps[-1] - stamps[0]) if len(stamps) > 2 and stamps[-1] > stamps[0] else 0.0
+            modes.append({"width": actual[0], "height": actual[1], "requested": [width, height],
+                          "fps": round(fps, 1)})
+    finally:
+        cap.release()
+    return modes
+
+
+def _tracker_key(model_complexity: int, inference_width: Optional[int]) -> str:
+    return f"c{model_complexity}@{inference_width or 'full'}"
+
+
+def time_tracker(frame_size: Tuple[int, int], widths: Optional[List[Optional[int]]] = None,
+                 complexities: Tuple[int, ...] = (1, 0), frames: int = 15) -> Dict[str, float]:
+    """Median ``HandTracker.process`` ms on a synthetic hand (tracking path) at
+    ``frame_size``, keyed "c<complexity>@<width|full>"."""
+    from src.core.hand_tracker import HandTracker
+    from src.utils.synthetic_hands import render_hand_image
+
+    if widths is None:
+        widths = sorted({level.inference_width for level in DEFAULT_LADDER},
+                        key=lambda w: -(w or 1 << 30))
+    width, height = frame_size
+    frame = render_hand_image(width, height)
+    results: Dict[str, float] = {}
+    for complexity in complexities:
+        tracker = HandTracker(model_complexity=complexity)
+        try:
+            tracker.warm_up(width, height)
+            for inference_width in widths:
+                tracker.inference_width = inference_width
+                tracker.process(frame)  # aggancia la mano prima di misurare
+                samples = []
+                for _ in range(frames):
+                    start = time.perf_counter()
+                    tracker.process(frame)
+                    samples.append((time.perf_counter() - start) * 1000.0)
+                results[_tracker_key(complexity, inference_width)] = statistics.median(samples)
+        finally:
+            tracker.close()
+    return results
+
+
+def time_presentation(frame_size: Tuple[int, int], display_size: Tuple[int, int], frames: int = 20) -> float:
+    """Median ms of VideoWidget's per-frame work for ``frame_size`` frames shown at
+    ``display_size``: a real widget when called on the GUI thread of a running
+    QApplication, otherwise the same conversion and smooth scaling on QImage
+    (safe off the GUI thread)."""
+    from PySide6 import QtCore, QtGui, QtWidgets
+    import cv2
+
+    width, height = frame_size
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[:, :, 1] = np.linspace(0, 255, width, dtype=np.uint8)[None, :]
+    samples: List[float] = []
+    app = QtWidgets.QApplication.instance()
+    if app is not None and QtCore.QThread.currentThread() is app.thread():
+        from src.ui.video_widget import VideoWidget
+        widget = VideoWidget()
+        widget.resize(*display_size)
+        widget.show()
+        app.processEvents()
+        widget._refresh_interval = lambda: 0.0  # type: ignore[method-assign]
+        try:
+            for _ in range(frames + 2):
+                start = time.perf_counter()
+                widget.show_frame(frame)
+                widget.repaint()
+                samples.append((time.perf_counter() - start) * 1000.0)
+        finally:
+            widget.close()
+            widget.deleteLater()
+    else:
+        for _ in range(frames + 2):
+            start = time.perf_counter()
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            image = QtGui.QImage(rgb, width, height, 3 * width, QtGui.QImage.Format.Format_RGB888)
+            image.scaled(display_size[0], display_size[1], QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+                         QtCore.Qt.TransformationMode.SmoothTransformation)
+            samples.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(samples[2:])
+
+
+# --- decision ---------------------------------------------------------------
+
+def choose_profile(camera_modes: List[Dict[str, Any]], tracker_ms: Dict[str, float],
+                   present_ms: Dict[str, float], headroom: float = 0.7) -> PerformanceProfile:
+    """Highest ladder level whose per-frame cost fits ``headroom`` of the camera frame interval.
+
+    The cost of a level is inference (divided by its frame skip) plus
+    presentation at the capture mode it would use; the capture mode is the
+    largest probed mode not above the level's capture resolution.
+    """
+    modes = sorted(camera_modes, key=lambda m: m["width"] * m["height"], reverse=True)
+
+    def mode_for(level: QualityLevel) -> Optional[Dict[str, Any]]:
+        if not modes:
+            return None
+        if level.capture_resolution is None:
+            return modes[0]
+        cw, ch = level.capture_resolution
+        fitting = [m for m in modes if m["width"] <= cw and m["height"] <= ch]
+        return fitting[0] if fitting else modes[-1]
+
+    chosen = DEFAULT_LADDER[-1]
+    chosen_mode = mode_for(chosen)
+    for level in DEFAULT_LADDER:
+        mode = mode_for(level)
+        fps = (mode or {}).get("fps") or 30.0
+        infer = tracker_ms.get(_tracker_key(level.model_complexity, level.inference_width))
+        if infer is None:
+            continue
+        size_key = f"{mode['width']}x{mode['height']}" if mode else ""
+        present = present_ms.get(size_key, max(present_ms.values()) if present_ms else 0.0)
+        if infer / level.inference_every + present <= headroom * 1000.0 / fps:
+            chosen, chosen_mode = level, mode
+            break
+
+    resolution = (chosen_mode["width"], chosen_mode["height"]) if chosen_mode else chosen.capture_resolution
+    return PerformanceProfile(
+        capture_resolution=resolution,
+        capture_fps=float((chosen_mode or {}).get("fps") or 30.0),
+        inference_width=chosen.inference_width,
+        model_complexity=chosen.model_complexity,
+        inference_every=chosen.inference_every,
+        level=chosen.name,
+        camera_modes=camera_modes,
+        tracker_ms={k: round(v, 2) for k, v in tracker_ms.items()},
+        present_ms={k: round(v, 2) for k, v in present_ms.items()},
+        machine=machine_info(),
+        created=time.strftime("%Y-%m-%dT%H:%M:%S"),
+    )
+
+
+def calibrate(device_index: int = 0, probe_camera: bool = True, display_size: Tuple[int, int] = (1100, 700),
+              frames: int = 15, log: Any = print,
+              camera_modes: Optional[List[Dict[str, Any]]] = None) -> PerformanceProfile:
+    """Run all measurements and pick the profile (does not save it).
+    ``camera_modes`` are modes already probed, used instead of probing."""
+    start = time.perf_counter()
+    if camera_modes is not None:
+        modes = camera_modes
+    else:
+        modes = probe_camera_modes(device_index) if probe_camera else []
+    log(f"Calibration: camera modes {[(m['width'], m['height'], m['fps']) for m in modes] or 'not probed'}")
+    largest = max(((m["width"], m["height"]) for m in modes), key=lambda s: s[0] * s[1], default=(1280, 720))
+    tracker_ms = time_tracker(largest, frames=frames)
+    log("Calibration: tracker " + ", ".join(f"{k} {v:.1f}ms" for k, v in tracker_ms.items()))
+    sizes = [(m["width"], m["height"]) for m in modes] or [largest]
+    present_ms = {f"{w}x{h}": time_presentation((w, h), display_size) for w, h in sizes}
+    log("Calibration: presentation " + ", ".join(f"{k} {v:.1f}ms" for k, v in present_ms.items()))
+    profile = choose_profile(modes, tracker_ms, present_ms)
+    log(f"Calibration: chose '{profile.level}' (capture {profile.capture_resolution}, inference "
+        f"{profile.inference_width or 'full'}px, model {profile.model_complexity}, every "
+        f"{profile.inference_every}) in {time.perf_counter() - start:.1f}s")
+    return profile
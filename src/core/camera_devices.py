@@ -0,0 +1,312 @@
+"""
+Camera devices: enumeration, a cache of their capabilities and hot-plug.
+
+``CameraDeviceManager`` runs in its own thread, so the GUI never waits on a
+camera driver:
+
+- at start it lists the cameras (on Linux from ``/dev/video*`` and sysfs,
+  elsewhere by opening the first indices) and probes the modes of the ones
+  not yet in the cache (``~/.topini/cameras.json``), never the one in use;
+- on Linux it polls ``/dev`` for added or removed video nodes (a directory
+  listing, no device is opened);
+- when the active camera disappears, or a camera appears while the active
+  one is missing or delivers no frames, it moves the live capture to it with
+  ``VideoCaptureThread.switch_device`` and reports how long the switch took.
+
+Listeners (``DeviceListener``) are called from the manager thread.
+"""
+
+from __future__ import annotations
+import json
+import os
+import platform
+import queue
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.video_capture import SwitchReport
+
+_VIDEO_NODE = re.compile(r"^video(\d+)$")
+_SYSFS = "/sys/class/video4linux"
+
+
+@dataclass
+class CameraInfo:
+    index: int                   # indice per cv2.VideoCapture
+    name: str
+    path: str = ""               # /dev/videoN (Linux)
+    key: str = ""                # identità stabile (nome + porta USB) per la cache
+    modes: List[Dict[str, Any]] = field(default_factory=list)
+    probed: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class DeviceListener:
+    on_devices: Callable[[List[CameraInfo]], None] = lambda devices: None
+    on_added: Callable[[CameraInfo], None] = lambda info: None
+    on_removed: Callable[[CameraInfo], None] = lambda info: None
+    on_switched: Callable[[SwitchReport], None] = lambda report: None
+
+
+def default_cache_path() -> str:
+    return os.environ.get("TOPINI_CAMERA_CACHE") or os.path.join(os.path.expanduser("~"), ".topini", "cameras.json")
+
+
+def hotplug_supported() -> bool:
+    return platform.system() == "Linux" and os.path.isdir(_SYSFS)
+
+
+def video_nodes(dev_dir: str = "/dev") -> List[int]:
+    """Numbers of the ``/dev/videoN`` nodes: the cheap check done at every poll."""
+    try:
+        names = os.listdir(dev_dir)
+    except OSError:
+        return []
+    return sorted(int(m.group(1)) for m in map(_VIDEO_NODE.match, names) if m)
+
+
+def _read(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as fh:
+            return fh.read().strip()
+    except OSError:
+        return ""
+
+
+def list_linux_cameras(dev_dir: str = "/dev", sysfs: str = _SYSFS) -> List[CameraInfo]:
+    """Capture nodes from sysfs. A UVC camera exposes two nodes, the second
+    (index 1) for metadata only: it is skipped."""
+    cameras: List[CameraInfo] = []
+    for number in video_nodes(dev_dir):
+        node = os.path.join(sysfs, f"video{number}")
+        if _read(os.path.join(node, "index")) not in ("", "0"):
+            continue
+        name = _read(os.path.join(node, "name")) or f"video{number}"
+        # il percorso del dispositivo (bus/porta USB) distingue due camere uguali
+        port = os.path.realpath(os.path.join(node, "device")) if os.path.exists(os.path.join(node, "device")) else ""
+        cameras.append(CameraInfo(number, name, os.path.join(dev_dir, f"video{number}"), f"{name}@{port or number}"))
+    return cameras
+
+
+def probe_cameras(max_index: int = 4, skip: Optional[int] = None) -> List[CameraInfo]:
+    """Cameras found by opening the first ``max_index`` indices (platforms
+    without sysfs); ``skip`` is the index in use, assumed present."""
+    from src.core.video_capture import VideoCaptureThread
+
+    cameras: List[CameraInfo] = []
+    for index in range(max_index):
+        if index != skip:
+            cap = VideoCaptureThread(index)._open()
+            opened = cap is not None and cap.isOpened()
+            if cap is not None:
+                cap.release()
+            if not opened:
+                continue
+        cameras.append(CameraInfo(index, f"Camera {index}", key=f"index{index}"))
+    return cameras
+
+
+def list_cameras(skip: Optional[int] = None) -> List[CameraInfo]:
+    return list_linux_cameras() if hotplug_supported() else probe_cameras(skip=skip)
+
+
+def load_cache(path: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Probed modes per camera key; empty if missing or unreadable."""
+    path = path or default_cache_path()
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        return {str(k): list(v) for k, v in data.get("modes", {}).items()}
+    except (OSError, ValueError, TypeError, AttributeError):
+        return {}
+
+
+def save_cache(modes: Dict[str, List[Dict[str, Any]]], path: Optional[str] = None) -> str:
+    path = path or default_cache_path()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"modes": modes}, fh, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+class CameraDeviceManager:
+    def __init__(self, capture: Any = None, listener: Optional[DeviceListener] = None,
+                 poll_interval_s: float = 1.0, probe_modes: bool = True, auto_switch: bool = True,
+                 stall_s: float = 2.0, cache_path: Optional[str] = None) -> None:
+        self.capture = capture
+        self.listener = listener or DeviceListener()
+        self.poll_interval_s = poll_interval_s
+        self.probe_modes = probe_modes
+        self.auto_switch = auto_switch
+        # camera attiva senza frame nuovi da tanto: un dispositivo collegato ora la sostituisce
+        self.stall_s = stall_s
+        self.cache_path = cache_path or default_cache_path()
+        self.devices: Dict[int, CameraInfo] = {}
+        self.switches: List[SwitchReport] = []
+        self._cache: Dict[str, List[Dict[str, Any]]] = {}
+        self._nodes: List[int] = []
+        self._requests: "queue.Queue[Optional[int]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        # ultimo frame visto della camera attiva (seq, istante)
+        self._last_frames = (-1, 0.0)
+
+    @property
+    def active_index(self) -> Optional[int]:
+        if self.capture is None or getattr(self.capture, "source", None) is not None:
+            return None
+        return self.capture.device_index
+
+    def cameras(self) -> List[CameraInfo]:
+        with self._lock:
+            return [self.devices[i] for i in sorted(self.devices)]
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True, name="camera-devices")
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        self._requests.put(None)
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def request_switch(self, index: int) -> None:
+        """Move the live capture to camera ``index`` (from the manager thread)."""
+        self._requests.put(index)
+
+    def stats(self) -> Dict[str, Any]:
+        done = [s for s in self.switches if s.ok and s.first_frame_ms > 0]
+        return {
+            "cameras": len(self.devices),
+            "active": self.active_index,
+            "switches": len(self.switches),
+            "failed_switches": sum(not s.ok for s in self.switches),
+            "last_switch_ms": round(done[-1].first_frame_ms, 1) if done else None,
+        }
+
+    # --- manager thread ---------------------------------------------------
+
+    def _run(self) -> None:
+        self._cache = load_cache(self.cache_path)
+        self._nodes = video_nodes() if hotplug_supported() else []
+        self._refresh(initial=True)
+        self._probe_missing()
+        while self._running:
+            try:
+                request = self._requests.get(timeout=self.poll_interval_s)
+            except queue.Empty:
+                request = None
+            if not self._running:
+                break
+            if request is not None:
+                self._switch(request, "requested")
+            if hotplug_supported():
+                nodes = video_nodes()
+                if nodes != self._nodes:
+                    self._nodes = nodes
+                    # il nodo compare prima che il driver sia pronto ad aprirlo
+                    time.sleep(0.3)
+                    self._refresh()
+                    self._probe_missing()
+            self._note_frames()
+
+    def _refresh(self, initial: bool = False) -> None:
+        found = {info.index: info for info in list_cameras(skip=self.active_index)}
+        for info in found.values():
+            cached = self._cache.get(info.key)
+            if cached is not None:
+                info.modes, info.probed = cached, True
+        with self._lock:
+            added = [info for i, info in found.items() if i not in self.devices]
+            removed = [info for i, info in self.devices.items() if i not in found]
+            self.devices = found
+        if initial:
+            self.listener.on_devices(self.cameras())
+            # camera configurata assente all'avvio: si usa la prima presente
+            self._auto_switch([])
+            return
+        for info in removed:
+            print(f"Camera removed: {info.name} ({info.path or info.index})")
+            self.listener.on_removed(info)
+        for info in added:
+            print(f"Camera added: {info.name} ({info.path or info.index})")
+            self.listener.on_added(info)
+        if added or removed:
+            self.listener.on_devices(self.cameras())
+        self._auto_switch(added)
+
+    def _auto_switch(self, added: List[CameraInfo]) -> None:
+        active = self.active_index
+        if not self.auto_switch or active is None:
+            return
+        if active not in self.devices:
+            candidates = added or self.cameras()
+            if candidates:
+                self._switch(candidates[0].index, "active camera removed")
+        elif added and self._stalled():
+            self._switch(added[0].index, "active camera delivers no frames")
+
+    def _note_frames(self) -> None:
+        seq = getattr(self.capture, "frames_captured", -1)
+        if seq != self._last_frames[0]:
+            self._last_frames = (seq, time.monotonic())
+
+    def _stalled(self) -> bool:
+        if self.capture is None or not self.capture.is_running:
+            return False
+        self._note_frames()
+        return time.monotonic() - self._last_frames[1] > self.stall_s
+
+    def _switch(self, index: int, reason: str) -> None:
+        if self.capture is None:
+            return
+        report = self.capture.switch_device(index, reason=reason)
+        self.switches.append(report)
+        if report.ok:
+            print(f"Camera switch {report.from_index} -> {report.to_index} ({reason}): "
+                  f"open {report.open_ms:.0f} ms, first frame {report.first_frame_ms:.0f} ms")
+        else:
+            print(f"Camera switch {report.from_index} -> {report.to_index} failed: {report.error}")
+        self._last_frames = (getattr(self.capture, "frames_captured", -1), time.monotonic())
+        self.listener.on_switched(report)
+
+    def _probe_missing(self) -> None:
+        """Modes of the cameras not in the cache, one at a time, stopping early
+        if the manager is stopped; the camera in use is never opened."""
+        if not self.probe_modes:
+            return
+        from src.core.calibration import probe_camera_modes
+
+        changed = False
+        for info in self.cameras():
+            if not self._running:
+                break
+            if info.probed or info.index == self.active_index:
+                continue
+            modes = probe_camera_modes(info.index, frames=5)
+            if not modes:
+                continue
+            info.modes, info.probed = modes, True
+            self._cache[info.key] = modes
+            changed = True
+        if changed:
+            try:
+                save_cache(self._cache, self.cache_path)
+            except OSError as e:
+                print(f"Camera cache write error: {e}")
@@ -0,0 +1,208 @@
+"""
+Parallel initialization of components declared with dependencies.
+
+Each component is built by a factory receiving the already-built dependencies;
+independent components run in parallel on a thread pool, each attempt is timed,
+and failed or timed-out attempts are retried. Listeners are called from the
+scheduler thread.
+"""
+
+from __future__ import annotations
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.tracing import tracer
+
+
+@dataclass
+class ComponentSpec:
+    name: str
+    factory: Callable[[Dict[str, Any]], Any]  # riceve {nome_dipendenza: istanza}
+    depends_on: Tuple[str, ...] = ()
+    # dipendenze attese ma non indispensabili: se falliscono la factory riceve None
+    optional_deps: Tuple[str, ...] = ()
+    timeout_s: Optional[float] = None  # per tentativo
+    retries: int = 0
+    retry_delay_s: float = 0.5
+    # parte dell'insieme minimo per rendere la UI interattiva
+    required: bool = True
+
+
+@dataclass
+class ComponentResult:
+    name: str
+    value: Any = None
+    elapsed_s: float = 0.0  # durata del tentativo riuscito (o dell'ultimo fallito)
+    attempts: int = 0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class GraphListener:
+    on_started: Callable[[str, int], None] = lambda name, attempt: None
+    on_ready: Callable[[ComponentResult], None] = lambda result: None
+    on_failed: Callable[[ComponentResult], None] = lambda result: None
+    on_progress: Callable[[int, int], None] = lambda done, total: None
+    on_required_ready: Callable[[], None] = lambda: None
+    on_finished: Callable[[Dict[str, ComponentResult]], None] = lambda results: None
+
+
+@dataclass
+class _Attempt:
+    spec: ComponentSpec
+    number: int
+    started: float
+    deadline: Optional[float]
+    future: "Future[Any]" = field(default=None)  # type: ignore[assignment]
+
+
+class ComponentGraph:
+    def __init__(self, specs: Iterable[ComponentSpec], listener: Optional[GraphListener] = None,
+                 max_workers: Optional[int] = None) -> None:
+        self.specs: Dict[str, ComponentSpec] = {}
+        for spec in specs:
+            if spec.name in self.specs:
+                raise ValueError(f"Duplicate component {spec.name!r}")
+            self.specs[spec.name] = spec
+        self._validate()
+        self.listener = listener or GraphListener()
+        self.max_workers = max_workers or max(2, len(self.specs))
+        self.results: Dict[str, ComponentResult] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._done = threading.Event()
+
+    def _validate(self) -> None:
+        for spec in self.specs.values():
+            for dep in spec.depends_on:
+                if dep not in self.specs:
+                    raise ValueError(f"Component {spec.name!r} depends on unknown {dep!r}")
+        # rilevamento cicli (DFS)
+        state: Dict[str, int] = {}
+
+        def visit(name: str, path: List[str]) -> None:
+            if state.get(name) == 1:
+                raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+            if state.get(name) == 2:
+                return
+            state[name] = 1
+            for dep in self.specs[name].depends_on:
+                visit(dep, path + [name])
+            state[name] = 2
+
+        for name in self.specs:
+            visit(name, [])
+
+    def start(self) -> None:
+        """Start initialization in a background scheduler thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._schedule, daemon=True, name="component-graph")
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def get(self, name: str) -> Any:
+        result = self.results.get(name)
+        return result.value if result is not None and result.ok else None
+
+    @property
+    def is_finished(self) -> bool:
+        return self._done.is_set()
+
+    def _run_factory(self, spec: ComponentSpec, deps: Dict[str, Any]) -> Any:
+        with tracer.span(f"init.{spec.name}", cat="init"):
+            return spec.factory(deps)
+
+    def _schedule(self) -> None:
+        total = len(self.specs)
+        pending = dict(self.specs)
+        running: Dict["Future[Any]", _Attempt] = {}
+        retry_at: Dict[str, Tuple[float, int]] = {}  # nome -> (istante, prossimo tentativo)
+        required = {name for name, spec in self.specs.items() if spec.required}
+        required_signalled = False
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="init")
+
+        def finish(result: ComponentResult) -> None:
+            nonlocal required_signalled
+            self.results[result.name] = result
+            (self.listener.on_ready if result.ok else self.listener.on_failed)(result)
+            self.listener.on_progress(len(self.results), total)
+            if not required_signalled and required and all(
+                    n in self.results and self.results[n].ok for n in required):
+                required_signalled = True
+                self.listener.on_required_ready()
+
+        def launch(spec: ComponentSpec, number: int) -> None:
+            deps = {d: self.results[d].value for d in spec.depends_on}
+            now = time.perf_counter()
+            attempt = _Attempt(spec, number, now, now + spec.timeout_s if spec.timeout_s else None)
+            attempt.future = executor.submit(self._run_factory, spec, deps)
+            running[attempt.future] = attempt
+            self.listener.on_started(spec.name, number)
+
+        def failed(attempt: _Attempt, error: str) -> None:
+            spec = attempt.spec
+            if attempt.number <= spec.retries:
+                retry_at[spec.name] = (time.perf_counter() + spec.retry_delay_s, attempt.number + 1)
+            else:
+                finish(ComponentResult(spec.name, None, time.perf_counter() - attempt.started, attempt.number, error))
+
+        try:
+            while pending or running or retry_at:
+                now = time.perf_counter()
+                # avvia i componenti con tutte le dipendenze pronte
+                for name, spec in list(pending.items()):
+                    dep_results = [self.results.get(d) for d in spec.depends_on]
+                    bad = [d for d, r in zip(spec.depends_on, dep_results)
+                           if r is not None and not r.ok and d not in spec.optional_deps]
+                    if bad:
+                        del pending[name]
+                        finish(ComponentResult(name, None, 0.0, 0, f"dependency failed: {', '.join(bad)}"))
+                    elif all(r is not None for r in dep_results):
+                        del pending[name]
+                        launch(spec, 1)
+                for name, (when, number) in list(retry_at.items()):
+                    if when <= now:
+                        del retry_at[name]
+                        launch(self.specs[name], number)
+
+                deadlines = [a.deadline for a in running.values() if a.deadline is not None]
+                deadlines += [when for when, _ in retry_at.values()]
+                timeout = max(0.0, min(deadlines) - now) if deadlines else None
+                if running:
+                    done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                else:
+                    done = set()
+                    if timeout:
+                        time.sleep(timeout)
+
+                for future in done:
+                    attempt = running.pop(future)
+                    elapsed = time.perf_counter() - attempt.started
+                    error = future.exception()
+                    if error is None:
+                        finish(ComponentResult(attempt.spec.name, future.result(), elapsed, attempt.number))
+                    else:
+                        print(f"Component '{attempt.spec.name}' failed (attempt {attempt.number}): {error}")
+                        failed(attempt, f"{type(error).__name__}: {error}")
+
+                now = time.perf_counter()
+                for future, attempt in list(running.items()):
+                    if attempt.deadline is not None and now >= attempt.deadline:
+                        # il thread non si può interrompere: il risultato tardivo viene ignorato
+                        del running[future]
+                        print(f"Component '{attempt.spec.name}' timed out after {attempt.spec.timeout_s}s "
+                              f"(attempt {attempt.number})")
+                        failed(attempt, f"timeout after {attempt.spec.timeout_s}s")
+        finally:
+            executor.shutdown(wait=False)
+            self._done.set()
+            self.listener.on_finished(self.results)
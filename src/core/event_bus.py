@@ -0,0 +1,147 @@
+"""
+Gesture event bus: GestureDetector events fan out to independent sinks.
+
+Every sink has its own bounded queue and worker thread, so ``publish()`` never
+blocks the frame loop and a slow or stuck sink (a serial device, a sound
+player) only fills its own queue: when full, the oldest (or the newest, per
+sink) event is dropped and counted. Each sink keeps delivery latency
+(publish → handled) and handling time statistics.
+"""
+
+from __future__ import annotations
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.utils.metrics import RollingStats
+from src.utils.types import GestureEvent
+
+
+class EventSink:
+    """Base class of bus subscribers; ``handle`` runs on the sink's own thread."""
+
+    name = "sink"
+
+    def handle(self, event: GestureEvent, published_at: float) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class SinkStats:
+    delivered: int = 0
+    dropped: int = 0
+    failed: int = 0
+    latency_ms: RollingStats = field(default_factory=lambda: RollingStats(200))  # publish -> fine handle
+    handle_ms: RollingStats = field(default_factory=lambda: RollingStats(200))
+
+    def summary(self) -> Dict[str, float]:
+        lat = self.latency_ms.summary()
+        return {
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "latency_p50": round(lat["p50"], 3),
+            "latency_p95": round(lat["p95"], 3),
+            "handle_p95": round(self.handle_ms.summary()["p95"], 3),
+        }
+
+
+class _Subscription:
+    def __init__(self, sink: EventSink, maxsize: int, drop: str) -> None:
+        if drop not in ("oldest", "newest"):
+            raise ValueError(f"drop must be 'oldest' or 'newest', not {drop!r}")
+        self.sink = sink
+        self.maxsize = maxsize
+        self.drop = drop
+        self.stats = SinkStats()
+        self.queue: Deque[Tuple[GestureEvent, float]] = deque()
+        self.cond = threading.Condition()
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, daemon=True, name=f"sink-{sink.name}")
+        self.thread.start()
+
+    def put(self, event: GestureEvent, published_at: float) -> None:
+        with self.cond:
+            if self.closed:
+                return
+            if len(self.queue) >= self.maxsize:
+                self.stats.dropped += 1
+                if self.drop == "newest":
+                    return
+                self.queue.popleft()
+            self.queue.append((event, published_at))
+            self.cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self.cond:
+                while not self.queue and not self.closed:
+                    self.cond.wait()
+                if not self.queue:
+                    return  # chiuso e svuotato
+                event, published_at = self.queue.popleft()
+            start = time.perf_counter()
+            try:
+                self.sink.handle(event, published_at)
+            except Exception as e:
+                self.stats.failed += 1
+                print(f"Event sink '{self.sink.name}' failed: {e}")
+                continue
+            end = time.perf_counter()
+            self.stats.delivered += 1
+            self.stats.handle_ms.add((end - start) * 1000.0)
+            self.stats.latency_ms.add((end - published_at) * 1000.0)
+
+    def close(self, timeout: float) -> None:
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        self.thread.join(timeout)
+        try:
+            self.sink.close()
+        except Exception as e:
+            print(f"Event sink '{self.sink.name}' close failed: {e}")
+
+
+class EventBus:
+    def __init__(self, default_maxsize: int = 8) -> None:
+        self.default_maxsize = default_maxsize
+        self._subs: List[_Subscription] = []
+        self.published = 0
+
+    def subscribe(self, sink: EventSink, maxsize: Optional[int] = None, drop: str = "oldest") -> None:
+        """Add ``sink`` with its own queue of ``maxsize`` events; when full,
+        ``drop`` says which event is discarded ("oldest" or "newest")."""
+        self._subs.append(_Subscription(sink, maxsize or self.default_maxsize, drop))
+
+    def unsubscribe(self, sink: EventSink, timeout: float = 1.0) -> None:
+        """Remove ``sink`` after its queue drains (bounded by ``timeout``)."""
+        removed = [sub for sub in self._subs if sub.sink is sink]
+        self._subs = [sub for sub in self._subs if sub.sink is not sink]
+        for sub in removed:
+            sub.close(timeout)
+
+    @property
+    def sinks(self) -> List[EventSink]:
+        return [sub.sink for sub in self._subs]
+
+    def publish(self, event: GestureEvent) -> None:
+        """Queue ``event`` for every sink; never blocks on a sink."""
+        now = time.perf_counter()
+        self.published += 1
+        for sub in self._subs:
+            sub.put(event, now)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {sub.sink.name: sub.stats.summary() for sub in self._subs}
+
+    def close(self, timeout: float = 1.0) -> None:
+        """Stop the workers after they drain their queues (bounded by ``timeout`` each)."""
+        for sub in self._subs:
+            if not sub.closed:
+                sub.close(timeout)
@@ -0,0 +1,196 @@
+"""
+Event bus subscribers: Qt (banner), sound, JSON-lines log, UDP socket and
+serial port (the physical Topino toy, or any stand-in device path).
+
+``sinks_from_env()`` builds the optional ones from the environment:
+
+- ``TOPINI_EVENT_LOG=events.jsonl``: append every event to a file;
+- ``TOPINI_SOUNDS=assets/sounds``: play ``<gesture>.wav`` from that folder;
+- ``TOPINI_EVENT_UDP=127.0.0.1:9999``: send each event as a JSON datagram;
+- ``TOPINI_SERIAL=/dev/ttyUSB0[@9600]``: write a one-line command per event.
+"""
+
+from __future__ import annotations
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, IO, List, Optional, Tuple
+
+from PySide6 import QtCore
+
+from src.core.event_bus import EventSink
+from src.utils.types import GestureEvent
+
+
+def event_record(event: GestureEvent) -> Dict[str, Any]:
+    return {
+        "time": round(time.time(), 3),
+        "name": event.name,
+        "confidence": round(event.confidence, 3),
+        "hands": event.hands_involved,
+    }
+
+
+class QtSink(QtCore.QObject, EventSink):
+    """Forwards events to the GUI thread through a queued signal (the banner).
+
+    The sink's latency stops at the emit; the time spent in the GUI slot is the
+    banner stall shown by the HUD.
+    """
+
+    eventReceived = QtCore.Signal(object)
+
+    def __init__(self, name: str = "banner", parent: Optional[QtCore.QObject] = None) -> None:
+        QtCore.QObject.__init__(self, parent)
+        self.name = name
+
+    def handle(self, event: GestureEvent, published_at: float) -> None:
+        self.eventReceived.emit(event)
+
+
+class LogSink(EventSink):
+    name = "log"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fh: Optional[IO[str]] = None
+
+    def handle(self, event: GestureEvent, published_at: float) -> None:
+        if self._fh is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8")
+        self._fh.write(json.dumps(event_record(event)) + "\n")
+        self._fh.flush()
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+class SoundSink(EventSink):
+    """Plays ``<directory>/<gesture>.wav``; blocks only this sink's thread."""
+
+    name = "sound"
+
+    def __init__(self, directory: str, timeout_s: float = 5.0) -> None:
+        self.directory = directory
+        self.timeout_s = timeout_s
+        self._player: Optional[List[str]] = None
+        if not sys.platform.startswith("win"):
+            for cmd in (["afplay"], ["paplay"], ["aplay", "-q"]):
+                if shutil.which(cmd[0]):
+                    self._player = cmd
+                    break
+            if self._player is None:
+                print("Sound sink: no audio player found (afplay/paplay/aplay), sounds disabled")
+
+    def handle(self, event: GestureEvent, published_at: float) -> None:
+        path = os.path.join(self.directory, f"{event.name}.wav")
+        if not os.path.exists(path):
+            return
+        if sys.platform.startswith("win"):
+            import winsound
+            winsound.PlaySound(path, winsound.SND_FILENAME)
+        elif self._player is not None:
+            subprocess.run(self._player + [path], timeout=self.timeout_s, check=False,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class UdpSink(EventSink):
+    """One JSON datagram per event; fire-and-forget, nothing to reconnect."""
+
+    name = "udp"
+
+    def __init__(self, host: str, port: int) -> None:
+        self.address = (host, port)
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def handle(self, event: GestureEvent, published_at: float) -> None:
+        self._sock.sendto(json.dumps(event_record(event)).encode("utf-8"), self.address)
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+# comando inviato al pupazzo per ogni gesto
+SERIAL_COMMANDS: Dict[str, bytes] = {
+    "heart": b"HEART\n",
+    "wave": b"WAVE\n",
+    "middle_finger": b"SAD\n",
+}
+
+
+class SerialSink(EventSink):
+    """Writes a command line per event to a serial port. Uses pyserial when
+    installed; otherwise the port is opened as a plain file, which also works
+    for pseudo-terminals, FIFOs and stand-in files used without the toy."""
+
+    name = "serial"
+
+    def __init__(self, port: str, baudrate: int = 9600,
+                 commands: Optional[Dict[str, bytes]] = None) -> None:
+        self.port = port
+        self.baudrate = baudrate
+        self.commands = commands or SERIAL_COMMANDS
+        self._dev: Any = None
+
+    def _open(self) -> Any:
+        try:
+            import serial  # type: ignore[import-not-found]
+            return serial.Serial(self.port, self.baudrate, timeout=1, write_timeout=1)
+        except ImportError:
+            return open(self.port, "ab", buffering=0)
+
+    def handle(self, event: GestureEvent, published_at: float) -> None:
+        command = self.commands.get(event.name)
+        if command is None:
+            return
+        if self._dev is None:
+            self._dev = self._open()
+        try:
+            self._dev.write(command)
+        except Exception:
+            # dispositivo scollegato: si riapre al prossimo evento
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._dev is not None:
+            try:
+                self._dev.close()
+            finally:
+                self._dev = None
+
+
+def _split_port(text: str, sep: str) -> Tuple[str, Optional[int]]:
+    if sep in text:
+        head, tail = text.rsplit(sep, 1)
+        return head, int(tail)
+    return text, None
+
+
+def sinks_from_env() -> List[EventSink]:
+    """The optional sinks configured through TOPINI_* variables (see module doc)."""
+    sinks: List[EventSink] = []
+    path = os.environ.get("TOPINI_EVENT_LOG")
+    if path:
+        sinks.append(LogSink(path))
+    sounds = os.environ.get("TOPINI_SOUNDS")
+    if sounds:
+        sinks.append(SoundSink(sounds))
+    udp = os.environ.get("TOPINI_EVENT_UDP")
+    if udp:
+        host, port = _split_port(udp, ":")
+        sinks.append(UdpSink(host or "127.0.0.1", port or 9999))
+    serial_port = os.environ.get("TOPINI_SERIAL")
+    if serial_port:
+        port, baud = _split_port(serial_port, "@")
+        sinks.append(SerialSink(port, baud or 9600))
+    return sinks
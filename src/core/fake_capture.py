@@ -0,0 +1,188 @@
+"""
+Camera-less stand-ins for cv2.VideoCapture, for benchmarks and tests, with
+optional scheduled faults (``FaultySource``, ``fake:`` capture sources).
+"""
+
+from __future__ import annotations
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class SyntheticCapture:
+    """Implements the subset of the cv2.VideoCapture API used by VideoCaptureThread.
+
+    ``read()`` blocks like a real camera until the next frame is due at ``fps``
+    and returns a deterministic BGR frame (a moving gradient) of the configured size.
+    """
+
+    def __init__(self, width: int = 1280, height: int = 720, fps: float = 30.0, seed: int = 0) -> None:
+        self._props: Dict[int, float] = {
+            cv2.CAP_PROP_FRAME_WIDTH: float(width),
+            cv2.CAP_PROP_FRAME_HEIGHT: float(height),
+            cv2.CAP_PROP_FPS: float(fps),
+        }
+        self._opened = True
+        self._next_due = 0.0
+        self._frame_index = 0
+        rng = np.random.default_rng(seed)
+        self._base: Optional[np.ndarray] = None
+        self._noise = rng.integers(0, 32, size=(64, 64, 3), dtype=np.uint8)
+
+    def _size(self) -> Tuple[int, int]:
+        return int(self._props[cv2.CAP_PROP_FRAME_WIDTH]), int(self._props[cv2.CAP_PROP_FRAME_HEIGHT])
+
+    def _make_frame(self) -> np.ndarray:
+        w, h = self._size()
+        if self._base is None or self._base.shape[:2] != (h, w):
+            xs = np.linspace(0, 255, w, dtype=np.float32)
+            ys = np.linspace(0, 255, h, dtype=np.float32)
+            base = np.empty((h, w, 3), dtype=np.uint8)
+            base[..., 0] = xs[None, :]
+            base[..., 1] = ys[:, None]
+            base[..., 2] = 128
+            base += np.tile(self._noise, (h // 64 + 1, w // 64 + 1, 1))[:h, :w]
+            self._base = base
+        # frame nuovo ad ogni lettura, come una camera reale
+        return np.roll(self._base, self._frame_index % w, axis=1)
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def grab(self) -> bool:
+        if not self._opened:
+            return False
+        fps = self._props.get(cv2.CAP_PROP_FPS, 0.0)
+        if fps > 0:
+            now = time.perf_counter()
+            if self._next_due > now:
+                time.sleep(self._next_due - now)
+            self._next_due = max(now, self._next_due) + 1.0 / fps
+        self._frame_index += 1
+        return True
+
+    def read(self) -> Tuple[bool, Any]:
+        if not self.grab():
+            return False, None
+        return True, self._make_frame()
+
+    def set(self, prop: int, value: float) -> bool:
+        self._props[prop] = float(value)
+        return True
+
+    def get(self, prop: int) -> float:
+        return self._props.get(prop, 0.0)
+
+    def release(self) -> None:
+        self._opened = False
+
+
+# --- fault injection ----------------------------------------------------------
+
+FAULT_MODES = ("fail", "hang", "unplug")
+
+
+class FaultySource:
+    """A synthetic camera with scheduled faults, shared by every capture opened
+    on it so that reopening follows the same timeline.
+
+    Faults are ``(mode, start_s, duration_s)`` relative to the first open:
+
+    - ``fail``: ``read()`` returns ``(False, None)`` at once (driver hiccup);
+    - ``hang``: ``read()`` blocks until the fault ends, then fails;
+    - ``unplug``: open captures report closed and new ones cannot be opened.
+    """
+
+    def __init__(self, width: int = 1280, height: int = 720, fps: float = 30.0,
+                 faults: Optional[List[Tuple[str, float, float]]] = None, seed: int = 0) -> None:
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.faults = list(faults or [])
+        for mode, _, _ in self.faults:
+            if mode not in FAULT_MODES:
+                raise ValueError(f"unknown fault {mode!r} (expected one of {', '.join(FAULT_MODES)})")
+        self.seed = seed
+        self.started: Optional[float] = None
+        self.opens = 0
+        self.failed_opens = 0
+
+    def elapsed(self) -> float:
+        return 0.0 if self.started is None else time.perf_counter() - self.started
+
+    def fault(self) -> Optional[Tuple[str, float]]:
+        """Active fault and seconds until it ends, or None."""
+        t = self.elapsed()
+        for mode, start, duration in self.faults:
+            if start <= t < start + duration:
+                return mode, start + duration - t
+        return None
+
+    def open(self) -> "FaultyCapture":
+        if self.started is None:
+            self.started = time.perf_counter()
+        self.opens += 1
+        cap = FaultyCapture(self)
+        active = self.fault()
+        if active is not None and active[0] == "unplug":
+            self.failed_opens += 1
+            cap.release()
+        return cap
+
+
+class FaultyCapture(SyntheticCapture):
+    def __init__(self, source: FaultySource) -> None:
+        super().__init__(source.width, source.height, source.fps, source.seed)
+        self.source = source
+
+    def isOpened(self) -> bool:
+        active = self.source.fault()
+        return self._opened and not (active is not None and active[0] == "unplug")
+
+    def grab(self) -> bool:
+        active = self.source.fault()
+        if active is not None and self._opened:
+            mode, remaining = active
+            if mode == "hang":
+                time.sleep(remaining)
+            elif mode == "fail":
+                # un driver che fallisce risponde comunque con un ritmo
+                time.sleep(min(remaining, 0.5 / max(1.0, self.source.fps)))
+            return False
+        return super().grab()
+
+
+# sorgenti per spec: la riapertura dopo un guasto ritrova la stessa linea temporale
+_FAKE_SOURCES: Dict[str, FaultySource] = {}
+
+
+def parse_fake_source(spec: str) -> FaultySource:
+    """``fake:WxH@FPS,mode=start+duration,...``, e.g.
+    ``fake:1280x720@30,fail=2+1.5,unplug=6+3`` (every part optional)."""
+    body = spec.split(":", 1)[1] if ":" in spec else spec
+    width, height, fps = 1280, 720, 30.0
+    faults: List[Tuple[str, float, float]] = []
+    for part in filter(None, (p.strip() for p in body.split(","))):
+        if "=" in part:
+            mode, timing = part.split("=", 1)
+            start, _, duration = timing.partition("+")
+            faults.append((mode.strip(), float(start), float(duration or 1.0)))
+            continue
+        size, _, rate = part.partition("@")
+        if size:
+            w, _, h = size.lower().partition("x")
+            width, height = int(w), int(h)
+        if rate:
+            fps = float(rate)
+    return FaultySource(width, height, fps, faults)
+
+
+def open_fake_source(spec: str) -> FaultyCapture:
+    """Open the (shared) fake source described by ``spec``; used by
+    ``VideoCaptureThread._open`` for ``fake:`` sources."""
+    source = _FAKE_SOURCES.get(spec)
+    if source is None:
+        source = _FAKE_SOURCES[spec] = parse_fake_source(spec)
+    return source.open()
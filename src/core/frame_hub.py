@@ -0,0 +1,209 @@
+"""
+Frame fan-out: one capture and one inference shared by every consumer.
+
+The gesture page publishes a ``FramePacket`` per processed frame (the frame,
+the hands found on it and the frame with the landmarks drawn); the main view,
+the operator window, the recorder and the HUD subscribe to it. Each
+subscription has its own rate limit (``max_fps``, on the capture timestamps)
+and delivery:
+
+- ``inline``: ``handle`` runs in the publisher's thread (the GUI thread, for
+  widgets); it must be quick;
+- threaded (default): a bounded queue and a worker thread, like the event
+  bus; when the queue is full the oldest or the newest packet is dropped.
+
+Packets are shared, never copied: their arrays are marked read-only, so a
+consumer that wants to draw on a frame copies it first.
+"""
+
+from __future__ import annotations
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.metrics import RollingStats
+from src.utils.types import HandLandmarks
+
+
+def read_only(array: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    if array is not None:
+        array.flags.writeable = False
+    return array
+
+
+@dataclass(frozen=True)
+class FramePacket:
+    seq: int                                # numero del frame catturato
+    timestamp: float                        # perf_counter() alla cattura
+    frame_bgr: np.ndarray                   # frame mostrato (già specchiato), sola lettura
+    hands: Tuple[HandLandmarks, ...] = ()
+    drawn_bgr: Optional[np.ndarray] = None  # frame con i landmark disegnati, sola lettura
+    inferred: bool = False                  # mani calcolate su questo frame, non riprese dal precedente
+
+    @property
+    def display_bgr(self) -> np.ndarray:
+        return self.drawn_bgr if self.drawn_bgr is not None else self.frame_bgr
+
+
+class FrameConsumer:
+    """Base class of hub subscribers."""
+
+    name = "consumer"
+
+    def handle(self, packet: FramePacket) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class ConsumerStats:
+    delivered: int = 0
+    skipped: int = 0   # scartati dal limite di frequenza
+    dropped: int = 0   # scartati a coda piena
+    failed: int = 0
+    latency_ms: RollingStats = field(default_factory=lambda: RollingStats(200))  # cattura -> fine handle
+    handle_ms: RollingStats = field(default_factory=lambda: RollingStats(200))
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "delivered": self.delivered,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "latency_p95": round(self.latency_ms.summary()["p95"], 3),
+            "handle_p95": round(self.handle_ms.summary()["p95"], 3),
+        }
+
+
+class _Subscription:
+    def __init__(self, consumer: FrameConsumer, max_fps: float, maxsize: int, drop: str,
+                 inline: bool, only_inferred: bool) -> None:
+        if drop not in ("oldest", "newest"):
+            raise ValueError(f"drop must be 'oldest' or 'newest', not {drop!r}")
+        self.consumer = consumer
+        self.interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.maxsize = max(1, maxsize)
+        self.drop = drop
+        self.inline = inline
+        self.only_inferred = only_inferred
+        self.stats = ConsumerStats()
+        self.next_due = 0.0
+        self.closed = False
+        self.queue: Deque[FramePacket] = deque()
+        self.cond = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+        if not inline:
+            self.thread = threading.Thread(target=self._run, daemon=True, name=f"frames-{consumer.name}")
+            self.thread.start()
+
+    def offer(self, packet: FramePacket) -> None:
+        if self.only_inferred and not packet.inferred:
+            return
+        if self.interval:
+            # 2 ms di tolleranza sul jitter dei timestamp di cattura
+            if packet.timestamp < self.next_due - 0.002:
+                self.stats.skipped += 1
+                return
+            self.next_due = max(self.next_due + self.interval, packet.timestamp)
+        if self.inline:
+            self._deliver(packet)
+            return
+        with self.cond:
+            if self.closed:
+                return
+            if len(self.queue) >= self.maxsize:
+                self.stats.dropped += 1
+                if self.drop == "newest":
+                    return
+                self.queue.popleft()
+            self.queue.append(packet)
+            self.cond.notify()
+
+    def _deliver(self, packet: FramePacket) -> None:
+        start = time.perf_counter()
+        try:
+            self.consumer.handle(packet)
+        except Exception as e:
+            self.stats.failed += 1
+            print(f"Frame consumer '{self.consumer.name}' failed: {e}")
+            return
+        end = time.perf_counter()
+        self.stats.delivered += 1
+        self.stats.handle_ms.add((end - start) * 1000.0)
+        self.stats.latency_ms.add((end - packet.timestamp) * 1000.0)
+
+    def _run(self) -> None:
+        while True:
+            with self.cond:
+                while not self.queue and not self.closed:
+                    self.cond.wait()
+                if not self.queue:
+                    return  # chiuso e svuotato
+                packet = self.queue.popleft()
+            self._deliver(packet)
+
+    def close(self, timeout: float) -> None:
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join(timeout)
+        try:
+            self.consumer.close()
+        except Exception as e:
+            print(f"Frame consumer '{self.consumer.name}' close failed: {e}")
+
+
+class FrameHub:
+    def __init__(self) -> None:
+        # sostituita, mai modificata: publish() la scorre senza lock
+        self._subs: Tuple[_Subscription, ...] = ()
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, consumer: FrameConsumer, max_fps: float = 0.0, maxsize: int = 1, drop: str = "oldest",
+                  inline: bool = False, only_inferred: bool = False) -> None:
+        """Deliver packets to ``consumer`` at most ``max_fps`` times a second
+        (0 = every packet). Threaded consumers get a queue of ``maxsize``
+        packets; when full, ``drop`` says which is discarded ("oldest" keeps the
+        freshest frames, "newest" keeps a contiguous run). ``only_inferred``
+        skips frames whose hands were carried over from an earlier frame."""
+        sub = _Subscription(consumer, max_fps, maxsize, drop, inline, only_inferred)
+        with self._lock:
+            self._subs = self._subs + (sub,)
+
+    def unsubscribe(self, consumer: FrameConsumer, timeout: float = 1.0) -> None:
+        """Remove ``consumer`` after its queue drains (bounded by ``timeout``)."""
+        with self._lock:
+            removed = [s for s in self._subs if s.consumer is consumer]
+            self._subs = tuple(s for s in self._subs if s.consumer is not consumer)
+        for sub in removed:
+            sub.close(timeout)
+
+    def is_subscribed(self, consumer: FrameConsumer) -> bool:
+        return any(s.consumer is consumer for s in self._subs)
+
+    @property
+    def consumers(self) -> List[FrameConsumer]:
+        return [s.consumer for s in self._subs]
+
+    def publish(self, packet: FramePacket) -> None:
+        """Offer ``packet`` to every subscriber; blocks only on inline consumers."""
+        self.published += 1
+        for sub in self._subs:
+            sub.offer(packet)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {s.consumer.name: s.stats.summary() for s in self._subs}
+
+    def close(self, timeout: float = 1.0) -> None:
+        with self._lock:
+            subs, self._subs = self._subs, ()
+        for sub in subs:
+            sub.close(timeout)
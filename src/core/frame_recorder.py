@@ -0,0 +1,110 @@
+"""
+Landmark recorder: a frame hub consumer writing the hands of every inferred
+frame, and the gesture events, as JSON lines.
+
+Frame lines are the format read by ``gesture_classifier.load_sessions``::
+
+    {"t": 1.2345, "seq": 37, "hands": [{"points": [[x, y], ...], "handedness": "Left", "score": 0.97}]}
+
+with ``"label"`` on every frame when the recording is labelled (training
+data). Event lines (``{"t": ..., "event": "wave", ...}``) have no ``hands``
+key, so ``load_sessions`` skips them. ``t`` is seconds from the start of the
+recording.
+"""
+
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, IO, Iterable, List, Optional
+
+from src.core.event_bus import EventSink
+from src.core.frame_hub import FrameConsumer, FramePacket
+from src.utils.types import GestureEvent, HandLandmarks
+
+
+def default_recording_path() -> str:
+    directory = os.environ.get("TOPINI_TRACE_DIR", os.getcwd())
+    return os.path.join(directory, time.strftime("topini-recording-%Y%m%d-%H%M%S.jsonl"))
+
+
+def hand_record(hand: HandLandmarks) -> Dict[str, Any]:
+    return {"points": [[int(x), int(y)] for x, y in hand.points], "handedness": hand.handedness,
+            "score": round(float(hand.score), 4)}
+
+
+def frame_record(t: float, hands: Iterable[HandLandmarks], seq: Optional[int] = None,
+                 label: Optional[str] = None) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"t": round(t, 4)}
+    if seq is not None:
+        record["seq"] = seq
+    record["hands"] = [hand_record(h) for h in hands]
+    if label is not None:
+        record["label"] = label
+    return record
+
+
+def event_line(t: float, event: GestureEvent, seq: Optional[int] = None) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"t": round(t, 4), "event": event.name, "confidence": round(event.confidence, 3),
+                              "hands_involved": event.hands_involved}
+    if seq is not None:
+        record["seq"] = seq
+    return record
+
+
+class _RecorderEvents(EventSink):
+    name = "recorder"
+
+    def __init__(self, recorder: "FrameRecorder") -> None:
+        self.recorder = recorder
+
+    def handle(self, event: GestureEvent, published_at: float) -> None:
+        self.recorder.write(event_line(published_at - self.recorder.started, event))
+
+
+class FrameRecorder(FrameConsumer):
+    name = "recorder"
+
+    def __init__(self, path: str, label: Optional[str] = None) -> None:
+        self.path = path
+        self.label = label
+        self.started = time.perf_counter()
+        self.frames = 0
+        self.events = _RecorderEvents(self)  # da iscrivere all'EventBus
+        self._lock = threading.Lock()
+        self._fh: Optional[IO[str]] = None
+
+    def handle(self, packet: FramePacket) -> None:
+        self.write(frame_record(packet.timestamp - self.started, packet.hands, packet.seq, self.label))
+        self.frames += 1
+
+    def write(self, record: Dict[str, Any]) -> None:
+        # thread del consumer (frame) e del sink (eventi) sullo stesso file
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._fh is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._fh = open(self.path, "a", encoding="utf-8")
+            self._fh.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+
+def read_recording(path: str) -> List[Dict[str, Any]]:
+    """Frame lines of a recording (event lines skipped)."""
+    frames: List[Dict[str, Any]] = []
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                if "hands" in record:
+                    frames.append(record)
+    return frames
@@ -0,0 +1,552 @@
+"""
+Learned gesture classifier: an optional alternative to the threshold rules of
+``GestureDetector``, trained from labelled landmark sessions.
+
+Each hand becomes a fixed feature vector:
+
+- pose: the 21 points relative to the wrist, divided by the wrist -> middle
+  MCP distance (translation and scale invariant, orientation kept, since a
+  middle finger pointing down is not the gesture);
+- motion: wrist offset and palm angle change at fixed times in the last
+  0.9 s (resampled from the hand's history, so the features do not depend on
+  the frame rate), plus phase-independent summaries of them (spread and mean
+  step), which is what separates a wave from a still open palm.
+
+A small model in plain NumPy maps features to class probabilities: ``knn``
+(squared distances to the stored examples as one matrix product) or ``mlp``
+(one hidden ReLU layer, trained with Adam). All hands of a frame, or all
+frames of a recording, go through the model in a single call.
+
+``ClassifierDetector`` wraps it behind the ``GestureDetector`` interface:
+same ``GestureEvent`` output, same priority (middle finger, wave, heart),
+heart persistence and per-gesture cooldowns. Set ``TOPINI_CLASSIFIER`` to a
+model file to use it in the app (see ``detector_from_env``).
+"""
+
+from __future__ import annotations
+import json
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.types import GestureEvent, HandLandmarks
+
+# gesti che producono un evento; le altre classi (idle, open_palm, ...) sono "nessun gesto"
+EVENT_GESTURES = ("middle_finger", "wave", "heart")
+
+HISTORY_S = 0.9
+# istanti nel passato (s) a cui si campiona il movimento
+MOTION_OFFSETS = np.linspace(0.1, HISTORY_S, 9)
+POSE_FEATURES = 42
+MOTION_FEATURES = 3 * len(MOTION_OFFSETS) + 4
+N_FEATURES = POSE_FEATURES + MOTION_FEATURES
+
+
+class _SideHistory:
+    """Recent (t, wrist x, wrist y, palm angle) of the hand on one side of the frame.
+
+    Plain Python on purpose: with ~30 samples and 9 query times, a merge walk
+    costs less than the fixed overhead of a dozen NumPy calls on tiny arrays.
+    """
+
+    def __init__(self) -> None:
+        self.samples: Deque[Tuple[float, float, float, float]] = deque(maxlen=64)
+
+    def clear(self) -> None:
+        self.samples.clear()
+
+    def push(self, t: float, x: float, y: float, angle: float) -> None:
+        if self.samples:
+            # angolo senza salti di +/-2pi rispetto al campione precedente
+            prev = self.samples[-1][3]
+            angle = prev + (angle - prev + math.pi) % (2 * math.pi) - math.pi
+        self.samples.append((t, x, y, angle))
+        while t - self.samples[0][0] > HISTORY_S + 0.15:
+            self.samples.popleft()
+
+    def motion(self, t: float, scale: float) -> List[float]:
+        samples = self.samples
+        if len(samples) < 2:
+            return [0.0] * MOTION_FEATURES
+        _, x_now, y_now, a_now = samples[-1]
+        xs: List[float] = []
+        ys: List[float] = []
+        angs: List[float] = []
+        # MOTION_OFFSETS crescenti = istanti sempre più vecchi: un solo passaggio all'indietro
+        i = len(samples) - 1
+        for at in _QUERY_OFFSETS:
+            at = t - at
+            while i > 0 and samples[i - 1][0] > at:
+                i -= 1
+            if i == 0:
+                _, x, y, a = samples[0]  # prima del primo campione vale il primo
+            else:
+                t0, x0, y0, a0 = samples[i - 1]
+                t1, x1, y1, a1 = samples[i]
+                w = (at - t0) / (t1 - t0) if t1 > t0 else 1.0
+                w = 0.0 if w < 0.0 else (1.0 if w > 1.0 else w)
+                x, y, a = x0 + w * (x1 - x0), y0 + w * (y1 - y0), a0 + w * (a1 - a0)
+            xs.append((x - x_now) / scale)
+            ys.append((y - y_now) / scale)
+            angs.append(a - a_now)
+        return xs + ys + angs + _spread_and_step(xs) + _spread_and_step(angs)
+
+
+_QUERY_OFFSETS = [float(v) for v in MOTION_OFFSETS]
+
+
+def _spread_and_step(values: List[float]) -> List[float]:
+    n = len(values)
+    mean = sum(values) / n
+    spread = math.sqrt(sum((v - mean) ** 2 for v in values) / n)
+    step = sum(abs(values[k + 1] - values[k]) for k in range(n - 1)) / (n - 1)
+    return [spread, step]
+
+
+class FeatureExtractor:
+    """Per-frame hand features with the motion history of the left and right
+    hand slots (hands sorted by mean x, as in ``GestureDetector``)."""
+
+    def __init__(self) -> None:
+        self.sides = (_SideHistory(), _SideHistory())
+
+    def reset(self) -> None:
+        for side in self.sides:
+            side.clear()
+
+    @staticmethod
+    def order(hands: Sequence[HandLandmarks]) -> List[int]:
+        return sorted(range(len(hands)), key=lambda i: sum(p[0] for p in hands[i].points))
+
+    def features(self, hands: Sequence[HandLandmarks], t: float) -> np.ndarray:
+        """(len(hands), N_FEATURES) in the order of ``hands``."""
+        out = np.zeros((len(hands), N_FEATURES), dtype=np.float32)
+        if not hands:
+            self.reset()
+            return out
+        # in Python: per 1-2 mani costa meno delle conversioni verso NumPy
+        scales: List[float] = []
+        angles: List[float] = []
+        for row, hand in enumerate(hands):
+            p = hand.points
+            wx, wy = p[0]
+            scale = max(1.0, math.hypot(p[9][0] - wx, p[9][1] - wy))
+            scales.append(scale)
+            angles.append(math.atan2(p[17][1] - p[5][1], p[17][0] - p[5][0]))
+            out[row, :POSE_FEATURES] = [v for x, y in p for v in ((x - wx) / scale, (y - wy) / scale)]
+        order = self.order(hands)
+        for slot, side in enumerate(self.sides):
+            if slot >= len(order):
+                side.clear()
+                continue
+            i = order[slot]
+            wrist = hands[i].points[0]
+            side.push(t, float(wrist[0]), float(wrist[1]), angles[i])
+            out[i, POSE_FEATURES:] = side.motion(t, scales[i])
+        return out
+
+
+# --- modelli ---------------------------------------------------------------------
+
+
+class _Model:
+    kind = ""
+
+    def fit(self, x: np.ndarray, y: np.ndarray, n_classes: int) -> None:
+        raise NotImplementedError
+
+    def predict_proba(self, x: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def folded(self, mean: np.ndarray, std: np.ndarray) -> Optional[Callable[[np.ndarray], np.ndarray]]:
+        """``predict_proba`` on raw features with the standardisation folded
+        into the model, when the model allows it."""
+        return None
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        raise NotImplementedError
+
+    def load_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        raise NotImplementedError
+
+
+class KnnModel(_Model):
+    """k nearest stored examples; probabilities are the vote fractions.
+
+    Keeps at most ``max_examples`` (a stratified random subset) so the
+    per-frame cost stays bounded as training data grows.
+    """
+
+    kind = "knn"
+
+    def __init__(self, k: int = 7, max_examples: int = 1500, seed: int = 0) -> None:
+        self.k = k
+        self.max_examples = max_examples
+        self.seed = seed
+        self.x = np.zeros((0, N_FEATURES), dtype=np.float32)
+        self.y = np.zeros(0, dtype=np.int64)
+        self.n_classes = 0
+        self._sq = np.zeros(0, dtype=np.float32)
+
+    def fit(self, x: np.ndarray, y: np.ndarray, n_classes: int) -> None:
+        rng = np.random.default_rng(self.seed)
+        keep: List[np.ndarray] = []
+        per_class = max(1, self.max_examples // max(1, n_classes))
+        for c in range(n_classes):
+            idx = np.flatnonzero(y == c)
+            if len(idx) > per_class:
+                idx = rng.choice(idx, per_class, replace=False)
+            keep.append(idx)
+        sel = np.concatenate(keep) if keep else np.zeros(0, dtype=np.int64)
+        self.x = x[sel].astype(np.float32)
+        self.y = y[sel].astype(np.int64)
+        self.n_classes = n_classes
+        self._sq = (self.x ** 2).sum(axis=1)
+
+    def predict_proba(self, x: np.ndarray) -> np.ndarray:
+        # |a-b|^2 = |a|^2 - 2ab + |b|^2: una sola moltiplicazione di matrici
+        d = self._sq[None, :] - 2.0 * (x @ self.x.T)
+        k = min(self.k, len(self.y))
+        nearest = np.argpartition(d, k - 1, axis=1)[:, :k]
+        votes = np.zeros((len(x), self.n_classes), dtype=np.float32)
+        np.add.at(votes, (np.repeat(np.arange(len(x)), k), self.y[nearest].ravel()), 1.0)
+        return votes / k
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"x": self.x, "y": self.y, "k": np.array(self.k), "n_classes": np.array(self.n_classes)}
+
+    def load_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        self.x, self.y = arrays["x"].astype(np.float32), arrays["y"].astype(np.int64)
+        self.k, self.n_classes = int(arrays["k"]), int(arrays["n_classes"])
+        self._sq = (self.x ** 2).sum(axis=1)
+
+
+class MlpModel(_Model):
+    """One hidden ReLU layer and softmax, trained with mini-batch Adam."""
+
+    kind = "mlp"
+
+    def __init__(self, hidden: int = 64, epochs: int = 60, lr: float = 0.01, batch: int = 256,
+                 weight_decay: float = 1e-4, seed: int = 0) -> None:
+        self.hidden = hidden
+        self.epochs = epochs
+        self.lr = lr
+        self.batch = batch
+        self.weight_decay = weight_decay
+        self.seed = seed
+        self.w1 = self.b1 = self.w2 = self.b2 = np.zeros(0, dtype=np.float32)
+
+    def fit(self, x: np.ndarray, y: np.ndarray, n_classes: int) -> None:
+        rng = np.random.default_rng(self.seed)
+        n, f = x.shape
+        params = [
+            (rng.standard_normal((f, self.hidden)) * math.sqrt(2.0 / f)).astype(np.float32),
+            np.zeros(self.hidden, dtype=np.float32),
+            (rng.standard_normal((self.hidden, n_classes)) * math.sqrt(1.0 / self.hidden)).astype(np.float32),
+            np.zeros(n_classes, dtype=np.float32),
+        ]
+        m = [np.zeros_like(p) for p in params]
+        v = [np.zeros_like(p) for p in params]
+        onehot = np.eye(n_classes, dtype=np.float32)[y]
+        step = 0
+        for _ in range(self.epochs):
+            perm = rng.permutation(n)
+            for start in range(0, n, self.batch):
+                idx = perm[start:start + self.batch]
+                xb, tb = x[idx], onehot[idx]
+                w1, b1, w2, b2 = params
+                h = np.maximum(xb @ w1 + b1, 0.0)
+                p = _softmax(h @ w2 + b2)
+                g_logits = (p - tb) / len(idx)
+                g_h = (g_logits @ w2.T) * (h > 0)
+                grads = [xb.T @ g_h + self.weight_decay * w1, g_h.sum(axis=0),
+                         h.T @ g_logits + self.weight_decay * w2, g_logits.sum(axis=0)]
+                step += 1
+                for i, g in enumerate(grads):
+                    m[i] = 0.9 * m[i] + 0.1 * g
+                    v[i] = 0.999 * v[i] + 0.001 * g * g
+                    m_hat = m[i] / (1 - 0.9 ** step)
+                    v_hat = v[i] / (1 - 0.999 ** step)
+                    params[i] = (params[i] - self.lr * m_hat / (np.sqrt(v_hat) + 1e-8)).astype(np.float32)
+        self.w1, self.b1, self.w2, self.b2 = (_flush_subnormal(p) for p in params)
+
+    def predict_proba(self, x: np.ndarray) -> np.ndarray:
+        return _softmax(np.maximum(x @ self.w1 + self.b1, 0.0) @ self.w2 + self.b2)
+
+    def folded(self, mean: np.ndarray, std: np.ndarray) -> Optional[Callable[[np.ndarray], np.ndarray]]:
+        # ((x - mean) / std) @ w1 + b1 == x @ (w1 / std) + (b1 - (mean / std) @ w1)
+        w1 = _flush_subnormal((self.w1 / std[:, None]).astype(np.float32))
+        b1 = _flush_subnormal((self.b1 - (mean / std) @ self.w1).astype(np.float32))
+        w2, b2 = self.w2, self.b2
+        return lambda x: _softmax(np.maximum(x @ w1 + b1, 0.0) @ w2 + b2)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"w1": self.w1, "b1": self.b1, "w2": self.w2, "b2": self.b2}
+
+    def load_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        self.w1, self.b1, self.w2, self.b2 = (_flush_subnormal(arrays[k].astype(np.float32))
+                                              for k in ("w1", "b1", "w2", "b2"))
+        self.hidden = self.w1.shape[1]
+
+
+def _flush_subnormal(a: np.ndarray) -> np.ndarray:
+    # i pesi di feature costanti decadono verso lo zero fino ai subnormali, che
+    # rendono il prodotto di matrici diverse volte più lento
+    a[np.abs(a) < np.finfo(np.float32).tiny] = 0.0
+    return a
+
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+MODELS = {"knn": KnnModel, "mlp": MlpModel}
+
+
+class GestureClassifier:
+    """Feature standardisation + model + class names; saved as one ``.npz``."""
+
+    def __init__(self, model: _Model, classes: Sequence[str]) -> None:
+        self.model = model
+        self.classes = list(classes)
+        self.mean = np.zeros(N_FEATURES, dtype=np.float32)
+        self.std = np.ones(N_FEATURES, dtype=np.float32)
+        self._infer: Optional[Callable[[np.ndarray], np.ndarray]] = None
+
+    @classmethod
+    def train(cls, x: np.ndarray, labels: Sequence[str], kind: str = "mlp", **params: Any) -> "GestureClassifier":
+        if kind not in MODELS:
+            raise ValueError(f"Unknown model {kind!r}, expected one of {sorted(MODELS)}")
+        classes = sorted(set(labels))
+        index = {name: i for i, name in enumerate(classes)}
+        y = np.array([index[name] for name in labels], dtype=np.int64)
+        clf = cls(MODELS[kind](**params), classes)
+        clf.mean = x.mean(axis=0).astype(np.float32)
+        clf.std = np.maximum(x.std(axis=0), 1e-3).astype(np.float32)
+        clf.model.fit(clf._standardize(x), y, len(classes))
+        clf._prepare()
+        return clf
+
+    def _prepare(self) -> None:
+        self._infer = (self.model.folded(self.mean, self.std)
+                       or (lambda x: self.model.predict_proba(self._standardize(x))))
+
+    def _standardize(self, x: np.ndarray) -> np.ndarray:
+        return ((x - self.mean) / self.std).astype(np.float32, copy=False)
+
+    def predict_proba(self, x: np.ndarray) -> np.ndarray:
+        """(N, N_FEATURES) -> (N, len(classes)); any number of hands/frames at once."""
+        if len(x) == 0:
+            return np.zeros((0, len(self.classes)), dtype=np.float32)
+        return self._infer(x)
+
+    def predict(self, x: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        """Most likely class name and its probability for each row."""
+        if len(x) == 0:
+            return [], np.zeros(0, dtype=np.float32)
+        proba = self._infer(x)
+        best = proba.argmax(axis=1)
+        return [self.classes[i] for i in best], proba.max(axis=1)
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        meta = {"kind": self.model.kind, "classes": self.classes, "features": N_FEATURES}
+        np.savez(path, meta=np.array(json.dumps(meta)), mean=self.mean, std=self.std,
+                 **{f"model_{k}": v for k, v in self.model.arrays().items()})
+
+    @classmethod
+    def load(cls, path: str) -> "GestureClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta["features"] != N_FEATURES:
+                raise ValueError(f"{path}: model has {meta['features']} features, expected {N_FEATURES}")
+            model = MODELS[meta["kind"]]()
+            model.load_arrays({k[len("model_"):]: data[k] for k in data.files if k.startswith("model_")})
+            clf = cls(model, meta["classes"])
+            clf.mean, clf.std = data["mean"], data["std"]
+        clf._prepare()
+        return clf
+
+
+# --- sessioni etichettate -------------------------------------------------------
+
+
+@dataclass
+class LabelledSession:
+    """A recording: per frame, the timestamp, the hands and one label per hand."""
+    name: str
+    timestamps: List[float] = field(default_factory=list)
+    frames: List[List[HandLandmarks]] = field(default_factory=list)
+    labels: List[List[str]] = field(default_factory=list)
+
+    @classmethod
+    def from_batch(cls, name: str, batch: Any) -> "LabelledSession":
+        """From a ``synthetic_hands.LandmarkBatch`` (labels come from its tracks)."""
+        session = cls(name)
+        for i in range(batch.n_frames):
+            session.timestamps.append(float(batch.timestamps[i]))
+            session.frames.append(batch.hands_at(i))
+            session.labels.append([batch.labels[h] for h in range(len(batch.labels)) if batch.valid[i, h]])
+        return session
+
+
+def load_sessions(path: str) -> List[LabelledSession]:
+    """Read a JSON-lines recording. Lines with ``hands`` are frames::
+
+        {"t": 12.3, "hands": [{"points": [[x, y], ...], "handedness": "Left",
+                               "score": 0.9, "label": "wave"}], "label": "idle"}
+
+    A hand's ``label`` wins over the frame's; frames whose hands are not all
+    labelled are skipped. A ``session`` key, when present, splits the file into
+    sessions (otherwise the whole file is one).
+    """
+    sessions: Dict[str, LabelledSession] = {}
+    base = os.path.splitext(os.path.basename(path))[0]
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "hands" not in record:
+                continue
+            hands, labels = [], []
+            for h in record["hands"]:
+                label = h.get("label", record.get("label"))
+                if label is None:
+                    break
+                hands.append(HandLandmarks(points=[(int(p[0]), int(p[1])) for p in h["points"]],
+                                           handedness=h.get("handedness", "Left"),
+                                           score=float(h.get("score", 1.0))))
+                labels.append(label)
+            else:
+                if not hands and record.get("label") is None:
+                    continue
+                name = f"{base}:{record['session']}" if "session" in record else base
+                session = sessions.setdefault(name, LabelledSession(name))
+                session.timestamps.append(float(record["t"]))
+                session.frames.append(hands)
+                session.labels.append(labels)
+    return list(sessions.values())
+
+
+def session_features(session: LabelledSession) -> Tuple[np.ndarray, List[str]]:
+    """All hand features of a session (in time order) and their labels."""
+    extractor = FeatureExtractor()
+    feats: List[np.ndarray] = []
+    labels: List[str] = []
+    for t, hands, hand_labels in zip(session.timestamps, session.frames, session.labels):
+        feats.append(extractor.features(hands, t))
+        labels.extend(hand_labels)
+    x = np.concatenate(feats) if feats else np.zeros((0, N_FEATURES), dtype=np.float32)
+    return x, labels
+
+
+# --- rilevatore ---------------------------------------------------------------------
+
+
+class ClassifierDetector:
+    """``GestureDetector`` drop-in backed by a ``GestureClassifier``.
+
+    A hand votes for a gesture when its most likely class is that gesture with
+    probability >= ``min_confidence``. Events follow the rules' semantics: the
+    middle finger wins over the wave, which wins over the heart; the heart
+    needs two voting hands for ``heart_required_frames`` consecutive frames;
+    each gesture then has its own cooldown.
+    """
+
+    def __init__(self, classifier: GestureClassifier, min_confidence: float = 0.8,
+                 cooldown_s: float = 1.0, heart_required_frames: int = 6) -> None:
+        self.classifier = classifier
+        self.min_confidence = min_confidence
+        self.cooldown_s = cooldown_s
+        self.heart_required_frames = heart_required_frames
+        self.extractor = FeatureExtractor()
+        self._heart_ok_count = 0
+        self._cooldown_until: Dict[str, float] = {name: 0.0 for name in EVENT_GESTURES}
+
+    def detect(self, hands: List[HandLandmarks], now: Optional[float] = None) -> Optional[GestureEvent]:
+        if now is None:
+            now = time.time()
+        x = self.extractor.features(hands, now)
+        names, conf = self.classifier.predict(x)
+        return self._decide(names, conf, now)
+
+    def detect_offline(self, timestamps: Sequence[float],
+                       frames: Sequence[List[HandLandmarks]]) -> List[Optional[GestureEvent]]:
+        """Events for a whole recording: features frame by frame, then one
+        model call for every hand of every frame."""
+        counts, feats = [], []
+        for t, hands in zip(timestamps, frames):
+            feats.append(self.extractor.features(hands, t))
+            counts.append(len(hands))
+        x = np.concatenate(feats) if feats else np.zeros((0, N_FEATURES), dtype=np.float32)
+        names, conf = self.classifier.predict(x)
+        events: List[Optional[GestureEvent]] = []
+        start = 0
+        for t, n in zip(timestamps, counts):
+            events.append(self._decide(names[start:start + n], conf[start:start + n], t))
+            start += n
+        return events
+
+    def _decide(self, names: Sequence[str], conf: np.ndarray, now: float) -> Optional[GestureEvent]:
+        votes: Dict[str, List[float]] = {}
+        for name, c in zip(names, conf):
+            if name in self._cooldown_until and c >= self.min_confidence:
+                votes.setdefault(name, []).append(float(c))
+
+        for name in ("middle_finger", "wave"):
+            if name in votes and now >= self._cooldown_until[name]:
+                self._cooldown_until[name] = now + self.cooldown_s
+                return GestureEvent(name=name, confidence=max(votes[name]), hands_involved=len(votes[name]))
+
+        # come nelle regole, la persistenza del cuore conta solo i frame senza altri eventi
+        heart = votes.get("heart", [])
+        self._heart_ok_count = self._heart_ok_count + 1 if len(heart) >= 2 else 0
+        if self._heart_ok_count >= self.heart_required_frames and now >= self._cooldown_until["heart"]:
+            self._heart_ok_count = 0
+            self._cooldown_until["heart"] = now + self.cooldown_s
+            return GestureEvent(name="heart", confidence=min(heart), hands_involved=2)
+        return None
+
+
+def detector_from_env() -> Any:
+    """``ClassifierDetector`` when TOPINI_CLASSIFIER names a model file
+    (TOPINI_CLASSIFIER_MIN_CONF sets the threshold), otherwise the rules;
+    wrapped in a ``CombinedDetector`` when a template library exists
+    (TOPINI_TEMPLATES, default ``~/.topini/templates.json``)."""
+    detector: Any = None
+    path = os.environ.get("TOPINI_CLASSIFIER")
+    if path:
+        try:
+            classifier = GestureClassifier.load(path)
+            print(f"Gesture classifier: {classifier.model.kind} model from {path} ({', '.join(classifier.classes)})")
+            detector = ClassifierDetector(classifier, float(os.environ.get("TOPINI_CLASSIFIER_MIN_CONF", "0.8")))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Gesture classifier not loaded ({e}), using the rules")
+    if detector is None:
+        from src.core.gesture_detector import GestureDetector
+        detector = GestureDetector()
+
+    from src.core.gesture_templates import CombinedDetector, TemplateLibrary, TemplateMatcher, default_library_path
+    path = os.environ.get("TOPINI_TEMPLATES") or default_library_path()
+    if not os.path.exists(path):
+        return detector
+    try:
+        library = TemplateLibrary.load(path)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Gesture templates not loaded ({e})")
+        return detector
+    if not len(library):
+        return detector
+    print(f"Gesture templates: {len(library)} from {path} ({', '.join(library.names())})")
+    return CombinedDetector(detector, TemplateMatcher(library))
@@ -0,0 +1,380 @@
+"""
+Operator-recorded motion gestures (a circle, a "come here" beckon, ...)
+matched with dynamic time warping.
+
+Each hand slot (left/right by mean x, as in ``GestureDetector``) keeps a short
+history of its wrist position and of the index fingertip relative to the
+wrist. A template is the same four channels resampled to ``SERIES_LEN`` steps
+over the template's duration, position centred on its mean and everything
+divided by the hand size, so it does not depend on where the hand is, how big
+it looks or the frame rate.
+
+Matching a library of hundreds of templates stays cheap because most of them
+never reach the full DTW:
+
+1. templates are grouped by duration; the query is resampled once per group;
+2. the LB_Keogh lower bound (distance of the query from each template's
+   warping-band envelope) is computed for the whole library in one NumPy
+   expression, and templates whose bound exceeds their threshold are dropped;
+3. the survivors are tried in increasing bound order with a banded DTW that
+   abandons as soon as a row's minimum exceeds the best distance so far, and
+   stops when the next bound cannot beat it;
+4. at most ``max_dtw`` full DTWs run per query, which bounds the per-frame
+   cost whatever the library size.
+"""
+
+from __future__ import annotations
+import json
+import math
+import os
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.metrics import RollingStats
+from src.utils.types import GestureEvent, HandLandmarks
+
+SERIES_LEN = 32
+CHANNELS = 4  # polso x, y (centrati) e punta dell'indice x, y rispetto al polso
+# ampiezza della banda di Sakoe-Chiba, in passi
+DEFAULT_BAND = 3
+
+
+def default_library_path() -> str:
+    return os.path.join(os.path.expanduser("~"), ".topini", "templates.json")
+
+
+@dataclass
+class TrackSample:
+    t: float
+    wrist: Tuple[float, float]
+    index: Tuple[float, float]  # punta dell'indice - polso
+    scale: float                # polso -> nocca del medio
+
+
+def sample_hand(hand: HandLandmarks, t: float) -> TrackSample:
+    p = hand.points
+    wx, wy = p[0]
+    scale = max(1.0, math.hypot(p[9][0] - wx, p[9][1] - wy))
+    return TrackSample(t, (float(wx), float(wy)), (float(p[8][0] - wx), float(p[8][1] - wy)), scale)
+
+
+def track_array(samples: Sequence[TrackSample]) -> np.ndarray:
+    """(N, 6) array of t, wrist x, y, index x, y, scale."""
+    return np.array([(s.t, s.wrist[0], s.wrist[1], s.index[0], s.index[1], s.scale) for s in samples],
+                    dtype=np.float64).reshape(-1, 6)
+
+
+def make_series(samples: Sequence[TrackSample], start: float, end: float,
+                length: int = SERIES_LEN) -> Optional[np.ndarray]:
+    """Resample the samples between ``start`` and ``end`` to a normalised
+    (length, CHANNELS) series; None if they do not cover the interval."""
+    window = [s for s in samples if start - 0.05 <= s.t <= end + 1e-6]
+    series, valid = make_queries(track_array(window), end, np.array([end - start]), length)
+    return series[0] if valid[0] else None
+
+
+def make_queries(track: np.ndarray, end: float, durations: np.ndarray,
+                 length: int = SERIES_LEN) -> Tuple[np.ndarray, np.ndarray]:
+    """``make_series`` of a ``track_array`` for several durations ending at
+    ``end`` in one go: (len(durations), length, CHANNELS) series and a mask of
+    the ones the track covers. The scale is the median over the whole track."""
+    times = track[:, 0]
+    if len(times) < 6:
+        return np.zeros((len(durations), length, CHANNELS), dtype=np.float32), np.zeros(len(durations), bool)
+    starts = end - durations
+    first = np.searchsorted(times, starts - 0.05)
+    count = np.searchsorted(times, end + 1e-6) - first
+    valid = (count >= 6) & (times[np.minimum(first, len(times) - 1)] <= starts + 0.1 * durations)
+    begin = np.maximum(starts, times[np.minimum(first, len(times) - 1)])
+    at = begin[:, None] + np.linspace(0.0, 1.0, length)[None, :] * (end - begin)[:, None]
+    j = np.clip(np.searchsorted(times, at), 1, len(times) - 1)
+    dt = times[j] - times[j - 1]
+    w = np.clip(np.divide(at - times[j - 1], dt, out=np.ones_like(dt), where=dt > 0), 0.0, 1.0)
+    values = track[:, 1:5]
+    series = values[j - 1] + w[..., None] * (values[j] - values[j - 1])
+    series[..., :2] -= series[..., :2].mean(axis=1, keepdims=True)
+    series /= float(np.median(track[:, 5]))
+    return series.astype(np.float32), valid
+
+
+def envelope(series: np.ndarray, band: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Upper and lower LB_Keogh envelopes of a (L, C) series for a warping band."""
+    n = len(series)
+    upper = np.empty_like(series)
+    lower = np.empty_like(series)
+    for i in range(n):
+        lo, hi = max(0, i - band), min(n, i + band + 1)
+        upper[i] = series[lo:hi].max(axis=0)
+        lower[i] = series[lo:hi].min(axis=0)
+    return upper, lower
+
+
+def dtw_distance(query: np.ndarray, template: np.ndarray, band: int = DEFAULT_BAND,
+                 abandon_above: float = math.inf) -> float:
+    """Banded DTW (sum of squared step distances, divided by the length).
+    Returns ``inf`` as soon as every cell of a row exceeds ``abandon_above``."""
+    n = len(query)
+    # costi di tutte le coppie in NumPy, programmazione dinamica in Python sulla banda
+    diff = query[:, None, :] - template[None, :, :]
+    cost = (diff * diff).sum(axis=2).tolist()
+    limit = abandon_above * n
+    inf = math.inf
+    prev = [inf] * n
+    for i in range(n):
+        row = cost[i]
+        cur = [inf] * n
+        lo, hi = max(0, i - band), min(n, i + band + 1)
+        row_min = inf
+        for j in range(lo, hi):
+            if i == 0 and j == 0:
+                best = 0.0
+            else:
+                best = prev[j]
+                if j > 0:
+                    if cur[j - 1] < best:
+                        best = cur[j - 1]
+                    if prev[j - 1] < best:
+                        best = prev[j - 1]
+            value = row[j] + best
+            cur[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return inf
+        prev = cur
+    return prev[n - 1] / n
+
+
+@dataclass
+class GestureTemplate:
+    name: str
+    series: List[List[float]]          # (SERIES_LEN, CHANNELS)
+    duration_s: float
+    threshold: float = 0.6             # distanza DTW massima per riconoscerlo
+    created: str = ""
+    examples: int = 1
+
+    def array(self) -> np.ndarray:
+        return np.asarray(self.series, dtype=np.float32)
+
+
+class _Index:
+    """All templates stacked for the vectorised lower bound, sorted by
+    duration so each duration group is a contiguous slice."""
+
+    def __init__(self, templates: List[GestureTemplate], band: int) -> None:
+        # durate arrotondate a 0,1 s: una query ricampionata per gruppo
+        self.templates = sorted(templates, key=lambda t: round(t.duration_s, 1))
+        self.durations = np.array(sorted({round(t.duration_s, 1) for t in templates}), dtype=np.float64)
+        self.group = np.searchsorted(self.durations, [round(t.duration_s, 1) for t in self.templates])
+        self.slices = [slice(int(lo), int(hi)) for lo, hi in
+                       zip(np.searchsorted(self.group, np.arange(len(self.durations))),
+                           np.searchsorted(self.group, np.arange(len(self.durations)), side="right"))]
+        self.series = np.stack([t.array() for t in self.templates])
+        envs = [envelope(s, band) for s in self.series]
+        self.upper = np.stack([e[0] for e in envs])
+        self.lower = np.stack([e[1] for e in envs])
+        self.thresholds = np.array([t.threshold for t in self.templates], dtype=np.float32)
+        self._diff = np.empty_like(self.series)
+
+    def lower_bounds(self, queries: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """LB_Keogh of every template against its group's query (``inf`` where
+        the query is not valid)."""
+        # buffer riusato: temporanei di centinaia di KB costano più del calcolo
+        d = self._diff
+        for g, part in enumerate(self.slices):
+            if valid[g]:
+                # distanza dalla busta: q - min(max(q, lower), upper)
+                np.maximum(queries[g], self.lower[part], out=d[part])
+                np.minimum(d[part], self.upper[part], out=d[part])
+                np.subtract(queries[g], d[part], out=d[part])
+        lbs = np.einsum("ijk,ijk->i", d, d) / queries.shape[1]
+        lbs[~valid[self.group]] = np.inf
+        return lbs
+
+
+class TemplateLibrary:
+    def __init__(self, templates: Optional[List[GestureTemplate]] = None, band: int = DEFAULT_BAND) -> None:
+        self.templates: List[GestureTemplate] = list(templates or [])
+        self.band = band
+        self._index: Optional[_Index] = None
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    @property
+    def index(self) -> _Index:
+        if self._index is None:
+            self._index = _Index(self.templates, self.band)
+        return self._index
+
+    def add(self, template: GestureTemplate) -> None:
+        self.templates.append(template)
+        self._index = None
+
+    def remove(self, name: str) -> int:
+        before = len(self.templates)
+        self.templates = [t for t in self.templates if t.name != name]
+        self._index = None
+        return before - len(self.templates)
+
+    def names(self) -> List[str]:
+        return sorted({t.name for t in self.templates})
+
+    def record(self, name: str, examples: List[np.ndarray], duration_s: float,
+               margin: float = 1.5, default_threshold: float = 0.6) -> List[GestureTemplate]:
+        """Add recorded examples of a gesture. With two or more, the threshold
+        is ``margin`` times the largest DTW distance between the examples, so
+        the operator's own variation is accepted and little more."""
+        threshold = default_threshold
+        if len(examples) >= 2:
+            dists = [dtw_distance(a, b, self.band) for i, a in enumerate(examples) for b in examples[i + 1:]]
+            threshold = max(0.05, margin * max(dists))
+        created = time.strftime("%Y-%m-%dT%H:%M:%S")
+        added = [GestureTemplate(name, e.round(4).tolist(), round(duration_s, 2), round(threshold, 4),
+                                 created, len(examples)) for e in examples]
+        for t in added:
+            self.add(t)
+        return added
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"version": 1, "band": self.band, "templates": [asdict(t) for t in self.templates]}, fh)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TemplateLibrary":
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        return cls([GestureTemplate(**t) for t in data.get("templates", [])], data.get("band", DEFAULT_BAND))
+
+
+@dataclass
+class MatchStats:
+    queries: int = 0
+    lower_bounds: int = 0
+    pruned: int = 0        # scartati dal lower bound
+    full_dtw: int = 0
+    abandoned: int = 0     # DTW interrotti in anticipo
+    over_budget: int = 0   # candidati non provati per il limite max_dtw
+    match_ms: RollingStats = field(default_factory=lambda: RollingStats(2000))
+
+    def summary(self) -> Dict[str, Any]:
+        ms = self.match_ms.summary()
+        return {
+            "queries": self.queries,
+            "pruned_fraction": round(self.pruned / self.lower_bounds, 4) if self.lower_bounds else 0.0,
+            "full_dtw_per_query": round(self.full_dtw / self.queries, 3) if self.queries else 0.0,
+            "abandoned": self.abandoned,
+            "over_budget": self.over_budget,
+            "p50_ms": round(ms["p50"], 4),
+            "p95_ms": round(ms["p95"], 4),
+        }
+
+
+class TemplateMatcher:
+    """Per-frame template matching on the two hand slots, with the same event
+    and cooldown conventions as ``GestureDetector``."""
+
+    def __init__(self, library: TemplateLibrary, max_dtw: int = 4, cooldown_s: float = 1.0) -> None:
+        self.library = library
+        self.max_dtw = max_dtw
+        self.cooldown_s = cooldown_s
+        self.stats = MatchStats()
+        longest = max((t.duration_s for t in library.templates), default=1.0)
+        self._history_s = longest + 0.2
+        self._sides: Tuple[Deque[TrackSample], Deque[TrackSample]] = (deque(), deque())
+        self._cooldown_until: Dict[str, float] = {}
+
+    def reset(self) -> None:
+        for side in self._sides:
+            side.clear()
+
+    def detect(self, hands: List[HandLandmarks], now: Optional[float] = None,
+               match: bool = True) -> Optional[GestureEvent]:
+        """Update the hand tracks and, with ``match``, look for a template."""
+        if now is None:
+            now = time.time()
+        order = sorted(hands, key=lambda h: sum(p[0] for p in h.points))
+        result: Optional[Tuple[float, GestureTemplate]] = None
+        for slot, side in enumerate(self._sides):
+            if slot >= len(order):
+                side.clear()
+                continue
+            side.append(sample_hand(order[slot], now))
+            while now - side[0].t > self._history_s:
+                side.popleft()
+            if not match or not self.library.templates:
+                continue
+            found = self.match(side, now)
+            if found is not None and (result is None or found[0] < result[0]):
+                result = found
+        if result is None:
+            return None
+        distance, template = result
+        self._cooldown_until[template.name] = now + self.cooldown_s
+        # 1.0 a distanza zero, 0.5 sulla soglia
+        confidence = 1.0 - 0.5 * min(1.0, distance / template.threshold)
+        return GestureEvent(name=template.name, confidence=confidence, hands_involved=1)
+
+    def match(self, samples: Sequence[TrackSample], now: float) -> Optional[Tuple[float, GestureTemplate]]:
+        """Best (distance, template) under threshold for the track ending at ``now``."""
+        start = time.perf_counter()
+        stats = self.stats
+        stats.queries += 1
+        best: Optional[Tuple[float, GestureTemplate]] = None
+        best_d = math.inf
+        budget = self.max_dtw
+        index = self.library.index
+        # una query per durata, i lower bound di tutti i template in un'unica espressione
+        queries, valid = make_queries(track_array(samples), now, index.durations)
+        lbs = index.lower_bounds(queries, valid)
+        n_valid = int(valid[index.group].sum())
+        stats.lower_bounds += n_valid
+        ok = np.flatnonzero(lbs <= index.thresholds)
+        stats.pruned += n_valid - len(ok)
+        candidates = [i for i in ok[np.argsort(lbs[ok], kind="stable")].tolist()
+                      if self._cooldown_until.get(index.templates[i].name, 0.0) <= now]
+        for i in candidates:
+            lb = float(lbs[i])
+            limit = min(best_d, float(index.thresholds[i]))
+            if lb > limit:
+                stats.pruned += 1
+                continue
+            if budget == 0:
+                stats.over_budget += 1
+                continue
+            budget -= 1
+            stats.full_dtw += 1
+            d = dtw_distance(queries[index.group[i]], index.series[i], self.library.band, abandon_above=limit)
+            if d == math.inf:
+                stats.abandoned += 1
+            elif d <= limit:
+                best_d, best = d, (d, index.templates[i])
+        stats.match_ms.add((time.perf_counter() - start) * 1000.0)
+        return best
+
+
+class CombinedDetector:
+    """Runs the primary detector (rules or classifier) and, when it reports
+    nothing, the template matcher; both keep their temporal state every frame."""
+
+    def __init__(self, primary: Any, templates: TemplateMatcher) -> None:
+        self.primary = primary
+        self.templates = templates
+
+    def detect(self, hands: List[HandLandmarks], now: Optional[float] = None) -> Optional[GestureEvent]:
+        if now is None:
+            now = time.time()
+        event = self.primary.detect(hands, now=now)
+        # con un evento delle regole i template aggiornano solo le traiettorie
+        template_event = self.templates.detect(hands, now=now, match=event is None)
+        return event or template_event
@@ -1,71 +1,148 @@
-from __future__ import annotations
-from typing import List
-
-import cv2
-import numpy as np
-import mediapipe as mp
-
-from src.utils.types import HandLandmarks
-
-mp_hands = mp.solutions.hands
-
-
-class HandTracker:
-    def __init__(self, max_num_hands: int = 2, detection_confidence: float = 0.6, tracking_confidence: float = 0.6):
-        self.hands = mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=max_num_hands,
-            min_detection_confidence=detection_confidence,
-            min_tracking_confidence=tracking_confidence,
-            model_complexity=1,
-        )
-        self._drawer = mp.solutions.drawing_utils
-        self._drawer_style = mp.solutions.drawing_styles
-
-    def process(self, frame_bgr: np.ndarray) -> List[HandLandmarks]:            
-        h, w = frame_bgr.shape[:2]
-        frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-        result = self.hands.process(frame_rgb)
-        hands: List[HandLandmarks] = []
-        if result.multi_hand_landmarks:
-            for idx, (lm, handedness) in enumerate(zip(result.multi_hand_landmarks, result.multi_handedness)):
-                pts = []
-                for p in lm.landmark:
-                    x = int(p.x * w)
-                    y = int(p.y * h)
-                    pts.append((x, y))
-                label = handedness.classification[0].label  # 'Left' or 'Right'
-                score = handedness.classification[0].score
-                hands.append(HandLandmarks(points=pts, handedness=label, score=score))
-        return hands
-
-    def draw(self, frame_bgr: np.ndarray, hands: List[HandLandmarks]) -> np.ndarray:
-        # For drawing we re-run mediapipe to access landmark connections; alternatively draw simple circles/lines.
-        # Here we'll draw simple circles and lines for performance.
-        out = frame_bgr.copy()
-        for hand in hands:
-            # draw points
-            for (x, y) in hand.points:
-                cv2.circle(out, (x, y), 3, (0, 255, 0), -1)
-            # draw some key connections (approx subset)
-            def line(i, j):
-                cv2.line(out, hand.points[i], hand.points[j], (0, 200, 0), 2)
-            # palm
-            palm = [(0,1),(1,2),(2,5),(5,9),(9,13),(13,17),(17,0)]
-            for a,b in palm:
-                line(a,b)
-            # fingers chains
-            chains = [
-                [0, 1, 2, 3, 4],
-                [0, 5, 6, 7, 8],
-                [0, 9,10,11,12],
-                [0,13,14,15,16],
-                [0,17,18,19,20],
-            ]
-            for chain in chains:
-                for i in range(len(chain)-1):
-                    line(chain[i], chain[i+1])
-        return out
-
-    def close(self):
-        self.hands.close()
+from __future__ import annotations
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+import mediapipe as mp
+
+from src.utils.types import HandLandmarks
+
+mp_hands = mp.solutions.hands
+
+
+class HandTracker:
+    def __init__(self, max_num_hands: int = 2, detection_confidence: float = 0.6, tracking_confidence: float = 0.6,
+                 model_complexity: int = 1, inference_width: Optional[int] = None):
+        self._options = dict(
+            static_image_mode=False,
+            max_num_hands=max_num_hands,
+            min_detection_confidence=detection_confidence,
+            min_tracking_confidence=tracking_confidence,
+        )
+        self.model_complexity = model_complexity
+        self.hands = self._make_hands(model_complexity)
+        # frame ridotto a questa larghezza prima dell'inferenza (None = intero);
+        # i landmark sono normalizzati, quindi tornano alle coordinate del frame originale
+        self.inference_width = inference_width
+        # grafo MediaPipe costruito in background da set_model_complexity
+        self._pending: Optional[Tuple[int, Any]] = None
+        self._pending_lock = threading.Lock()
+        self._drawer = mp.solutions.drawing_utils
+        self._drawer_style = mp.solutions.drawing_styles
+        # tempi dell'ultimo warm_up (ms), vuoto se non eseguito
+        self.warmup_ms: Dict[str, float] = {}
+
+    def _make_hands(self, model_complexity: int) -> Any:
+        return mp_hands.Hands(model_complexity=model_complexity, **self._options)
+
+    def set_model_complexity(self, model_complexity: int) -> None:
+        """Switch model without stalling the caller: the new graph is built (and run
+        once) in a background thread and swapped in by the next ``process()``."""
+        if model_complexity == self.model_complexity:
+            return
+
+        def build() -> None:
+            hands = self._make_hands(model_complexity)
+            hands.process(np.zeros((64, 64, 3), dtype=np.uint8))
+            with self._pending_lock:
+                previous, self._pending = self._pending, (model_complexity, hands)
+            if previous is not None:
+                previous[1].close()
+
+        threading.Thread(target=build, daemon=True, name="tracker-reconfigure").start()
+
+    def _swap_pending(self) -> None:
+        with self._pending_lock:
+            pending, self._pending = self._pending, None
+        if pending is not None:
+            old = self.hands
+            self.model_complexity, self.hands = pending
+            old.close()
+
+    def process(self, frame_bgr: np.ndarray) -> List[HandLandmarks]:            
+        if self._pending is not None:
+            self._swap_pending()
+        h, w = frame_bgr.shape[:2]
+        if self.inference_width and w > self.inference_width:
+            small_h = max(1, int(round(h * self.inference_width / w)))
+            frame_bgr = cv2.resize(frame_bgr, (self.inference_width, small_h), interpolation=cv2.INTER_AREA)
+        frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        result = self.hands.process(frame_rgb)
+        hands: List[HandLandmarks] = []
+        if result.multi_hand_landmarks:
+            for idx, (lm, handedness) in enumerate(zip(result.multi_hand_landmarks, result.multi_handedness)):
+                pts = []
+                for p in lm.landmark:
+                    x = int(p.x * w)
+                    y = int(p.y * h)
+                    pts.append((x, y))
+                label = handedness.classification[0].label  # 'Left' or 'Right'
+                score = handedness.classification[0].score
+                hands.append(HandLandmarks(points=pts, handedness=label, score=score))
+        return hands
+
+    def warm_up(self, width: int, height: int, tracking_frames: int = 3) -> Dict[str, float]:
+        """Run the models once on synthetic frames at the inference resolution.
+
+        A blank frame starts the MediaPipe graph and exercises palm detection;
+        a drawn hand is then detected and followed for ``tracking_frames`` frames
+        (landmark model); a final blank frame drops the synthetic track. Returns
+        the timings in ms plus ``tracked`` (1.0 if the tracking path ran).
+        """
+        from src.utils.synthetic_hands import render_hand_image
+
+        blank = np.zeros((height, width, 3), dtype=np.uint8)
+        hand = render_hand_image(width, height)
+        start = time.perf_counter()
+        self.process(blank)
+        t_first = time.perf_counter()
+        self.process(blank)
+        t_detect = time.perf_counter()
+        found = 0
+        for _ in range(max(1, tracking_frames)):
+            found += 1 if self.process(hand) else 0
+        t_track = time.perf_counter()
+        self.process(blank)
+        end = time.perf_counter()
+        self.warmup_ms = {
+            "first_ms": (t_first - start) * 1000.0,
+            "detection_ms": (t_detect - t_first) * 1000.0,
+            "tracking_ms": (t_track - t_detect) * 1000.0 / max(1, tracking_frames),
+            "total_ms": (end - start) * 1000.0,
+            "tracked": 1.0 if found else 0.0,
+        }
+        return self.warmup_ms
+
+    def draw(self, frame_bgr: np.ndarray, hands: List[HandLandmarks]) -> np.ndarray:
+        # For drawing we re-run mediapipe to access landmark connections; alternatively draw simple circles/lines.
+        # Here we'll draw simple circles and lines for performance.
+        out = frame_bgr.copy()
+        for hand in hands:
+            # draw points
+            for (x, y) in hand.points:
+                cv2.circle(out, (x, y), 3, (0, 255, 0), -1)
+            # draw some key connections (approx subset)
+            def line(i, j):
+                cv2.line(out, hand.points[i], hand.points[j], (0, 200, 0), 2)
+            # palm
+            palm = [(0,1),(1,2),(2,5),(5,9),(9,13),(13,17),(17,0)]
+            for a,b in palm:
+                line(a,b)
+            # fingers chains
+            chains = [
+                [0, 1, 2, 3, 4],
+                [0, 5, 6, 7, 8],
+                [0, 9,10,11,12],
+                [0,13,14,15,16],
+                [0,17,18,19,20],
+            ]
+            for chain in chains:
+                for i in range(len(chain)-1):
+                    line(chain[i], chain[i+1])
+        return out
+
+    def close(self):
+        self._swap_pending()
+        self.hands.close()
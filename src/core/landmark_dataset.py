@@ -0,0 +1,375 @@
+"""
+Columnar landmark dataset: fixed-size float32 records, one per hand per
+frame, in memory-mappable chunks, for replay, training and analysis.
+
+A dataset is a directory::
+
+    meta.json          layout, sessions, labels, chunk list and the indexes
+    chunk-00000.f32    RECORD_WIDTH x chunk_records float32, column-major
+    chunk-00001.f32    ...
+
+Record columns (``COLUMNS``): ``t`` (seconds from the start of the session),
+``track`` (hand identity across frames), the 21 points as x, y, z (pixel
+coordinates of ``HandLandmarks``; z is 0, the tracker keeps no depth),
+``handedness`` (0 Left, 1 Right), ``score``, ``label`` (index in
+``labels``, -1 without) and ``session`` (index in ``sessions``).
+
+Each chunk stores every column contiguously, so ``column("score")`` or the
+time column of a chunk is a plain slice of the memory map, and
+``records(a, b)`` is a (n, RECORD_WIDTH) view (no parsing, no copy within a
+chunk). Chunks have a fixed capacity: the last one is filled in place by
+``append``, new ones are created when it is full.
+
+Indexes, kept in ``meta.json``:
+
+- by time: the segments (contiguous records of one session within one chunk)
+  with their time span; within a segment records are in time order, so a
+  time range is a binary search on the chunk's ``t`` column;
+- by label: runs of consecutive records with the same label.
+"""
+
+from __future__ import annotations
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.types import HandLandmarks
+
+FORMAT_VERSION = 1
+N_POINTS = 21
+COLUMNS: Tuple[str, ...] = (
+    ("t", "track")
+    + tuple(f"{axis}{i}" for i in range(N_POINTS) for axis in "xyz")
+    + ("handedness", "score", "label", "session")
+)
+RECORD_WIDTH = len(COLUMNS)
+COLUMN = {name: i for i, name in enumerate(COLUMNS)}
+POINTS = slice(COLUMN["x0"], COLUMN["z20"] + 1)
+DEFAULT_CHUNK_RECORDS = 65536  # ~18 MB per chunk
+HANDEDNESS = ("Left", "Right")
+
+
+def _chunk_name(index: int) -> str:
+    return f"chunk-{index:05d}.f32"
+
+
+class _TrackAssigner:
+    """Track ids by nearest wrist to the previous frame's hands (greedy)."""
+
+    def __init__(self, max_jump: float = 120.0) -> None:
+        self.max_jump = max_jump
+        self._last: Dict[int, Tuple[float, float]] = {}
+        self._next = 0
+
+    def reset(self) -> None:
+        self._last = {}
+
+    def assign(self, wrists: Sequence[Tuple[float, float]]) -> List[int]:
+        ids: List[int] = [-1] * len(wrists)
+        pairs = sorted(((wx - px) ** 2 + (wy - py) ** 2, i, track)
+                       for i, (wx, wy) in enumerate(wrists) for track, (px, py) in self._last.items())
+        used = set()
+        for dist2, i, track in pairs:
+            if ids[i] < 0 and track not in used and dist2 <= self.max_jump ** 2:
+                ids[i] = track
+                used.add(track)
+        for i in range(len(ids)):
+            if ids[i] < 0:
+                ids[i] = self._next
+                self._next += 1
+        self._last = {track: wrists[i] for i, track in enumerate(ids)}
+        return ids
+
+
+class LandmarkDataset:
+    def __init__(self, path: str, meta: Dict[str, Any], writable: bool) -> None:
+        self.path = path
+        self.writable = writable
+        self.chunk_records: int = meta["chunk_records"]
+        self.sessions: List[str] = meta["sessions"]
+        self.labels: List[str] = meta["labels"]
+        self.chunk_sizes: List[int] = meta["chunks"]
+        # [chunk, start, stop, session, t_min, t_max]
+        self.segments: List[List[Any]] = meta["segments"]
+        # label -> [[start, stop], ...] (indici globali dei record)
+        self.label_runs: Dict[str, List[List[int]]] = meta["label_runs"]
+        self._maps: Dict[int, np.memmap] = {}
+        self._tracks: Dict[int, _TrackAssigner] = {}
+
+    # --- apertura ---------------------------------------------------------
+
+    @classmethod
+    def create(cls, path: str, chunk_records: int = DEFAULT_CHUNK_RECORDS) -> "LandmarkDataset":
+        if os.path.exists(os.path.join(path, "meta.json")):
+            raise FileExistsError(f"{path} already holds a dataset")
+        os.makedirs(path, exist_ok=True)
+        dataset = cls(path, {"chunk_records": chunk_records, "sessions": [], "labels": [], "chunks": [],
+                             "segments": [], "label_runs": {}}, writable=True)
+        dataset.flush()
+        return dataset
+
+    @classmethod
+    def open(cls, path: str, mode: str = "r") -> "LandmarkDataset":
+        """``mode`` "r" (read-only maps) or "a" (append)."""
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("version") != FORMAT_VERSION or meta.get("columns") != list(COLUMNS):
+            raise ValueError(f"{path}: unsupported dataset layout (version {meta.get('version')})")
+        return cls(path, meta, writable=mode == "a")
+
+    def __len__(self) -> int:
+        return sum(self.chunk_sizes)
+
+    def __enter__(self) -> "LandmarkDataset":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def chunk(self, index: int) -> np.ndarray:
+        """Filled part of chunk ``index``, shape (RECORD_WIDTH, n): a view of the map."""
+        mm = self._maps.get(index)
+        if mm is None:
+            mode = "r+" if self.writable else "r"
+            mm = self._maps[index] = np.memmap(os.path.join(self.path, _chunk_name(index)), dtype=np.float32,
+                                               mode=mode, shape=(RECORD_WIDTH, self.chunk_records))
+        return mm[:, :self.chunk_sizes[index]]
+
+    # --- scrittura --------------------------------------------------------
+
+    def _code(self, names: List[str], name: str) -> int:
+        if name not in names:
+            names.append(name)
+        return names.index(name)
+
+    def append_records(self, block: np.ndarray) -> Tuple[int, int]:
+        """Append rows of RECORD_WIDTH float32 values (in time order within
+        each session); returns the range of the new records."""
+        if not self.writable:
+            raise PermissionError("dataset opened read-only")
+        block = np.asarray(block, dtype=np.float32).reshape(-1, RECORD_WIDTH)
+        first = len(self)
+        done = 0
+        while done < len(block):
+            if not self.chunk_sizes or self.chunk_sizes[-1] == self.chunk_records:
+                index = len(self.chunk_sizes)
+                self.chunk_sizes.append(0)
+                np.memmap(os.path.join(self.path, _chunk_name(index)), dtype=np.float32, mode="w+",
+                          shape=(RECORD_WIDTH, self.chunk_records)).flush()
+            index = len(self.chunk_sizes) - 1
+            offset = self.chunk_sizes[index]
+            take = min(len(block) - done, self.chunk_records - offset)
+            part = block[done:done + take]
+            self.chunk(index)  # apre la mappa
+            self._maps[index][:, offset:offset + take] = part.T
+            self.chunk_sizes[index] += take
+            self._index(index, offset, part, first + done)
+            done += take
+        return first, first + len(block)
+
+    def _index(self, chunk: int, offset: int, part: np.ndarray, start: int) -> None:
+        sessions = part[:, COLUMN["session"]].astype(np.int64)
+        labels = part[:, COLUMN["label"]].astype(np.int64)
+        times = part[:, COLUMN["t"]]
+        # segmenti di sessione e run di etichetta: confini dove il valore cambia
+        for lo, hi in _runs(sessions):
+            session = int(sessions[lo])
+            t_min, t_max = float(times[lo:hi].min()), float(times[lo:hi].max())
+            last = self.segments[-1] if self.segments else None
+            if last is not None and last[0] == chunk and last[3] == session and last[2] == offset + lo:
+                last[2] = offset + hi
+                last[5] = max(last[5], t_max)
+            else:
+                self.segments.append([chunk, offset + lo, offset + hi, session, t_min, t_max])
+        for lo, hi in _runs(labels):
+            if labels[lo] < 0:
+                continue
+            runs = self.label_runs.setdefault(self.labels[int(labels[lo])], [])
+            if runs and runs[-1][1] == start + lo:
+                runs[-1][1] = start + hi
+            else:
+                runs.append([start + lo, start + hi])
+
+    def append_frame(self, t: float, hands: Sequence[HandLandmarks], session: str,
+                     labels: Optional[Sequence[Optional[str]]] = None) -> Tuple[int, int]:
+        """Append the hands of one frame (``labels``: one per hand, or None)."""
+        session_code = self._code(self.sessions, session)
+        tracks = self._tracks.setdefault(session_code, _TrackAssigner())
+        ids = tracks.assign([(float(h.points[0][0]), float(h.points[0][1])) for h in hands])
+        block = np.zeros((len(hands), RECORD_WIDTH), dtype=np.float32)
+        for row, hand, track in zip(block, hands, ids):
+            row[COLUMN["t"]] = t
+            row[COLUMN["track"]] = track
+            points = row[POINTS].reshape(N_POINTS, 3)
+            points[:, :2] = np.asarray(hand.points, dtype=np.float32)[:, :2]
+            row[COLUMN["handedness"]] = HANDEDNESS.index(hand.handedness) if hand.handedness in HANDEDNESS else 0
+            row[COLUMN["score"]] = hand.score
+            row[COLUMN["session"]] = session_code
+        label_list = list(labels) if labels is not None else [None] * len(hands)
+        for row, label in zip(block, label_list):
+            row[COLUMN["label"]] = -1 if label is None else self._code(self.labels, label)
+        return self.append_records(block)
+
+    def flush(self) -> None:
+        for mm in self._maps.values():
+            if self.writable:
+                mm.flush()
+        meta = {
+            "version": FORMAT_VERSION,
+            "columns": list(COLUMNS),
+            "chunk_records": self.chunk_records,
+            "records": len(self),
+            "sessions": self.sessions,
+            "labels": self.labels,
+            "chunks": self.chunk_sizes,
+            "segments": self.segments,
+            "label_runs": self.label_runs,
+        }
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, separators=(",", ":"))
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def close(self) -> None:
+        if self.writable:
+            self.flush()
+        self._maps.clear()
+
+    # --- lettura ----------------------------------------------------------
+
+    def _locate(self, record: int) -> Tuple[int, int]:
+        return record // self.chunk_records, record % self.chunk_records
+
+    def _pieces(self, start: int, stop: int) -> Iterator[np.ndarray]:
+        while start < stop:
+            chunk, offset = self._locate(start)
+            take = min(stop - start, self.chunk_records - offset)
+            yield self.chunk(chunk)[:, offset:offset + take]
+            start += take
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """(n, RECORD_WIDTH) records; a view of the map when within one chunk."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        pieces = [p.T for p in self._pieces(start, stop)]
+        if len(pieces) == 1:
+            return pieces[0]
+        return np.concatenate(pieces) if pieces else np.zeros((0, RECORD_WIDTH), dtype=np.float32)
+
+    def column(self, name: str, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """One column; a contiguous view of the map when within one chunk."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        pieces = [p[COLUMN[name]] for p in self._pieces(start, stop)]
+        if len(pieces) == 1:
+            return pieces[0]
+        return np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+
+    def points(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """(n, 21, 3) points."""
+        return self.records(start, stop)[:, POINTS].reshape(-1, N_POINTS, 3)
+
+    def time_range(self, t0: float, t1: float, session: Optional[str] = None) -> List[Tuple[int, int]]:
+        """Record ranges with ``t0 <= t < t1`` (of one session, or of all)."""
+        code = None if session is None else self.sessions.index(session)
+        ranges: List[Tuple[int, int]] = []
+        for chunk, lo, hi, seg_session, t_min, t_max in self.segments:
+            if (code is not None and seg_session != code) or t_max < t0 or t_min >= t1:
+                continue
+            times = self.chunk(chunk)[COLUMN["t"], lo:hi]
+            a = lo + int(np.searchsorted(times, t0, side="left"))
+            b = lo + int(np.searchsorted(times, t1, side="left"))
+            if a < b:
+                base = chunk * self.chunk_records
+                ranges.append((base + a, base + b))
+        return ranges
+
+    def label_ranges(self, label: str) -> List[Tuple[int, int]]:
+        return [(a, b) for a, b in self.label_runs.get(label, [])]
+
+    def session_ranges(self, session: str) -> List[Tuple[int, int]]:
+        code = self.sessions.index(session)
+        return [(chunk * self.chunk_records + lo, chunk * self.chunk_records + hi)
+                for chunk, lo, hi, seg_session, _, _ in self.segments if seg_session == code]
+
+    def hands(self, start: int, stop: int) -> List[HandLandmarks]:
+        """Records back as ``HandLandmarks`` (for replay into a detector)."""
+        rows = self.records(start, stop)
+        points = rows[:, POINTS].reshape(-1, N_POINTS, 3)[:, :, :2].round().astype(np.int64)
+        return [HandLandmarks(points=[(int(x), int(y)) for x, y in pts],
+                              handedness=HANDEDNESS[int(row[COLUMN["handedness"]])],
+                              score=float(row[COLUMN["score"]]))
+                for pts, row in zip(points, rows)]
+
+    def frames(self, session: str) -> Iterator[Tuple[float, List[HandLandmarks], List[Optional[str]]]]:
+        """(t, hands, labels) per frame of a session, in time order."""
+        for start, stop in self.session_ranges(session):
+            times = self.column("t", start, stop)
+            labels = self.column("label", start, stop).astype(np.int64)
+            hands = self.hands(start, stop)
+            for lo, hi in _runs(times):
+                yield (float(times[lo]), hands[lo:hi],
+                       [self.labels[c] if c >= 0 else None for c in labels[lo:hi]])
+
+    def info(self) -> Dict[str, Any]:
+        counts = {label: sum(b - a for a, b in runs) for label, runs in self.label_runs.items()}
+        return {
+            "path": self.path,
+            "records": len(self),
+            "chunks": len(self.chunk_sizes),
+            "chunk_records": self.chunk_records,
+            "record_bytes": RECORD_WIDTH * 4,
+            "sessions": len(self.sessions),
+            "labels": counts,
+            "bytes": sum(os.path.getsize(os.path.join(self.path, _chunk_name(i)))
+                         for i in range(len(self.chunk_sizes))),
+        }
+
+
+def _runs(values: np.ndarray) -> Iterator[Tuple[int, int]]:
+    """[lo, hi) runs of equal consecutive values."""
+    if len(values) == 0:
+        return
+    edges = np.flatnonzero(values[1:] != values[:-1]) + 1
+    bounds = np.concatenate(([0], edges, [len(values)]))
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        yield int(lo), int(hi)
+
+
+# --- conversione ------------------------------------------------------------
+
+
+def append_recording(dataset: LandmarkDataset, path: str, session: Optional[str] = None,
+                     label: Optional[str] = None) -> int:
+    """Append a JSON-lines recording (``frame_recorder`` or ``batch_videos``
+    output; ``session`` keys split it into sessions). Labels come from the
+    hand, then the frame, then ``label``. Returns the records added."""
+    base = session or os.path.splitext(os.path.basename(path))[0]
+    added = 0
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "hands" not in record or not record["hands"]:
+                continue
+            name = f"{base}:{record['session']}" if "session" in record else base
+            hands = [HandLandmarks(points=[(int(p[0]), int(p[1])) for p in h["points"]],
+                                   handedness=h.get("handedness", "Left"), score=float(h.get("score", 1.0)))
+                     for h in record["hands"]]
+            labels = [h.get("label", record.get("label", label)) for h in record["hands"]]
+            a, b = dataset.append_frame(float(record["t"]), hands, name, labels)
+            added += b - a
+    return added
+
+
+def recordings_in(paths: Iterable[str]) -> List[str]:
+    """JSON-lines files among ``paths`` (directories: their ``*.jsonl``)."""
+    found: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(sorted(os.path.join(path, n) for n in os.listdir(path) if n.endswith(".jsonl")))
+        else:
+            found.append(path)
+    return found
@@ -0,0 +1,164 @@
+"""
+Binary protocol between thin clients (running MediaPipe locally) and the
+landmark ingestion server. Little-endian, one message = ``<HB`` header
+(payload length, type) followed by the payload.
+
+Client -> server:
+
+- ``HELLO``: protocol version (``B``) + session id (UTF-8, empty = assigned);
+- ``FRAME``: ``<IdB`` frame seq, client timestamp (s), hand count, then per
+  hand ``<BB`` handedness (0 Left, 1 Right) and score (0-255) followed by the
+  21 points as 42 ``int16`` pixel coordinates (86 bytes per hand);
+- ``SNAPSHOT_REQ``: ask for the detector state;
+- ``RESTORE``: a blob from ``SNAPSHOT`` (possibly from another server);
+- ``BYE``: the server closes the connection.
+
+Server -> client:
+
+- ``WELCOME``: the session id (reply to HELLO and RESTORE);
+- ``EVENT``: ``<IHB`` seq of the frame that triggered it, confidence
+  (0-65535), hands involved, then the gesture name (UTF-8);
+- ``SNAPSHOT``: zlib-compressed JSON of the session id and detector state;
+- ``ERROR``: UTF-8 message, the server closes the connection after it.
+"""
+
+from __future__ import annotations
+import json
+import struct
+import zlib
+from typing import Any, Dict, List, Tuple
+
+from src.utils.types import GestureEvent, HandLandmarks
+
+VERSION = 1
+
+HELLO = 1
+FRAME = 2
+SNAPSHOT_REQ = 3
+RESTORE = 4
+BYE = 5
+EVENT = 128
+WELCOME = 129
+SNAPSHOT = 130
+ERROR = 255
+
+HEADER = struct.Struct("<HB")
+FRAME_HEAD = struct.Struct("<IdB")
+HAND = struct.Struct("<BB42h")
+EVENT_HEAD = struct.Struct("<IHB")
+MAX_PAYLOAD = 0xFFFF
+MAX_HANDS = 4
+
+HANDEDNESS = ("Left", "Right")
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+def pack(msg_type: int, payload: bytes = b"") -> bytes:
+    if len(payload) > MAX_PAYLOAD:
+        raise ProtocolError(f"payload of {len(payload)} bytes exceeds {MAX_PAYLOAD}")
+    return HEADER.pack(len(payload), msg_type) + payload
+
+
+def encode_hello(session_id: str = "") -> bytes:
+    return pack(HELLO, bytes([VERSION]) + session_id.encode("utf-8"))
+
+
+def decode_hello(payload: bytes) -> Tuple[int, str]:
+    if not payload:
+        raise ProtocolError("empty HELLO")
+    return payload[0], payload[1:].decode("utf-8")
+
+
+def encode_hand(points: Any, handedness: str = "Left", score: float = 1.0) -> bytes:
+    """One hand record; ``points`` is 21 (x, y) pairs in pixels."""
+    flat = [int(round(v)) for p in points for v in p[:2]]
+    return HAND.pack(1 if handedness == "Right" else 0, max(0, min(255, int(score * 255))), *flat)
+
+
+def encode_frame(seq: int, timestamp: float, hands: List[HandLandmarks]) -> bytes:
+    body = b"".join(encode_hand(h.points, h.handedness, h.score) for h in hands)
+    return encode_frame_raw(seq, timestamp, len(hands), body)
+
+
+def encode_frame_raw(seq: int, timestamp: float, n_hands: int, hand_bytes: bytes) -> bytes:
+    """FRAME with hand records already encoded (load generators pre-encode them)."""
+    return pack(FRAME, FRAME_HEAD.pack(seq & 0xFFFFFFFF, timestamp, n_hands) + hand_bytes)
+
+
+def decode_frame(payload: bytes) -> Tuple[int, float, List[HandLandmarks]]:
+    if len(payload) < FRAME_HEAD.size:
+        raise ProtocolError("short FRAME")
+    seq, timestamp, n_hands = FRAME_HEAD.unpack_from(payload)
+    if n_hands > MAX_HANDS or len(payload) != FRAME_HEAD.size + n_hands * HAND.size:
+        raise ProtocolError(f"FRAME with {n_hands} hands has {len(payload)} bytes")
+    hands: List[HandLandmarks] = []
+    offset = FRAME_HEAD.size
+    for _ in range(n_hands):
+        values = HAND.unpack_from(payload, offset)
+        offset += HAND.size
+        it = iter(values[2:])
+        hands.append(HandLandmarks(points=list(zip(it, it)), handedness=HANDEDNESS[values[0] & 1],
+                                   score=values[1] / 255.0))
+    return seq, timestamp, hands
+
+
+def encode_event(seq: int, event: GestureEvent) -> bytes:
+    conf = max(0, min(0xFFFF, int(round(event.confidence * 0xFFFF))))
+    return pack(EVENT, EVENT_HEAD.pack(seq & 0xFFFFFFFF, conf, event.hands_involved) + event.name.encode("utf-8"))
+
+
+def decode_event(payload: bytes) -> Tuple[int, GestureEvent]:
+    seq, conf, hands = EVENT_HEAD.unpack_from(payload)
+    name = payload[EVENT_HEAD.size:].decode("utf-8")
+    return seq, GestureEvent(name=name, confidence=conf / 0xFFFF, hands_involved=hands)
+
+
+def encode_snapshot(session_id: str, state: Dict[str, Any]) -> bytes:
+    blob = json.dumps({"version": VERSION, "session": session_id, "state": state},
+                      separators=(",", ":")).encode("utf-8")
+    return zlib.compress(blob)
+
+
+def decode_snapshot(blob: bytes) -> Tuple[str, Dict[str, Any]]:
+    try:
+        data = json.loads(zlib.decompress(blob).decode("utf-8"))
+    except (zlib.error, ValueError) as e:
+        raise ProtocolError(f"bad snapshot: {e}")
+    if not isinstance(data, dict):
+        raise ProtocolError("bad snapshot: not an object")
+    if data.get("version") != VERSION:
+        raise ProtocolError(f"snapshot version {data.get('version')} != {VERSION}")
+    if not isinstance(data.get("session"), str) or not isinstance(data.get("state"), dict):
+        raise ProtocolError("bad snapshot: missing session or state")
+    return data["session"], data["state"]
+
+
+class MessageReader:
+    """Splits a byte stream into ``(type, payload)`` messages; feed it whatever
+    arrives from the socket."""
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+
+    def feed(self, data: bytes) -> List[Tuple[int, bytes]]:
+        self._buf += data
+        messages: List[Tuple[int, bytes]] = []
+        offset = 0
+        end = len(self._buf)
+        while end - offset >= HEADER.size:
+            length, msg_type = HEADER.unpack_from(self._buf, offset)
+            start = offset + HEADER.size
+            if end - start < length:
+                break
+            messages.append((msg_type, bytes(self._buf[start:start + length])))
+            offset = start + length
+        if offset:
+            del self._buf[:offset]
+        return messages
+
+    def pending(self) -> int:
+        return len(self._buf)
+
@@ -0,0 +1,218 @@
+"""
+Landmark ingestion server: thin clients stream hand landmarks (see
+``landmark_protocol``) and get ``GestureEvent``s back, one ``GestureDetector``
+per session.
+
+Everything runs in one asyncio loop on one thread: connections are plain
+``asyncio.Protocol`` objects (no per-connection task or stream buffers), each
+message is decoded and run through the session's detector directly in
+``data_received``, and an event is written back before the next message is
+read, so the reply latency is the detection time plus the network. Idle
+sessions are swept by a single periodic task rather than one timer each,
+which keeps thousands of mostly quiet connections cheap.
+
+Detector state can be snapshotted and restored, so a session can move to
+another server: the client asks for ``SNAPSHOT``, reconnects elsewhere and
+sends the blob as ``RESTORE``.
+"""
+
+from __future__ import annotations
+import asyncio
+import struct
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from src.core import landmark_protocol as proto
+from src.core.gesture_detector import GestureDetector
+from src.utils.metrics import RollingStats
+
+
+class Session:
+    def __init__(self, session_id: str) -> None:
+        self.id = session_id
+        self.detector = GestureDetector()
+        self.frames = 0
+        self.events = 0
+        self.last_seen = time.monotonic()
+
+
+class _Connection(asyncio.Protocol):
+    def __init__(self, server: "LandmarkServer") -> None:
+        self.server = server
+        self.reader = proto.MessageReader()
+        self.session: Optional[Session] = None
+        self.transport: Optional[asyncio.Transport] = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+        self.server.connections += 1
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.server.connections -= 1
+        if self.session is not None:
+            self.server._detach(self)
+
+    def data_received(self, data: bytes) -> None:
+        self.server.bytes_in += len(data)
+        try:
+            for msg_type, payload in self.reader.feed(data):
+                self._handle(msg_type, payload)
+                if self.transport is None or self.transport.is_closing():
+                    return
+        except (proto.ProtocolError, UnicodeDecodeError, KeyError, TypeError, ValueError, struct.error) as e:
+            self.fail(str(e))
+
+    def _handle(self, msg_type: int, payload: bytes) -> None:
+        server = self.server
+        if msg_type == proto.FRAME:
+            session = self.session
+            if session is None:
+                raise proto.ProtocolError("FRAME before HELLO")
+            seq, timestamp, hands = proto.decode_frame(payload)
+            start = time.perf_counter()
+            event = session.detector.detect(hands, now=timestamp)
+            server.detect_ms.add((time.perf_counter() - start) * 1000.0)
+            session.frames += 1
+            server.frames += 1
+            if event is not None:
+                session.events += 1
+                server.events += 1
+                self.transport.write(proto.encode_event(seq, event))
+        elif msg_type == proto.HELLO:
+            version, session_id = proto.decode_hello(payload)
+            if version != proto.VERSION:
+                raise proto.ProtocolError(f"protocol version {version} != {proto.VERSION}")
+            server._attach(self, session_id)
+            self.transport.write(proto.pack(proto.WELCOME, self.session.id.encode("utf-8")))
+        elif msg_type == proto.SNAPSHOT_REQ:
+            if self.session is None:
+                raise proto.ProtocolError("SNAPSHOT_REQ before HELLO")
+            blob = proto.encode_snapshot(self.session.id, self.session.detector.snapshot())
+            server.snapshots += 1
+            self.transport.write(proto.pack(proto.SNAPSHOT, blob))
+        elif msg_type == proto.RESTORE:
+            session_id, state = proto.decode_snapshot(payload)
+            if self.session is None or self.session.id != session_id:
+                server._attach(self, session_id)
+            self.session.detector.restore(state)
+            server.restores += 1
+            self.transport.write(proto.pack(proto.WELCOME, self.session.id.encode("utf-8")))
+        elif msg_type == proto.BYE:
+            self.transport.close()
+        else:
+            raise proto.ProtocolError(f"unknown message type {msg_type}")
+        if self.session is not None:
+            self.session.last_seen = time.monotonic()
+
+    def fail(self, message: str) -> None:
+        self.server.errors += 1
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.write(proto.pack(proto.ERROR, message.encode("utf-8")[:200]))
+            self.transport.close()
+
+
+class LandmarkServer:
+    def __init__(self, host: str = "0.0.0.0", port: int = 7420, idle_timeout_s: float = 60.0) -> None:
+        self.host = host
+        self.port = port
+        # sessioni senza messaggi da più di così vengono chiuse
+        self.idle_timeout_s = idle_timeout_s
+        self.sessions: Dict[str, _Connection] = {}
+        self.connections = 0
+        self.peak_sessions = 0
+        self.frames = 0
+        self.events = 0
+        self.snapshots = 0
+        self.restores = 0
+        self.errors = 0
+        self.expired = 0
+        self.bytes_in = 0
+        self.detect_ms = RollingStats(5000)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        # backlog ampio: i generatori di carico aprono migliaia di connessioni insieme
+        self._server = await loop.create_server(lambda: _Connection(self), self.host, self.port, backlog=4096)
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+        self._sweeper = asyncio.create_task(self._sweep())
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        if self._server is not None:
+            self._server.close()
+            for conn in list(self.sessions.values()):
+                conn.transport.close()
+            await self._server.wait_closed()
+
+    def _attach(self, conn: _Connection, session_id: str) -> None:
+        if conn.session is not None:
+            self._detach(conn)
+        session_id = session_id or uuid.uuid4().hex[:12]
+        previous = self.sessions.get(session_id)
+        if previous is not None and previous is not conn:
+            # stesso id da una nuova connessione (client riconnesso): vince l'ultima
+            previous.session = None
+            previous.fail("session taken over by a new connection")
+        conn.session = Session(session_id)
+        self.sessions[session_id] = conn
+        self.peak_sessions = max(self.peak_sessions, len(self.sessions))
+
+    def _detach(self, conn: _Connection) -> None:
+        if conn.session is not None and self.sessions.get(conn.session.id) is conn:
+            del self.sessions[conn.session.id]
+        conn.session = None
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(max(1.0, self.idle_timeout_s / 4))
+            if self.idle_timeout_s <= 0:
+                continue
+            limit = time.monotonic() - self.idle_timeout_s
+            for conn in [c for c in self.sessions.values() if c.session.last_seen < limit]:
+                self.expired += 1
+                conn.fail("idle timeout")
+
+    def stats(self) -> Dict[str, Any]:
+        detect = self.detect_ms.summary()
+        return {
+            "sessions": len(self.sessions),
+            "peak_sessions": self.peak_sessions,
+            "connections": self.connections,
+            "frames": self.frames,
+            "events": self.events,
+            "snapshots": self.snapshots,
+            "restores": self.restores,
+            "errors": self.errors,
+            "expired": self.expired,
+            "bytes_in": self.bytes_in,
+            "detect_p50_ms": round(detect["p50"], 3),
+            "detect_p95_ms": round(detect["p95"], 3),
+        }
+
+
+def raise_open_files_limit(wanted: int) -> int:
+    """Lift the soft RLIMIT_NOFILE towards ``wanted`` (one descriptor per
+    session); returns the resulting limit, or 0 where it cannot be read."""
+    try:
+        import resource
+    except ImportError:  # Windows: nessun limite da alzare
+        return 0
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+    if soft != resource.RLIM_INFINITY and soft < target:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError) as e:
+            print(f"Could not raise the open files limit to {target}: {e}")
+    return soft
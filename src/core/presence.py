@@ -0,0 +1,117 @@
+"""
+Presence detection and the idle (power-saving) state of the gesture page.
+
+``MotionDetector`` compares a tiny grayscale thumbnail of each frame with a
+running background, so it costs a fraction of a millisecond and can run on
+every frame while MediaPipe is switched off. ``IdleManager`` decides when the
+page goes idle (nobody in frame for ``idle_after_s``) and when it wakes up, and
+measures the wake latency: capture time of the frame that showed motion to the
+first frame processed again at full rate.
+"""
+
+from __future__ import annotations
+import os
+import time
+from typing import Any, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.utils.metrics import RollingStats
+
+
+class MotionDetector:
+    def __init__(self, size: Tuple[int, int] = (64, 36), threshold: int = 18, min_fraction: float = 0.01,
+                 adapt: float = 0.05) -> None:
+        self.size = size
+        # differenza minima (0-255) perché un pixel conti come cambiato
+        self.threshold = threshold
+        # frazione di pixel cambiati che vale come movimento
+        self.min_fraction = min_fraction
+        # velocità di aggiornamento dello sfondo (luce che cambia lentamente)
+        self.adapt = adapt
+        self._background: Optional[np.ndarray] = None
+        self.last_fraction = 0.0
+
+    def reset(self) -> None:
+        self._background = None
+
+    def update(self, frame_bgr: Any) -> bool:
+        """Feed a frame; True if it differs enough from the background."""
+        small = cv2.resize(frame_bgr, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+        gray = cv2.GaussianBlur(gray, (3, 3), 0)
+        if self._background is None:
+            self._background = gray
+            self.last_fraction = 0.0
+            return False
+        diff = np.abs(gray - self._background)
+        self.last_fraction = float(np.count_nonzero(diff > self.threshold)) / diff.size
+        cv2.accumulateWeighted(gray, self._background, self.adapt)
+        return self.last_fraction >= self.min_fraction
+
+
+class IdleManager:
+    """ACTIVE <-> IDLE state with the wake-latency measurement.
+
+    Call ``note_presence()`` while active whenever someone is in frame,
+    ``should_sleep()`` to check the timeout, ``wake(trigger_ts)`` on motion
+    while idle and ``frame_processed(capture_ts)`` for each fully processed
+    frame, which closes a pending wake measurement.
+    """
+
+    def __init__(self, idle_after_s: float = 60.0, idle_fps: int = 5) -> None:
+        self.idle_after_s = idle_after_s
+        self.idle_fps = idle_fps
+        self.idle = False
+        self.last_presence = time.perf_counter()
+        self.wake_ms = RollingStats(100)
+        self.last_wake_ms: Optional[float] = None
+        self.sleeps = 0
+        self._wake_trigger: Optional[float] = None
+        self._woken_at = 0.0
+
+    @classmethod
+    def from_env(cls) -> "IdleManager":
+        """TOPINI_IDLE_AFTER_S (0 disables the idle mode) and TOPINI_IDLE_FPS."""
+        return cls(float(os.environ.get("TOPINI_IDLE_AFTER_S", "60")),
+                   int(os.environ.get("TOPINI_IDLE_FPS", "5")))
+
+    @property
+    def enabled(self) -> bool:
+        return self.idle_after_s > 0
+
+    def reset(self) -> None:
+        self.idle = False
+        self._wake_trigger = None
+        self.last_presence = time.perf_counter()
+
+    def note_presence(self, now: Optional[float] = None) -> None:
+        self.last_presence = time.perf_counter() if now is None else now
+
+    def should_sleep(self, now: Optional[float] = None) -> bool:
+        now = time.perf_counter() if now is None else now
+        if self.idle or not self.enabled or now - self.last_presence < self.idle_after_s:
+            return False
+        self.idle = True
+        self.sleeps += 1
+        return True
+
+    def wake(self, trigger_ts: float, now: Optional[float] = None) -> None:
+        """Leave idle; ``trigger_ts`` is the capture time of the frame that showed motion."""
+        now = time.perf_counter() if now is None else now
+        self.idle = False
+        self._wake_trigger = trigger_ts
+        self._woken_at = now
+        self.last_presence = now
+
+    def frame_processed(self, capture_ts: float, now: Optional[float] = None) -> Optional[float]:
+        """Wake latency in ms when this is the first frame captured after waking."""
+        if self._wake_trigger is None or capture_ts < self._woken_at:
+            return None
+        now = time.perf_counter() if now is None else now
+        latency = (now - self._wake_trigger) * 1000.0
+        self._wake_trigger = None
+        self.wake_ms.add(latency)
+        self.last_wake_ms = latency
+        return latency
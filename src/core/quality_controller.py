@@ -0,0 +1,186 @@
+"""
+Adaptive quality: steps through a ladder of pipeline settings to hold an
+end-to-end latency target on whatever machine the app runs on.
+
+The controller is fed the capture→display age of every presented frame and
+samples CPU headroom; ``update()`` returns a new ``QualityLevel`` when the
+pipeline should step down (target missed or CPU saturated for
+``degrade_after_s``) or up (comfortably under target with spare CPU for
+``upgrade_after_s``). The asymmetric thresholds, dwell times and a back-off
+after a failed upgrade keep it from oscillating between two levels.
+"""
+
+from __future__ import annotations
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+from src.utils.metrics import RollingStats
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    name: str
+    inference_width: Optional[int]  # larghezza del frame passato a MediaPipe (None = intero)
+    model_complexity: int           # 0 (lite) o 1 (full)
+    inference_every: int            # inferenza ogni N frame, landmark riusati in mezzo
+    capture_resolution: Optional[Tuple[int, int]]  # None = preferenze di VideoCaptureThread
+
+
+# Dal più costoso al più leggero: prima si riduce ciò che non si vede
+# (risoluzione di inferenza, modello), per ultimo la frequenza di inferenza.
+DEFAULT_LADDER: List[QualityLevel] = [
+    QualityLevel("max", None, 1, 1, None),
+    QualityLevel("high", 960, 1, 1, (1280, 720)),
+    QualityLevel("medium", 640, 1, 1, (1280, 720)),
+    QualityLevel("low", 640, 0, 1, (1280, 720)),
+    QualityLevel("lower", 480, 0, 1, (800, 600)),
+    QualityLevel("minimum", 480, 0, 2, (640, 480)),
+]
+
+
+class CpuMeter:
+    """Fraction of idle CPU since the previous call (system-wide on Linux,
+    otherwise estimated from this process' CPU time)."""
+
+    def __init__(self) -> None:
+        self._last_proc = self._read_proc_stat()
+        self._last_wall = time.perf_counter()
+        self._last_cpu = time.process_time()
+
+    @staticmethod
+    def _read_proc_stat() -> Optional[Tuple[float, float]]:
+        try:
+            with open("/proc/stat", "r") as fh:
+                fields = [float(v) for v in fh.readline().split()[1:]]
+            idle = fields[3] + (fields[4] if len(fields) > 4 else 0.0)  # idle + iowait
+            return idle, sum(fields)
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def headroom(self) -> float:
+        now_proc = self._read_proc_stat()
+        if now_proc is not None and self._last_proc is not None:
+            idle = now_proc[0] - self._last_proc[0]
+            total = now_proc[1] - self._last_proc[1]
+            self._last_proc = now_proc
+            if total > 0:
+                return max(0.0, min(1.0, idle / total))
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        elapsed = wall - self._last_wall
+        used = (cpu - self._last_cpu) / elapsed / (os.cpu_count() or 1) if elapsed > 0 else 0.0
+        self._last_wall, self._last_cpu = wall, cpu
+        return max(0.0, min(1.0, 1.0 - used))
+
+
+class QualityController:
+    def __init__(self, ladder: Optional[List[QualityLevel]] = None, target_ms: float = 80.0,
+                 min_headroom: float = 0.10, start: int = 0, eval_interval_s: float = 1.0,
+                 degrade_after_s: float = 2.0, upgrade_after_s: float = 10.0,
+                 upgrade_margin: float = 0.6, window: int = 90) -> None:
+        self.ladder = list(ladder or DEFAULT_LADDER)
+        self.target_ms = target_ms
+        self.min_headroom = min_headroom
+        self.index = max(0, min(start, len(self.ladder) - 1))
+        self.eval_interval_s = eval_interval_s
+        self.degrade_after_s = degrade_after_s
+        self.upgrade_after_s = upgrade_after_s
+        # si sale solo con p95 sotto target * margin
+        self.upgrade_margin = upgrade_margin
+        self.enabled = True
+        self.latency = RollingStats(window)
+        self.cpu = CpuMeter()
+        self.last_p95 = 0.0
+        self.last_headroom = 1.0
+        self.last_reason = ""
+        self._upgrade_backoff = 1.0
+        self._last_change_up = False
+        self._changed_at = 0.0
+        self._over_since: Optional[float] = None
+        self._under_since: Optional[float] = None
+        self._next_eval = 0.0
+
+    @classmethod
+    def from_env(cls) -> "QualityController":
+        """TOPINI_LATENCY_TARGET_MS sets the target; TOPINI_QUALITY pins a level
+        by name (disabling adaptation) or "off" to stay at the top level."""
+        controller = cls(target_ms=float(os.environ.get("TOPINI_LATENCY_TARGET_MS", "80")))
+        pinned = os.environ.get("TOPINI_QUALITY", "").strip().lower()
+        if pinned:
+            controller.enabled = False
+            names = [level.name for level in controller.ladder]
+            if pinned in names:
+                controller.index = names.index(pinned)
+        return controller
+
+    def apply_profile(self, profile: Any) -> None:
+        """Start from a calibrated profile: its settings replace the ladder level it
+        was chosen from. Ignored when a level is pinned with TOPINI_QUALITY."""
+        if not self.enabled:
+            return
+        names = [level.name for level in self.ladder]
+        if profile.level in names:
+            self.index = names.index(profile.level)
+            self.ladder[self.index] = profile.quality_level()
+
+    @property
+    def level(self) -> QualityLevel:
+        return self.ladder[self.index]
+
+    def observe(self, latency_ms: float) -> None:
+        self.latency.add(latency_ms)
+
+    def reset(self) -> None:
+        """Forget measurements (e.g. after the pipeline restarts)."""
+        self.latency.clear()
+        self._over_since = None
+        self._under_since = None
+        self._next_eval = 0.0
+
+    def update(self, now: Optional[float] = None) -> Optional[QualityLevel]:
+        """Evaluate (at most every ``eval_interval_s``); returns the new level on a change."""
+        if not self.enabled:
+            return None
+        now = time.perf_counter() if now is None else now
+        if now < self._next_eval:
+            return None
+        if self._next_eval == 0.0:
+            # prima chiamata: inizia a misurare la CPU da qui
+            self._next_eval = now + self.eval_interval_s
+            self.cpu.headroom()
+            return None
+        self._next_eval = now + self.eval_interval_s
+        self.last_headroom = self.cpu.headroom()
+        if len(self.latency) < 10:
+            return None
+        self.last_p95 = self.latency.percentiles(95)[0]
+
+        over = self.last_p95 > self.target_ms or self.last_headroom < self.min_headroom
+        under = (self.last_p95 < self.target_ms * self.upgrade_margin
+                 and self.last_headroom > self.min_headroom * 2)
+        self._over_since = (self._over_since or now) if over else None
+        self._under_since = (self._under_since or now) if under else None
+
+        if over and self.index < len(self.ladder) - 1 and now - self._over_since >= self.degrade_after_s:
+            if self._last_change_up and now - self._changed_at < self.upgrade_after_s * 3:
+                # l'ultimo salto in su non ha retto: aspetta di più prima di riprovare
+                self._upgrade_backoff = min(self._upgrade_backoff * 2.0, 16.0)
+            self.last_reason = (f"p95 {self.last_p95:.0f}ms > {self.target_ms:.0f}ms"
+                                if self.last_p95 > self.target_ms
+                                else f"CPU headroom {self.last_headroom:.0%}")
+            return self._change(self.index + 1, up=False, now=now)
+        if (under and self.index > 0
+                and now - self._under_since >= self.upgrade_after_s * self._upgrade_backoff):
+            self.last_reason = f"p95 {self.last_p95:.0f}ms, CPU headroom {self.last_headroom:.0%}"
+            return self._change(self.index - 1, up=True, now=now)
+        return None
+
+    def _change(self, index: int, up: bool, now: float) -> QualityLevel:
+        self.index = index
+        self._last_change_up = up
+        self._changed_at = now
+        self.reset()
+        self._next_eval = now + self.eval_interval_s
+        return self.level
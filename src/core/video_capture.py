@@ -1,91 +1,537 @@
-from __future__ import annotations
-import threading
-import time
-from typing import Optional, Any
-
-import cv2
-
-
-class VideoCaptureThread:
-    def __init__(self, device_index: int = 0, fps: int = 30):
-        self.device_index = device_index
-        self.fps = fps
-        self.cap: Optional[cv2.VideoCapture] = None
-        self._thread: Optional[threading.Thread] = None
-        self._running = False
-        self._lock = threading.Lock()
-        self._latest_frame: Optional[Any] = None
-
-    def start(self):
-        # ensure clean state
-        self.stop()
-        self._latest_frame = None
-        self.cap = cv2.VideoCapture(self.device_index, cv2.CAP_DSHOW)
-        if not self.cap.isOpened():
-            # fallback
-            self.cap = cv2.VideoCapture(self.device_index)
-        if not self.cap or not self.cap.isOpened():
-            return
-        
-        # Try to get higher resolution if camera supports it
-        # Test common resolutions in order of preference
-        resolutions = [
-            (1920, 1080),  # Full HD 16:9
-            (1280, 720),   # HD 16:9  
-            (1024, 768),   # XGA 4:3
-            (800, 600),    # SVGA 4:3
-            (640, 480)     # VGA 4:3 (fallback)
-        ]
-        
-        for width, height in resolutions:
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-            actual_w = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            actual_h = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            if actual_w == width and actual_h == height:
-                break
-        
-        self.cap.set(cv2.CAP_PROP_FPS, self.fps)
-
-        # warm-up: leggi e scarta qualche frame per stabilizzare l'esposizione
-        for _ in range(5):
-            ok, frame = self.cap.read()
-            if ok:
-                with self._lock:
-                    self._latest_frame = frame
-            time.sleep(0.02)
-
-        self._running = True
-        self._thread = threading.Thread(target=self._run, daemon=True)
-        self._thread.start()
-
-    def _run(self):
-        interval = 1.0 / max(1, self.fps)
-        # breve pausa prima del loop
-        time.sleep(0.01)
-        while self._running and self.cap and self.cap.isOpened():
-            ok, frame = self.cap.read()
-            if ok:
-                with self._lock:
-                    self._latest_frame = frame
-            time.sleep(interval * 0.5)
-
-    def read(self) -> Optional[Any]:
-        with self._lock:
-            if self._latest_frame is None:
-                return None
-            return self._latest_frame.copy()
-
-    def stop(self):
-        self._running = False
-        if self._thread and self._thread.is_alive():
-            self._thread.join(timeout=1.0)
-        self._thread = None
-        if self.cap:
-            try:
-                self.cap.release()
-            finally:
-                self.cap = None
-        # clear stale frame so UI doesn't keep showing last image
-        with self._lock:
-            self._latest_frame = None
+from __future__ import annotations
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+import cv2
+
+from src.utils.tracing import tracer
+from src.utils.types import CapturedFrame
+
+
+# Risoluzioni provate all'apertura della camera, in ordine di preferenza
+PREFERRED_RESOLUTIONS: List[Tuple[int, int]] = [
+    (1920, 1080),  # Full HD 16:9
+    (1280, 720),   # HD 16:9
+    (1024, 768),   # XGA 4:3
+    (800, 600),    # SVGA 4:3
+    (640, 480),    # VGA 4:3 (fallback)
+]
+
+# sorgenti simulate (fake_capture.FaultySource): trattate come una camera, watchdog compreso
+FAKE_SOURCE_PREFIX = "fake:"
+
+# riapertura dopo un blocco: attesa iniziale e massima tra due tentativi
+REOPEN_BACKOFF_S = (0.25, 8.0)
+
+
+@dataclass
+class SwitchReport:
+    """Outcome and timing of a live camera switch (``switch_device``)."""
+    from_index: int
+    to_index: int
+    ok: bool
+    open_ms: float = 0.0         # apertura e configurazione del nuovo dispositivo
+    first_frame_ms: float = 0.0  # dalla richiesta al primo frame del nuovo dispositivo
+    reason: str = ""
+    error: str = ""
+
+
+@dataclass
+class CaptureStatus:
+    """Watchdog state change, passed to ``VideoCaptureThread.on_status``:
+    ``stalled`` (no frame within the deadline), ``reopening`` (a reopen
+    attempt failed, ``retry_s`` until the next), ``recovered``."""
+    state: str
+    device_index: int
+    outage_s: float = 0.0
+    attempts: int = 0
+    retry_s: float = 0.0
+
+
+@dataclass
+class OutageStats:
+    outages: int = 0
+    total_s: float = 0.0
+    longest_s: float = 0.0
+    last_s: float = 0.0
+    reopen_attempts: int = 0
+    reopen_failures: int = 0
+    started: Optional[float] = None  # inizio dell'interruzione in corso
+
+    def summary(self, now: Optional[float] = None) -> dict:
+        current = (now or time.perf_counter()) - self.started if self.started is not None else 0.0
+        return {
+            "outages": self.outages,
+            "total_s": round(self.total_s + current, 3),
+            "longest_s": round(max(self.longest_s, current), 3),
+            "last_s": round(self.last_s, 3),
+            "reopen_attempts": self.reopen_attempts,
+            "reopen_failures": self.reopen_failures,
+            "in_outage": self.started is not None,
+        }
+
+
+class VideoCaptureThread:
+    def __init__(self, device_index: int = 0, fps: int = 30,
+                 source: Optional[str] = None, resolution: Optional[Tuple[int, int]] = None,
+                 loop: bool = False, stall_timeout_s: Optional[float] = None,
+                 on_status: Optional[Callable[[CaptureStatus], None]] = None):
+        self.device_index = device_index
+        self.fps = fps
+        # file/URL sorgente alternativa alla webcam (es. video registrato)
+        self.source = source
+        # risoluzione preferita, provata prima della lista di default
+        self.resolution = resolution
+        # per sorgenti file: riparte dall'inizio a fine video
+        self.loop = loop
+        self.cap: Optional[cv2.VideoCapture] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._lock = threading.Lock()
+        self._latest_frame: Optional[Any] = None
+        self._latest_seq = 0
+        self._latest_ts = 0.0
+        self.frames_captured = 0
+        # cambio di risoluzione richiesto a camera aperta, applicato dal thread di cattura
+        self._pending_resolution: Optional[Tuple[int, int]] = None
+        self._pending_fps: Optional[int] = None
+        # camera che ignora CAP_PROP_FPS: si decodifica un frame ogni N
+        self._decimate = 1
+        # dispositivo già aperto da switch_device(), adottato dal thread di cattura
+        self._pending_cap: Optional[Tuple[Any, int]] = None
+        # watchdog: nessun frame buono entro la scadenza -> riapertura con attesa crescente
+        self.stall_timeout_s = (stall_timeout_s if stall_timeout_s is not None
+                                else float(os.environ.get("TOPINI_CAPTURE_STALL_S", "2.0")))
+        self.on_status: Callable[[CaptureStatus], None] = on_status or (lambda status: None)
+        self.outages = OutageStats()
+        self._last_good = 0.0
+        self._outage_lock = threading.Lock()
+        self._monitor: Optional[threading.Thread] = None
+        # incrementata a ogni cambio di dispositivo: un lettore di una generazione vecchia esce
+        self._generation = 0
+        # incrementato da stop(): un'apertura in corso (switch, riapertura) non rianima la cattura
+        self._stops = 0
+        self._stopped = True
+        self._next_reopen = 0.0
+        self._backoff = REOPEN_BACKOFF_S[0]
+        self._attempts = 0
+
+    @property
+    def is_file_source(self) -> bool:
+        return self.source is not None and not self.source.startswith(FAKE_SOURCE_PREFIX)
+
+    def _open(self) -> Optional[Any]:
+        """Open the underlying cv2.VideoCapture (or a compatible object)."""
+        if self.source is not None and self.source.startswith(FAKE_SOURCE_PREFIX):
+            from src.core.fake_capture import open_fake_source
+            return open_fake_source(self.source)
+        if self.source is not None:
+            return cv2.VideoCapture(self.source)
+        return self._open_device(self.device_index)
+
+    def _open_device(self, device_index: int) -> Optional[Any]:
+        cap = cv2.VideoCapture(device_index, cv2.CAP_DSHOW)
+        if not cap.isOpened():
+            # fallback
+            cap = cv2.VideoCapture(device_index)
+        return cap
+
+    @property
+    def _watchdog_enabled(self) -> bool:
+        return not self.is_file_source and self.stall_timeout_s > 0
+
+    def start(self):
+        # ensure clean state
+        self.stop()
+        self._latest_frame = None
+        with self._lock:
+            self._stopped = False
+            stops = self._stops
+        cap = self._open()
+        if not cap or not cap.isOpened():
+            if cap:
+                cap.release()
+            if not self._watchdog_enabled:
+                return
+            # camera assente all'avvio: la apre il watchdog quando ricompare
+            self._running = True
+            self._begin_outage(time.perf_counter())
+            self._start_monitor()
+            return
+
+        self.cap = cap
+        if not self.is_file_source:
+            self._configure_camera()
+        self._install(cap, self.device_index, stops)
+        if self._watchdog_enabled:
+            self._start_monitor()
+
+    def _install(self, cap: Any, device_index: int, stops: int) -> bool:
+        """Make ``cap`` the current device and start a reader thread on it. A
+        previous reader still blocked in ``read()`` is abandoned: it releases
+        its device and exits when the read returns. If ``stop()`` ran since
+        ``stops`` was read, ``cap`` is released instead and False returned."""
+        with self._lock:
+            if stops != self._stops:
+                stale = True
+            else:
+                stale = False
+                self._running = True
+                old, old_thread = self.cap, self._thread
+                self.cap, self.device_index = cap, device_index
+                self._generation += 1
+                generation = self._generation
+                self._last_good = time.perf_counter()
+        if stale:
+            cap.release()
+            return False
+        if old is not None and old is not cap and (old_thread is None or not old_thread.is_alive()):
+            old.release()
+        self._thread = threading.Thread(target=self._run, args=(cap, generation), daemon=True,
+                                        name="video-capture")
+        self._thread.start()
+        return True
+
+    def _abandon(self) -> Tuple[Optional[threading.Thread], int]:
+        """Detach the current device from its reader, which exits (releasing
+        it) as soon as it is not blocked in ``read()``."""
+        with self._lock:
+            self._generation += 1
+            self.cap = None
+            return self._thread, self._generation
+
+    def _start_monitor(self) -> None:
+        self._monitor = threading.Thread(target=self._watch, daemon=True, name="video-capture-watchdog")
+        self._monitor.start()
+
+    def _configure_camera(self):
+        self._apply_resolution()
+        self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+
+        # warm-up: leggi e scarta qualche frame per stabilizzare l'esposizione
+        for _ in range(5):
+            ok, frame = self.cap.read()
+            if ok:
+                self._store(frame)
+            time.sleep(0.02)
+
+    def _apply_resolution(self, cap: Optional[Any] = None) -> None:
+        cap = cap or self.cap
+        if self.resolution is None and self.source is not None and self.source.startswith(FAKE_SOURCE_PREFIX):
+            # una sorgente simulata accetta qualsiasi misura: resta quella scritta nella sorgente
+            return
+        # Try to get higher resolution if camera supports it
+        # Test common resolutions in order of preference
+        resolutions = list(PREFERRED_RESOLUTIONS)
+        if self.resolution is not None:
+            resolutions.insert(0, self.resolution)
+
+        for width, height in resolutions:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            actual_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            actual_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            if actual_w == width and actual_h == height:
+                break
+
+    def set_resolution(self, resolution: Optional[Tuple[int, int]]) -> None:
+        """Preferred capture resolution (None = default list). Applied at the next
+        start, or between two reads by the capture thread if running."""
+        if resolution == self.resolution:
+            return
+        self.resolution = resolution
+        if self._running and not self.is_file_source:
+            self._pending_resolution = resolution or PREFERRED_RESOLUTIONS[0]
+
+    def set_fps(self, fps: int) -> None:
+        """Change the capture rate while running. Cameras that ignore CAP_PROP_FPS
+        keep streaming at their native rate: the extra frames are grabbed (not
+        decoded) and dropped, which keeps the driver buffer fresh."""
+        if fps == self.fps:
+            return
+        self.fps = fps
+        if self._running and not self.is_file_source:
+            self._pending_fps = fps
+
+    def _apply_fps(self, fps: int, cap: Optional[Any] = None) -> None:
+        cap = cap or self.cap
+        cap.set(cv2.CAP_PROP_FPS, fps)
+        native = cap.get(cv2.CAP_PROP_FPS)
+        self._decimate = max(1, int(round(native / fps))) if native > fps * 1.5 else 1
+
+    def _store(self, frame: Any) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            self._latest_frame = frame
+            self._latest_seq += 1
+            self._latest_ts = now
+            self.frames_captured += 1
+
+    def _run(self, cap: Any, generation: int):
+        # breve pausa prima del loop
+        time.sleep(0.01)
+        skip = 0
+        watchdog = self._watchdog_enabled
+        while self._running and generation == self._generation:
+            if self._pending_cap is not None:
+                cap = self._adopt_pending_cap(cap, generation)
+                skip = 0
+            if not cap.isOpened():
+                if not watchdog:
+                    break
+                # camera chiusa dal driver: ci pensa il watchdog alla scadenza
+                time.sleep(0.05)
+                continue
+            if self._pending_resolution is not None:
+                self._pending_resolution = None
+                self._apply_resolution(cap)
+            if self._pending_fps is not None:
+                fps, self._pending_fps = self._pending_fps, None
+                self._apply_fps(fps, cap)
+                skip = 0
+            interval = 1.0 / max(1, self.fps)
+            if skip > 0:
+                skip -= 1
+                cap.grab()
+                continue
+            t0 = time.perf_counter()
+            ok, frame = cap.read()
+            if generation != self._generation:
+                # abbandonata dal watchdog durante una lettura bloccata
+                break
+            if ok:
+                skip = self._decimate - 1
+                self._store(frame)
+                self._last_good = self._latest_ts
+                if self.outages.started is not None:
+                    self._end_outage()
+                if tracer.enabled:
+                    tracer.complete("capture.read", t0, time.perf_counter(), self._latest_seq, flow="out")
+            elif self.is_file_source:
+                if not self.loop:
+                    break
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                continue
+            if self.is_file_source:
+                # un file si legge subito: ritmo dato dagli fps richiesti
+                time.sleep(max(0.0, interval - (time.perf_counter() - t0)))
+            elif self._decimate == 1:
+                # con la decimazione è grab() a dare il ritmo della camera
+                time.sleep(interval * 0.5)
+        if cap is not self.cap:
+            # sostituita o abbandonata (o già chiusa da stop()): la rilascia chi la leggeva
+            cap.release()
+        elif generation == self._generation:
+            # fine del file (senza loop) o sorgente chiusa
+            self._running = False
+
+    def _watch(self) -> None:
+        """Watchdog thread. It checks the deadline of the last good frame on
+        its own, since the reader may be stuck inside ``read()``: reports the
+        stall on time, then reopens the device when the backoff expires
+        (doubling it after every attempt that yields no frame)."""
+        while self._running:
+            now = time.perf_counter()
+            stalled = now - self._last_good > self.stall_timeout_s
+            if self.outages.started is None:
+                if stalled:
+                    self._begin_outage(self._last_good)
+                    continue
+            elif now >= self._next_reopen and (self.cap is None or stalled):
+                # un dispositivo appena riaperto ha una scadenza intera per dare il primo frame
+                self._reopen()
+                continue
+            # controllo a piccoli passi: stop() e switch_device() restano reattivi
+            time.sleep(0.05)
+
+    def _begin_outage(self, since: float) -> None:
+        now = time.perf_counter()
+        with self._outage_lock:
+            stats = self.outages
+            if stats.started is not None:
+                return
+            stats.started = since
+            stats.outages += 1
+            self._attempts = 0
+            self._backoff = REOPEN_BACKOFF_S[0]
+            self._next_reopen = now
+        print(f"Capture: no frame from camera {self.device_index} for {now - since:.1f}s")
+        self.on_status(CaptureStatus("stalled", self.device_index, now - since))
+
+    def _reopen(self) -> None:
+        stats = self.outages
+        stops = self._stops
+        with self._outage_lock:
+            if stats.started is None:
+                return  # ripresa da sola nel frattempo
+            self._attempts += 1
+            stats.reopen_attempts += 1
+        reader, generation = self._abandon()
+        if reader is not None:
+            # se la lettura non è bloccata il lettore esce subito e libera il dispositivo
+            reader.join(0.2)
+        cap = self._open()
+        opened = cap is not None and cap.isOpened()
+        retry = self._backoff
+        self._next_reopen = time.perf_counter() + retry
+        self._backoff = min(self._backoff * 2.0, REOPEN_BACKOFF_S[1])
+        if opened and self._running and generation == self._generation:
+            self._apply_resolution(cap)
+            self._apply_fps(self.fps, cap)
+            self._install(cap, self.device_index, stops)
+            return
+        if cap is not None:
+            cap.release()
+        if opened or not self._running:
+            return  # fermata, o un altro dispositivo installato da switch_device()
+        stats.reopen_failures += 1
+        print(f"Capture: reopening camera {self.device_index} failed (attempt {self._attempts}), "
+              f"retry in {retry:.2f}s")
+        self.on_status(CaptureStatus("reopening", self.device_index, time.perf_counter() - stats.started,
+                                     self._attempts, retry))
+
+    def _end_outage(self, recovered: bool = True) -> None:
+        stats = self.outages
+        with self._outage_lock:
+            if stats.started is None:
+                return
+            duration = time.perf_counter() - stats.started
+            stats.started = None
+            stats.last_s = duration
+            stats.total_s += duration
+            stats.longest_s = max(stats.longest_s, duration)
+        if not recovered:
+            return
+        print(f"Capture: camera {self.device_index} recovered after {duration:.2f}s "
+              f"({self._attempts} reopen attempts)")
+        self.on_status(CaptureStatus("recovered", self.device_index, duration, self._attempts))
+
+    def switch_device(self, device_index: int, reason: str = "",
+                      first_frame_timeout_s: float = 3.0) -> SwitchReport:
+        """Move the live capture to another camera.
+
+        The new device is opened and configured in the calling thread while the
+        current one keeps streaming, then the capture thread swaps it in between
+        two reads and releases the old one. Blocks until the first frame of the
+        new device (or the timeout): call it from a worker thread, never from
+        the GUI thread. If the capture was stopped with ``stop()``, before or
+        during the switch, only the device index changes and the next
+        ``start()`` opens it; with no live
+        reader (camera missing or stuck, or thread ended because the old device
+        went away) the new device is started at once."""
+        previous = self.device_index
+        if self.source is not None or device_index == previous and self._running:
+            return SwitchReport(previous, device_index, ok=True, reason=reason)
+        with self._lock:
+            stops, stopped = self._stops, self._stopped
+        if stopped:
+            # fermata con stop(): si cambia solo il dispositivo da aprire
+            self.device_index = device_index
+            return SwitchReport(previous, device_index, ok=True, reason=reason)
+        start = time.perf_counter()
+        cap = self._open_device(device_index)
+        if cap is None or not cap.isOpened():
+            if cap is not None:
+                cap.release()
+            return SwitchReport(previous, device_index, ok=False, reason=reason, error="device not opened")
+        self._apply_resolution(cap)
+        cap.set(cv2.CAP_PROP_FPS, self.fps)
+        open_ms = (time.perf_counter() - start) * 1000.0
+        seq_before = self._latest_seq
+        with self._lock:
+            if stops == self._stops:
+                self._pending_cap = (cap, device_index)
+                cap = None
+        if cap is not None:
+            # stop() durante l'apertura: la cattura resta ferma
+            cap.release()
+            self.device_index = device_index
+            return SwitchReport(previous, device_index, ok=True, open_ms=open_ms, reason=reason)
+        deadline = time.perf_counter() + first_frame_timeout_s
+        while time.perf_counter() < deadline:
+            if stops != self._stops:
+                # fermata mentre si aspettava il primo frame: stop() ha già rilasciato il dispositivo
+                self.device_index = device_index
+                return SwitchReport(previous, device_index, ok=True, open_ms=open_ms, reason=reason)
+            if self._pending_cap is not None and (self.outages.started is not None
+                                                  or self._thread is None or not self._thread.is_alive()):
+                # nessun lettore che possa adottarlo (camera assente o bloccata, o thread
+                # terminato): il nuovo dispositivo parte con un lettore suo
+                with self._lock:
+                    pending, self._pending_cap = self._pending_cap, None
+                if pending is not None:
+                    self._decimate = 1
+                    self._apply_fps(self.fps, pending[0])
+                    self._install(pending[0], pending[1], stops)
+            if self.device_index == device_index and self._latest_seq > seq_before:
+                return SwitchReport(previous, device_index, ok=True, open_ms=open_ms,
+                                    first_frame_ms=(time.perf_counter() - start) * 1000.0, reason=reason)
+            time.sleep(0.005)
+        return SwitchReport(previous, device_index, ok=False, open_ms=open_ms,
+                            first_frame_ms=(time.perf_counter() - start) * 1000.0, reason=reason,
+                            error="no frame from the new device")
+
+    def _adopt_pending_cap(self, cap: Any, generation: int) -> Any:
+        """Called by the reader between two reads: swap in the device opened by
+        ``switch_device`` and release ``cap``. Returns the device to read."""
+        with self._lock:
+            if generation != self._generation or self._pending_cap is None:
+                return cap
+            pending, self._pending_cap = self._pending_cap, None
+            self.cap, self.device_index = pending
+        self._decimate = 1
+        self._apply_fps(self.fps, pending[0])
+        self._last_good = time.perf_counter()
+        cap.release()
+        return pending[0]
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def frame_size(self) -> Optional[Tuple[int, int]]:
+        """(width, height) of the opened source, or None when closed."""
+        if not self.cap:
+            return None
+        return int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def read(self) -> Optional[Any]:
+        with self._lock:
+            if self._latest_frame is None:
+                return None
+            return self._latest_frame.copy()
+
+    def read_frame(self) -> Optional[CapturedFrame]:
+        """Like read(), but also returns the frame sequence number and capture time."""
+        with self._lock:
+            if self._latest_frame is None:
+                return None
+            return CapturedFrame(self._latest_frame.copy(), self._latest_seq, self._latest_ts)
+
+    def stop(self):
+        with self._lock:
+            self._stops += 1
+            self._stopped = True
+            self._running = False
+        for thread in (self._monitor, self._thread):
+            if thread and thread.is_alive():
+                thread.join(timeout=1.0)
+        self._thread = None
+        self._monitor = None
+        # interruzione in corso chiusa dallo stop, senza stato "recovered"
+        self._end_outage(recovered=False)
+        with self._lock:
+            pending, self._pending_cap = self._pending_cap, None
+        if pending is not None:
+            pending[0].release()
+        if self.cap:
+            try:
+                self.cap.release()
+            finally:
+                self.cap = None
+        # clear stale frame so UI doesn't keep showing last image
+        with self._lock:
+            self._latest_frame = None
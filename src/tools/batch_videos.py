@@ -0,0 +1,218 @@
+"""
+Run the hand tracker and the gesture detector over a directory of recorded
+videos, in parallel, and write the landmarks and events as a dataset.
+
+    python -m src.tools.batch_videos footage/ --output dataset/
+    python -m src.tools.batch_videos footage/ --output dataset/ --workers 4 --every 2 --inference-width 640
+
+Each worker process loads one MediaPipe instance and takes whole videos (the
+work is independent per file). For every video it writes
+``<output>/<name>.jsonl`` in the recorder format (``frame_recorder``): a
+line per frame with the hands, ``t`` being the time in the video, and a line
+per gesture event. Videos whose output already exists are skipped unless
+``--overwrite``; ``manifest.json`` lists them all.
+
+Prints a JSON line per finished video and a summary with the throughput
+(frames per second across the workers, and per worker).
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+if __package__ in (None, "") and __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+
+# stato di ogni processo worker: un tracker MediaPipe per processo
+_WORKER: Dict[str, Any] = {}
+
+
+def emit(record: Dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(record, separators=(",", ":")) + "\n")
+    sys.stdout.flush()
+
+
+def find_videos(paths: List[str]) -> List[str]:
+    videos: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                videos.extend(os.path.join(root, n) for n in names if n.lower().endswith(VIDEO_EXTENSIONS))
+        elif os.path.isfile(path):
+            videos.append(path)
+    return sorted(videos)
+
+
+def output_name(video: str, roots: List[str]) -> str:
+    """``<relative path>.jsonl`` flattened, so equal names in different
+    folders do not collide."""
+    for root in roots:
+        if os.path.isdir(root) and os.path.abspath(video).startswith(os.path.abspath(root) + os.sep):
+            video = os.path.relpath(video, root)
+            break
+    else:
+        video = os.path.basename(video)
+    return os.path.splitext(video)[0].replace(os.sep, "__").replace("/", "__") + ".jsonl"
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    from src.core.hand_tracker import HandTracker  # import pesante di MediaPipe, una volta per processo
+
+    _WORKER["tracker"] = HandTracker(model_complexity=options["model_complexity"],
+                                     inference_width=options["inference_width"])
+    _WORKER["options"] = options
+
+
+def process_video(video: str, output: str) -> Dict[str, Any]:
+    """Worker task: track and detect over one video, write its JSON lines."""
+    import cv2
+    import numpy as np
+
+    from src.core.frame_recorder import event_line, frame_record
+    from src.core.gesture_classifier import detector_from_env
+
+    tracker = _WORKER["tracker"]
+    options = _WORKER["options"]
+    start = time.perf_counter()
+    cap = cv2.VideoCapture(video)
+    if not cap.isOpened():
+        return {"video": video, "ok": False, "error": "cannot open"}
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 64
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 64
+    # frame vuoto: nessuna traccia ereditata dal video precedente
+    tracker.process(np.zeros((height, width, 3), dtype=np.uint8))
+    detector = detector_from_env()
+    frames = processed = with_hands = events = 0
+    tmp = output + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as fh:
+            while True:
+                ok = cap.grab()
+                if not ok:
+                    break
+                index = frames
+                frames += 1
+                if index % options["every"]:
+                    continue
+                ok, frame = cap.retrieve()
+                if not ok:
+                    break
+                if options["mirror"]:
+                    frame = cv2.flip(frame, 1)
+                t = index / fps
+                hands = tracker.process(frame)
+                processed += 1
+                with_hands += bool(hands)
+                fh.write(json.dumps(frame_record(t, hands, index), separators=(",", ":")) + "\n")
+                event = detector.detect(hands, now=t)
+                if event is not None:
+                    events += 1
+                    fh.write(json.dumps(event_line(t, event, index), separators=(",", ":")) + "\n")
+        os.replace(tmp, output)
+    except OSError as e:
+        return {"video": video, "ok": False, "error": str(e)}
+    finally:
+        cap.release()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    elapsed = time.perf_counter() - start
+    return {
+        "video": video, "ok": True, "output": output, "pid": os.getpid(),
+        "frames": frames, "processed": processed, "with_hands": with_hands, "events": events,
+        "duration_s": round(frames / fps, 3), "elapsed_s": round(elapsed, 3),
+        "fps": round(processed / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.tools.batch_videos", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="video files or directories (searched recursively)")
+    parser.add_argument("--output", required=True, help="dataset directory")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help="worker processes (default: CPUs - 1)")
+    parser.add_argument("--every", type=int, default=1, help="process one frame every N")
+    parser.add_argument("--model-complexity", type=int, choices=(0, 1), default=1, help="MediaPipe hand model")
+    parser.add_argument("--inference-width", type=int, help="downscale frames to this width before inference")
+    parser.add_argument("--no-mirror", action="store_true", help="do not flip frames horizontally (the app does)")
+    parser.add_argument("--overwrite", action="store_true", help="process videos whose output already exists")
+    args = parser.parse_args(argv)
+
+    videos = find_videos(args.inputs)
+    if not videos:
+        print("No videos found", file=sys.stderr)
+        return 1
+    os.makedirs(args.output, exist_ok=True)
+    jobs = []
+    skipped = 0
+    for video in videos:
+        output = os.path.join(args.output, output_name(video, args.inputs))
+        if os.path.exists(output) and not args.overwrite:
+            skipped += 1
+            continue
+        jobs.append((video, output))
+    options = {"model_complexity": args.model_complexity, "inference_width": args.inference_width,
+               "every": max(1, args.every), "mirror": not args.no_mirror}
+    workers = max(1, min(args.workers, len(jobs)))
+    emit({"type": "start", "videos": len(videos), "to_process": len(jobs), "skipped": skipped, "workers": workers})
+
+    results: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+    processed = 0
+    # spawn: processi puliti per MediaPipe anche dove il default è fork
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(options,)) as pool:
+        futures = {pool.submit(process_video, video, output): video for video, output in jobs}
+        try:
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:  # worker morto (es. video che manda in crash il decoder)
+                    result = {"video": futures[future], "ok": False, "error": repr(e)}
+                results.append(result)
+                processed += result.get("processed", 0)
+                elapsed = time.perf_counter() - started
+                emit({"type": "video", "done": len(results), "of": len(jobs), **result,
+                      "total_fps": round(processed / elapsed, 2) if elapsed > 0 else 0.0})
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            emit({"type": "interrupted", "done": len(results), "of": len(jobs)})
+
+    elapsed = time.perf_counter() - started
+    ok = [r for r in results if r.get("ok")]
+    worker_s: Dict[int, float] = {}
+    for r in ok:
+        worker_s[r["pid"]] = worker_s.get(r["pid"], 0.0) + r["elapsed_s"]
+    manifest_path = os.path.join(args.output, "manifest.json")
+    manifest = {"videos": [{"video": v, "output": output_name(v, args.inputs)} for v in videos], "options": options}
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    emit({
+        "type": "summary",
+        "videos": len(ok),
+        "failed": len(results) - len(ok),
+        "failed_videos": [r["video"] for r in results if not r.get("ok")],
+        "frames": processed,
+        "events": sum(r["events"] for r in ok),
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(processed / elapsed, 2) if elapsed > 0 else 0.0,
+        "fps_per_worker": round(processed / sum(worker_s.values()), 2) if worker_s else 0.0,
+        "workers": len(worker_s),
+        "manifest": manifest_path,
+    })
+    return 0 if len(ok) == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Hardware calibration: measures this machine and writes the performance profile
+loaded by the app at every launch (normally done automatically on the first one).
+
+    python -m src.tools.calibrate
+    python -m src.tools.calibrate --no-camera --output profile.json
+
+Probes the camera modes, times HandTracker.process at each inference width and
+model complexity, times VideoWidget presentation at the display size and picks
+the highest quality level that fits one camera frame interval.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+from typing import List, Optional
+
+if __package__ in (None, "") and __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.calibration import calibrate, default_profile_path, load_profile, save_profile
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.tools.calibrate", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--camera", type=int, default=0, help="camera device index")
+    parser.add_argument("--no-camera", action="store_true", help="skip the camera mode probe")
+    parser.add_argument("--display", default="1100x700", help="video area size, WxH")
+    parser.add_argument("--frames", type=int, default=15, help="timed frames per tracker configuration")
+    parser.add_argument("--output", default=default_profile_path(), help="profile path")
+    parser.add_argument("--show", action="store_true", help="print the saved profile and exit")
+    args = parser.parse_args(argv)
+
+    if args.show:
+        profile = load_profile(args.output)
+        if profile is None:
+            print(f"No valid profile for this machine at {args.output}", file=sys.stderr)
+            return 2
+        print(json.dumps(profile.to_dict(), indent=2))
+        return 0
+
+    width, height = (int(v) for v in args.display.lower().split("x"))
+    from PySide6 import QtWidgets
+    # presentazione misurata con un VideoWidget reale
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    profile = calibrate(args.camera, probe_camera=not args.no_camera, display_size=(width, height),
+                        frames=args.frames)
+    path = save_profile(profile, args.output)
+    print(f"Profile written to {path}")
+    del app
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+List the cameras and their cached capabilities, or watch hot-plug events.
+
+    python -m src.tools.cameras
+    python -m src.tools.cameras --probe
+    python -m src.tools.cameras --watch --camera 0
+
+Without options, prints the cameras found and the modes in the cache
+(``~/.topini/cameras.json``, or TOPINI_CAMERA_CACHE). ``--probe`` measures
+the modes of the cameras missing from the cache (``--reprobe``: all of them)
+and saves them. ``--watch`` opens ``--camera`` and keeps it streaming like the
+app does, printing a JSON line per camera added or removed and per switch of
+the live capture (with its timing), until Ctrl+C. Hot-plug polling needs
+Linux; elsewhere the list is built by opening the first indices.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+if __package__ in (None, "") and __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.camera_devices import (
+    CameraDeviceManager, DeviceListener, default_cache_path, hotplug_supported, list_cameras, load_cache, save_cache,
+)
+
+
+def emit(record: Dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(record, separators=(",", ":")) + "\n")
+    sys.stdout.flush()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.tools.cameras", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--probe", action="store_true", help="measure the modes of cameras not in the cache")
+    parser.add_argument("--reprobe", action="store_true", help="measure the modes of every camera")
+    parser.add_argument("--watch", action="store_true", help="stream a camera and print hot-plug events")
+    parser.add_argument("--camera", type=int, default=0, help="camera streamed by --watch")
+    parser.add_argument("--poll", type=float, default=1.0, help="hot-plug poll interval, seconds")
+    parser.add_argument("--cache", default=default_cache_path(), help="capability cache file")
+    args = parser.parse_args(argv)
+
+    if args.watch:
+        return watch(args)
+
+    cache = load_cache(args.cache)
+    cameras = list_cameras()
+    if args.probe or args.reprobe:
+        from src.core.calibration import probe_camera_modes
+        for info in cameras:
+            if args.reprobe or info.key not in cache:
+                modes = probe_camera_modes(info.index, frames=5)
+                if modes:
+                    cache[info.key] = modes
+        save_cache(cache, args.cache)
+    for info in cameras:
+        if info.key in cache:
+            info.modes, info.probed = cache[info.key], True
+    print(json.dumps({"hotplug": hotplug_supported(), "cache": args.cache,
+                      "cameras": [info.to_dict() for info in cameras]}, indent=2))
+    return 0
+
+
+def watch(args: argparse.Namespace) -> int:
+    from src.core.video_capture import VideoCaptureThread
+
+    capture = VideoCaptureThread(device_index=args.camera, fps=30)
+    capture.start()
+    manager = CameraDeviceManager(capture, DeviceListener(
+        on_devices=lambda devices: emit({"kind": "devices", "cameras": [d.to_dict() for d in devices]}),
+        on_added=lambda info: emit({"kind": "added", **info.to_dict()}),
+        on_removed=lambda info: emit({"kind": "removed", **info.to_dict()}),
+        on_switched=lambda report: emit({"kind": "switched", **asdict(report)}),
+    ), poll_interval_s=args.poll, cache_path=args.cache)
+    manager.start()
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.stop()
+        capture.stop()
+        emit({"kind": "summary", **manager.stats()})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
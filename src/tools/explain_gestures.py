@@ -0,0 +1,59 @@
+"""
+Inspect a gesture decision trace: why did (or didn't) a wave or a heart fire?
+
+    python -m src.tools.explain_gestures topini-decisions-20260101-120000.jsonl
+    python -m src.tools.explain_gestures trace.jsonl --kind wave.pos --failed
+    python -m src.tools.explain_gestures trace.jsonl --summary
+
+Traces are written by the gesture page (F6, or TOPINI_DECISION_TRACE=path)
+and by ``src.tools.headless --decision-trace path``; ``headless --explain``
+prints the same records live. Each line shows one evaluated check with its
+intermediate values and thresholds, failed conditions marked with ``!``.
+``--summary`` counts, per check, how often each condition failed and how
+often it was the only one failing (the near misses worth tuning).
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+from typing import List, Optional
+
+if __package__ in (None, "") and __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.decision_trace import failure_summary, format_row, load_rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.tools.explain_gestures", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", help="decision trace file (JSON lines)")
+    parser.add_argument("--kind", default="", help="only records whose kind starts with this (wave, heart, rule)")
+    parser.add_argument("--failed", action="store_true", help="only checks with at least one failed condition")
+    parser.add_argument("--since", type=float, help="only records at or after this timestamp")
+    parser.add_argument("--until", type=float, help="only records at or before this timestamp")
+    parser.add_argument("--summary", action="store_true", help="print failure counts per check as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        rows = load_rows(args.trace)
+    except (OSError, ValueError) as e:
+        print(f"Cannot read {args.trace}: {e}", file=sys.stderr)
+        return 1
+    rows = [r for r in rows if r["kind"].startswith(args.kind)
+            and (args.since is None or r["t"] >= args.since)
+            and (args.until is None or r["t"] <= args.until)]
+    if args.summary:
+        print(json.dumps(failure_summary(rows), indent=2))
+        return 0
+    for row in rows:
+        if args.failed and not row.get("failed"):
+            continue
+        print(format_row(row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Headless pipeline runner: capture -> HandTracker -> GestureDetector, without Qt.
+
+Prints one JSON object per line on stdout:
+- ``start``: source and effective resolution;
+- ``event``: every GestureEvent;
+- ``capture``: camera watchdog changes (``stalled``, ``reopening``,
+  ``recovered``), see ``video_capture.CaptureStatus``;
+- ``decision``: with ``--explain``, every value and condition evaluated by
+  the gesture rules (see ``gesture_detector.TRACE_SCHEMAS``);
+- ``stats``: per-stage latency percentiles every ``--report-interval`` seconds;
+- ``summary``: totals at the end of the run.
+
+Examples::
+
+    python -m src.tools.headless --duration 10
+    python -m src.tools.headless --file clip.mp4 --sync   # every frame, as fast as possible
+    python -m src.tools.headless --file "fake:640x480@30,fail=3+2,unplug=8+4" --duration 15
+
+Exit code is 0 on success, 2 if no frame arrives within ``--health-timeout``
+seconds (useful as a kiosk health check).
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Allow running this file directly (python src/tools/headless.py)
+if __package__ in (None, "") and __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import cv2
+
+from src.core.video_capture import VideoCaptureThread
+from src.core.gesture_classifier import detector_from_env
+from src.core.gesture_detector import find_rule_detector
+from src.utils.metrics import StageStats
+from src.utils.tracing import tracer
+from src.utils.types import CapturedFrame
+
+STAGES = ("read", "flip", "process", "draw", "detect", "total")
+
+
+def emit(record: Dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(record, separators=(",", ":")) + "\n")
+    sys.stdout.flush()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.headless",
+        description="Run the gesture pipeline without UI and print JSON lines.",
+    )
+    src = parser.add_mutually_exclusive_group()
+    src.add_argument("--camera", type=int, default=0, help="camera device index (default 0)")
+    src.add_argument("--file", help="video file or URL to use instead of the camera "
+                                    "(fake:... for a simulated camera with faults, see fake_capture)")
+    parser.add_argument("--loop", action="store_true", help="restart the file when it ends")
+    parser.add_argument("--width", type=int, help="preferred capture width")
+    parser.add_argument("--height", type=int, help="preferred capture height")
+    parser.add_argument("--fps", type=int, default=30, help="capture rate")
+    parser.add_argument("--sync", action="store_true",
+                        help="with --file: read every frame in the processing loop, unpaced "
+                             "(measures the pipeline throughput ceiling)")
+    parser.add_argument("--duration", type=float, default=0.0, help="seconds to run (0 = until Ctrl+C)")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="seconds between stats lines")
+    parser.add_argument("--health-timeout", type=float, default=5.0,
+                        help="fail if no frame is received within this many seconds")
+    parser.add_argument("--no-mirror", action="store_true", help="do not flip frames horizontally")
+    parser.add_argument("--draw", action="store_true", help="also time HandTracker.draw")
+    parser.add_argument("--per-frame", action="store_true", help="emit a 'frame' line for every frame")
+    parser.add_argument("--explain", nargs="?", const="", metavar="KIND",
+                        help="emit a 'decision' line for every gesture rule record "
+                             "(only kinds starting with KIND, e.g. wave or heart)")
+    parser.add_argument("--decision-trace", metavar="PATH", default=os.environ.get("TOPINI_DECISION_TRACE"),
+                        help="write the last gesture rule records to PATH (JSON lines) at the end")
+    return parser
+
+
+class SyncFileReader:
+    """Reads a video file frame by frame in the caller's thread (no pacing, no drops)."""
+
+    def __init__(self, path: str, loop: bool = False) -> None:
+        self.cap = cv2.VideoCapture(path)
+        self.loop = loop
+        self.frames_captured = 0
+        self.is_running = self.cap.isOpened()
+
+    def start(self) -> None:
+        pass
+
+    def frame_size(self) -> Optional[Tuple[int, int]]:
+        if not self.cap.isOpened():
+            return None
+        return int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def read_frame(self) -> Optional[CapturedFrame]:
+        ok, frame = self.cap.read()
+        if not ok and self.loop and self.frames_captured:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+        if not ok:
+            self.is_running = False
+            return None
+        self.frames_captured += 1
+        return CapturedFrame(frame, self.frames_captured, time.perf_counter())
+
+    def stop(self) -> None:
+        self.cap.release()
+
+
+def run(args: argparse.Namespace) -> int:
+    resolution = (args.width, args.height) if args.width and args.height else None
+    if args.sync and args.file:
+        capture: Any = SyncFileReader(args.file, loop=args.loop)
+    else:
+        capture = VideoCaptureThread(
+            device_index=args.camera, fps=args.fps, source=args.file,
+            resolution=resolution, loop=args.loop,
+            on_status=lambda status: emit({"type": "capture", **asdict(status)}),
+        )
+
+    t_load = time.perf_counter()
+    from src.core.hand_tracker import HandTracker  # heavy MediaPipe import
+    tracker = HandTracker()
+    detector = detector_from_env()
+    load_ms = (time.perf_counter() - t_load) * 1000.0
+    decisions = None
+    if args.explain is not None or args.decision_trace:
+        rules = find_rule_detector(detector)
+        if rules is None:
+            emit({"type": "error", "reason": "decision trace needs the rule detector"})
+        else:
+            decisions = rules.enable_trace()
+    decisions_seen = 0
+
+    capture.start()
+    size = capture.frame_size()
+    emit({
+        "type": "start",
+        "source": args.file if args.file else args.camera,
+        "width": size[0] if size else None,
+        "height": size[1] if size else None,
+        "fps": args.fps,
+        "tracker_load_ms": round(load_ms, 1),
+    })
+    if size is None:
+        emit({"type": "error", "reason": "source not opened"})
+        tracker.close()
+        return 2
+
+    stats = StageStats(STAGES)
+    started = time.perf_counter()
+    last_report = started
+    last_seq = 0
+    frames = 0
+    events: List[Dict[str, Any]] = []
+    exit_code = 0
+    try:
+        while True:
+            now = time.perf_counter()
+            if args.duration and now - started >= args.duration:
+                break
+            if frames == 0 and now - started >= args.health_timeout:
+                emit({"type": "error", "reason": "no frames", "timeout_s": args.health_timeout})
+                exit_code = 2
+                break
+            if not capture.is_running and capture.frames_captured == last_seq:
+                break  # end of file
+
+            t0 = time.perf_counter()
+            captured = capture.read_frame()
+            t1 = time.perf_counter()
+            if captured is None or captured.seq == last_seq:
+                time.sleep(0.001)
+                continue
+            last_seq = captured.seq
+            frame = captured.frame_bgr
+
+            if not args.no_mirror:
+                frame = cv2.flip(frame, 1)
+            t2 = time.perf_counter()
+            hands = tracker.process(frame)
+            t3 = time.perf_counter()
+            if args.draw:
+                tracker.draw(frame, hands)
+            t4 = time.perf_counter()
+            event = detector.detect(hands)
+            t5 = time.perf_counter()
+
+            frames += 1
+            timings = {
+                "read": (t1 - t0) * 1000.0,
+                "flip": (t2 - t1) * 1000.0,
+                "process": (t3 - t2) * 1000.0,
+                "draw": (t4 - t3) * 1000.0,
+                "detect": (t5 - t4) * 1000.0,
+                "total": (t5 - t0) * 1000.0,
+            }
+            for stage, ms in timings.items():
+                stats.add(stage, ms)
+            if tracer.enabled:
+                tracer.complete("tick", t0, t5, captured.seq)
+                tracer.complete("tracker.process", t2, t3, captured.seq, flow="step")
+                tracer.complete("detector.detect", t4, t5, captured.seq)
+            if args.per_frame:
+                emit({"type": "frame", "seq": captured.seq, "hands": len(hands),
+                      "age_ms": round((t5 - captured.timestamp) * 1000.0, 3),
+                      **{k: round(v, 3) for k, v in timings.items()}})
+            if decisions is not None and args.explain is not None:
+                for row in decisions.rows(decisions_seen):
+                    if row["kind"].startswith(args.explain):
+                        emit({"type": "decision", "frame": captured.seq, **row})
+                decisions_seen = decisions.total
+            if event is not None:
+                record = {"type": "event", "t": round(t5 - started, 3), "seq": captured.seq,
+                          "name": event.name, "confidence": round(event.confidence, 3),
+                          "hands": event.hands_involved}
+                events.append(record)
+                emit(record)
+
+            if t5 - last_report >= args.report_interval:
+                elapsed = t5 - started
+                emit({"type": "stats", "elapsed_s": round(elapsed, 3), "frames": frames,
+                      "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+                      "stages": stats.summary()})
+                last_report = t5
+    except KeyboardInterrupt:
+        pass
+    finally:
+        capture.stop()
+        tracker.close()
+        if decisions is not None and args.decision_trace:
+            written = decisions.dump(args.decision_trace)
+            emit({"type": "decision_trace", "path": args.decision_trace, "records": written})
+
+    elapsed = time.perf_counter() - started
+    emit({
+        "type": "summary",
+        "elapsed_s": round(elapsed, 3),
+        "frames": frames,
+        "frames_captured": capture.frames_captured,
+        "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        "events": len(events),
+        "stages": stats.summary(),
+        **({"outages": capture.outages.summary()} if isinstance(capture, VideoCaptureThread) else {}),
+    })
+    return exit_code
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    tracer.configure_from_env()
+    try:
+        return run(args)
+    finally:
+        tracer.stop(wait=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Build and inspect columnar landmark datasets (``core.landmark_dataset``).
+
+    python -m src.tools.landmark_dataset convert recordings/ --output landmarks.ds
+    python -m src.tools.landmark_dataset convert rec.jsonl --output landmarks.ds --label wave
+    python -m src.tools.landmark_dataset info landmarks.ds
+
+``convert`` appends JSON-lines recordings (the F8 / TOPINI_RECORD recorder,
+or a ``batch_videos`` output directory) to a dataset, creating it if needed;
+each file is a session named after it. ``--label`` labels the hands that
+carry no label of their own. ``info`` prints records, sessions, labels and
+size as JSON; ``--session``/``--start``/``--end`` or ``--label`` also
+print the matching record ranges.
+
+Train on a dataset with ``src.tools.train_classifier --sessions landmarks.ds``.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+if __package__ in (None, "") and __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.landmark_dataset import DEFAULT_CHUNK_RECORDS, LandmarkDataset, append_recording, recordings_in
+
+
+def convert(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    if os.path.exists(os.path.join(args.output, "meta.json")):
+        dataset = LandmarkDataset.open(args.output, mode="a")
+    else:
+        dataset = LandmarkDataset.create(args.output, chunk_records=args.chunk_records)
+    added = 0
+    files = recordings_in(args.inputs)
+    with dataset:
+        for path in files:
+            name = os.path.splitext(os.path.basename(path))[0]
+            if name in dataset.sessions:
+                print(f"Skipping {path}: session {name!r} already in the dataset", file=sys.stderr)
+                continue
+            try:
+                added += append_recording(dataset, path, label=args.label)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Cannot convert {path}: {e}", file=sys.stderr)
+    print(json.dumps({"files": len(files), "added": added, "elapsed_s": round(time.perf_counter() - start, 3),
+                      **dataset.info()}, indent=2))
+    return 0
+
+
+def info(args: argparse.Namespace) -> int:
+    dataset = LandmarkDataset.open(args.dataset)
+    report: Dict[str, Any] = dataset.info()
+    if args.session or args.start is not None or args.end is not None:
+        ranges = dataset.time_range(args.start if args.start is not None else float("-inf"),
+                                    args.end if args.end is not None else float("inf"), args.session)
+        report["time_ranges"] = ranges
+        report["time_records"] = sum(b - a for a, b in ranges)
+    if args.label:
+        report["label_ranges"] = dataset.label_ranges(args.label)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.tools.landmark_dataset", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    conv = commands.add_parser("convert", help="append JSON-lines recordings to a dataset")
+    conv.add_argument("inputs", nargs="+", help="recordings (.jsonl) or directories of recordings")
+    conv.add_argument("--output", required=True, help="dataset directory")
+    conv.add_argument("--label", help="label of the hands without one")
+    conv.add_argument("--chunk-records", type=int, default=DEFAULT_CHUNK_RECORDS,
+                      help="records per chunk of a new dataset")
+    show = commands.add_parser("info", help="print a dataset summary")
+    show.add_argument("dataset", help="dataset directory")
+    show.add_argument("--session", help="only this session in the time ranges")
+    show.add_argument("--start", type=float, help="time range start (seconds)")
+    show.add_argument("--end", type=float, help="time range end (seconds)")
+    show.add_argument("--label", help="print the record ranges with this label")
+    args = parser.parse_args(argv)
+    try:
+        return convert(args) if args.command == "convert" else info(args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+Load generator for the landmark ingestion server: opens many sessions that
+stream synthetic hand landmarks (waves, hearts, middle fingers, idle hands)
+at a fixed rate and measure the event reply latency.
+
+    python -m src.tools.landmark_loadgen --sessions 2000 --fps 5 --duration 30
+    python -m src.tools.landmark_loadgen --sessions 200 --migrate-after 10 --migrate-to 127.0.0.1:7421
+
+With ``--migrate-after`` every session, after that many seconds, asks its
+server for a detector snapshot, leaves the session (BYE), reconnects to
+``--migrate-to`` (default: the same server) and restores it there, then keeps
+streaming.
+
+Prints JSON lines: ``stats`` every ``--report-interval`` seconds and a final
+``summary`` with frames sent, events per gesture and latency percentiles
+(frame sent -> event received).
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+if __package__ in (None, "") and __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core import landmark_protocol as proto
+from src.core.landmark_server import raise_open_files_limit
+from src.utils.metrics import RollingStats
+from src.utils.synthetic_hands import SyntheticHandGenerator
+
+# frame già codificati di una scena: (numero mani, record mani), timestamp, durata
+Scene = Tuple[List[Tuple[int, bytes]], List[float], float]
+
+
+def emit(record: Dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(record, separators=(",", ":")) + "\n")
+    sys.stdout.flush()
+
+
+def build_scenes(fps: float, frames: int, seed: int) -> List[Scene]:
+    """A few looping scenes with the hand records pre-encoded, so the clients
+    only pack a frame header per message."""
+    gen = SyntheticHandGenerator(fps=fps, seed=seed)
+    layouts = [
+        [gen.track("wave", frequency=2.5)],
+        [gen.track("heart")],
+        [gen.track("idle")],
+        [gen.track("middle_finger")],
+        [gen.track("wave", rotation=25.0, amplitude=10.0), gen.track("idle", center=(300, 500))],
+        [gen.track("open_palm")],
+    ]
+    scenes: List[Scene] = []
+    for tracks in layouts:
+        batch = gen.scene(frames, tracks, noise=1.0, dropout=0.02)
+        encoded = []
+        for i in range(batch.n_frames):
+            hands = batch.hands_at(i)
+            encoded.append((len(hands), b"".join(proto.encode_hand(h.points, h.handedness, h.score)
+                                                 for h in hands)))
+        scenes.append((encoded, batch.timestamps.tolist(), frames / fps))
+    return scenes
+
+
+class LoadStats:
+    def __init__(self) -> None:
+        self.connected = 0
+        self.frames = 0
+        self.events: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.latency_ms = RollingStats(20000)
+        self.migrations = 0
+        self.migrate_ms = RollingStats(5000)
+
+    def summary(self) -> Dict[str, Any]:
+        lat = self.latency_ms.summary()
+        mig = self.migrate_ms.summary()
+        return {
+            "connected": self.connected,
+            "frames": self.frames,
+            "events": dict(self.events),
+            "errors": dict(self.errors),
+            "latency_p50_ms": round(lat["p50"], 3),
+            "latency_p95_ms": round(lat["p95"], 3),
+            "latency_p99_ms": round(self.latency_ms.percentiles(99)[0], 3) if len(self.latency_ms) else 0.0,
+            "migrations": self.migrations,
+            "migrate_p95_ms": round(mig["p95"], 3),
+        }
+
+
+class _Link:
+    """One connection of a session: sends frames, a background task reads replies."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 sent_at: List[float], stats: LoadStats) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.sent_at = sent_at
+        self.stats = stats
+        self.replies: "asyncio.Queue[Tuple[int, bytes]]" = asyncio.Queue()
+        self.task = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        try:
+            while True:
+                header = await self.reader.readexactly(proto.HEADER.size)
+                length, msg_type = proto.HEADER.unpack(header)
+                payload = await self.reader.readexactly(length) if length else b""
+                if msg_type == proto.EVENT:
+                    seq, event = proto.decode_event(payload)
+                    self.stats.events[event.name] += 1
+                    self.stats.latency_ms.add((time.perf_counter() - self.sent_at[seq % len(self.sent_at)]) * 1000.0)
+                elif msg_type == proto.ERROR:
+                    self.stats.errors[payload.decode("utf-8", "replace")] += 1
+                    return
+                else:
+                    self.replies.put_nowait((msg_type, payload))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+
+    async def request(self, message: bytes, expect: int, timeout: float = 10.0) -> bytes:
+        self.writer.write(message)
+        msg_type, payload = await asyncio.wait_for(self.replies.get(), timeout)
+        if msg_type != expect:
+            raise proto.ProtocolError(f"expected message {expect}, got {msg_type}")
+        return payload
+
+    async def close(self, bye: bool = True, wait: bool = False) -> None:
+        """Close the connection; with ``wait``, only after the server has
+        closed its side in reply to BYE (the session is then released)."""
+        if not self.writer.is_closing():
+            if bye:
+                self.writer.write(proto.pack(proto.BYE))
+                if wait:
+                    await asyncio.wait({self.task}, timeout=5.0)
+            self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        self.task.cancel()
+
+
+async def _connect(address: Tuple[str, int], sent_at: List[float], stats: LoadStats) -> _Link:
+    reader, writer = await asyncio.open_connection(*address)
+    return _Link(reader, writer, sent_at, stats)
+
+
+async def run_session(index: int, args: argparse.Namespace, scene: Scene, stats: LoadStats,
+                      start_at: float, stop_at: float) -> None:
+    frames, timestamps, period = scene
+    session_id = f"load-{index}"
+    sent_at = [0.0] * 256  # tempo di invio per seq % 256, per la latenza degli eventi
+    address = (args.host, args.port)
+    try:
+        link = await _connect(address, sent_at, stats)
+        await link.request(proto.encode_hello(session_id), proto.WELCOME)
+    except (OSError, asyncio.TimeoutError, proto.ProtocolError) as e:
+        stats.errors[f"connect: {type(e).__name__}"] += 1
+        return
+    stats.connected += 1
+    migrate_at = start_at + args.migrate_after if args.migrate_after > 0 else float("inf")
+    offset = random.randrange(len(frames))  # sessioni sfasate sulla stessa scena
+    seq = 0
+    interval = 1.0 / args.fps
+    try:
+        while True:
+            due = start_at + seq * interval
+            now = time.perf_counter()
+            if due >= stop_at:
+                break
+            if due > now:
+                await asyncio.sleep(due - now)
+            if link.task.done():
+                stats.errors["disconnected"] += 1
+                return
+            if time.perf_counter() >= migrate_at:
+                migrate_at = float("inf")
+                link = await _migrate(link, session_id, args, sent_at, stats)
+            lap, i = divmod(seq + offset, len(frames))
+            n_hands, hand_bytes = frames[i]
+            sent_at[seq % len(sent_at)] = time.perf_counter()
+            # il tempo della scena continua tra un giro e l'altro
+            link.writer.write(proto.encode_frame_raw(seq, timestamps[i] + lap * period, n_hands, hand_bytes))
+            stats.frames += 1
+            seq += 1
+            if link.writer.transport.get_write_buffer_size() > 65536:
+                await link.writer.drain()
+    except (OSError, asyncio.TimeoutError, proto.ProtocolError) as e:
+        stats.errors[type(e).__name__] += 1
+    finally:
+        stats.connected -= 1
+        await link.close()
+
+
+async def _migrate(link: _Link, session_id: str, args: argparse.Namespace, sent_at: List[float],
+                   stats: LoadStats) -> _Link:
+    start = time.perf_counter()
+    blob = await link.request(proto.pack(proto.SNAPSHOT_REQ), proto.SNAPSHOT)
+    target = _parse_address(args.migrate_to) if args.migrate_to else (args.host, args.port)
+    # prima si lascia la sessione: un RESTORE che la trova ancora aperta è un subentro
+    # (ERROR al vecchio collegamento), non una migrazione
+    await link.close(wait=True)
+    new_link = await _connect(target, sent_at, stats)
+    await new_link.request(proto.pack(proto.RESTORE, blob), proto.WELCOME)
+    stats.migrations += 1
+    stats.migrate_ms.add((time.perf_counter() - start) * 1000.0)
+    return new_link
+
+
+def _parse_address(text: str) -> Tuple[str, int]:
+    host, port = text.rsplit(":", 1)
+    return host, int(port)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    random.seed(args.seed)
+    limit = raise_open_files_limit(args.sessions + 64)
+    scenes = build_scenes(args.fps, max(60, int(args.fps * 12)), args.seed)
+    stats = LoadStats()
+    t0 = time.perf_counter()
+    stop_at = t0 + args.duration
+    emit({"type": "start", "sessions": args.sessions, "fps": args.fps, "open_files_limit": limit})
+
+    async def report() -> None:
+        last_frames = 0
+        while True:
+            await asyncio.sleep(args.report_interval)
+            emit({"type": "stats", "elapsed_s": round(time.perf_counter() - t0, 1),
+                  "frames_per_s": round((stats.frames - last_frames) / args.report_interval, 1),
+                  **stats.summary()})
+            last_frames = stats.frames
+
+    reporter = asyncio.create_task(report())
+    tasks = []
+    for i in range(args.sessions):
+        # apertura graduale: ``--ramp`` nuove sessioni al secondo
+        start_at = t0 + i / args.ramp
+        delay = start_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(run_session(i, args, scenes[i % len(scenes)], stats, start_at, stop_at)))
+    await asyncio.gather(*tasks)
+    reporter.cancel()
+    elapsed = time.perf_counter() - t0
+    summary = {"type": "summary", "elapsed_s": round(elapsed, 1),
+               "frames_per_s": round(stats.frames / elapsed, 1), **stats.summary()}
+    emit(summary)
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.tools.landmark_loadgen", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="server address")
+    parser.add_argument("--port", type=int, default=7420, help="server port")
+    parser.add_argument("--sessions", type=int, default=1000, help="concurrent sessions")
+    parser.add_argument("--fps", type=float, default=10.0, help="frames per second per session")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to stream")
+    parser.add_argument("--ramp", type=float, default=500.0, help="new sessions per second at start")
+    parser.add_argument("--migrate-after", type=float, default=0.0,
+                        help="seconds after which every session moves (snapshot + restore); 0 = never")
+    parser.add_argument("--migrate-to", help="host:port of the server sessions move to (default: same)")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="seconds between stats lines")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic scenes")
+    args = parser.parse_args(argv)
+    try:
+        summary = asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 0
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
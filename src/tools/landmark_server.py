@@ -0,0 +1,73 @@
+"""
+Landmark ingestion server: receives hand landmarks from thin clients and
+answers with gesture events, one GestureDetector per session.
+
+    python -m src.tools.landmark_server --port 7420
+    python -m src.tools.landmark_loadgen --sessions 2000 --fps 5   # in another shell
+
+Prints one JSON ``stats`` line on stdout every ``--report-interval`` seconds
+(sessions, frames, events, detection time percentiles). See
+``src/core/landmark_protocol.py`` for the wire format.
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+if __package__ in (None, "") and __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.landmark_server import LandmarkServer, raise_open_files_limit
+
+
+def emit(record: Dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(record, separators=(",", ":")) + "\n")
+    sys.stdout.flush()
+
+
+async def run(args: argparse.Namespace) -> None:
+    server = LandmarkServer(args.host, args.port, idle_timeout_s=args.idle_timeout)
+    await server.start()
+    emit({"type": "start", "host": args.host, "port": server.port,
+          "open_files_limit": raise_open_files_limit(args.max_sessions + 64)})
+    started = time.perf_counter()
+    last_frames = 0
+    try:
+        while True:
+            await asyncio.sleep(args.report_interval)
+            stats = server.stats()
+            elapsed = time.perf_counter() - started
+            emit({"type": "stats", "elapsed_s": round(elapsed, 1),
+                  "frames_per_s": round((stats["frames"] - last_frames) / args.report_interval, 1),
+                  **stats})
+            last_frames = stats["frames"]
+    finally:
+        await server.close()
+        emit({"type": "summary", "elapsed_s": round(time.perf_counter() - started, 1), **server.stats()})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.tools.landmark_server", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0", help="listen address")
+    parser.add_argument("--port", type=int, default=7420, help="listen port (0 = any free port)")
+    parser.add_argument("--idle-timeout", type=float, default=60.0,
+                        help="close sessions silent for this many seconds (0 = never)")
+    parser.add_argument("--max-sessions", type=int, default=10000,
+                        help="raise the open files limit to fit this many sessions")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="seconds between stats lines")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Record a custom motion gesture (a circle, a beckon, ...) as DTW templates for
+the app's ``TemplateMatcher``.
+
+    python -m src.tools.record_template --name cerchio --examples 3 --duration 1.2
+    python -m src.tools.record_template --list
+    python -m src.tools.record_template --remove cerchio
+
+Each example starts after a countdown and lasts ``--duration`` seconds; make
+the gesture once with one hand (with two in view the larger one is used).
+The recognition threshold is derived from how much the examples differ, so
+record at least two. The library is a JSON file (default
+``~/.topini/templates.json``), read by the app at start-up; point
+TOPINI_TEMPLATES at another file to use it instead.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, List, Optional
+
+if __package__ in (None, "") and __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+
+from src.core.gesture_templates import (
+    TemplateLibrary, TrackSample, default_library_path, dtw_distance, make_series, sample_hand,
+)
+
+
+def _load(path: str) -> TemplateLibrary:
+    if not os.path.exists(path):
+        return TemplateLibrary()
+    return TemplateLibrary.load(path)
+
+
+def record_example(capture: Any, tracker: Any, duration_s: float, countdown_s: float,
+                   mirror: bool = True) -> Optional[np.ndarray]:
+    """Countdown, then the track of the largest hand for ``duration_s``
+    seconds as a template series; None if the hand was not seen throughout."""
+    import cv2
+
+    for remaining in range(int(round(countdown_s)), 0, -1):
+        print(f"  {remaining}...", flush=True)
+        time.sleep(1.0)
+    print("  go!", flush=True)
+    samples: List[TrackSample] = []
+    last_seq = 0
+    start = time.perf_counter()
+    end = start + duration_s
+    while time.perf_counter() < end + 0.05:
+        captured = capture.read_frame()
+        if captured is None or captured.seq == last_seq:
+            time.sleep(0.002)
+            continue
+        last_seq = captured.seq
+        frame = cv2.flip(captured.frame_bgr, 1) if mirror else captured.frame_bgr
+        hands = tracker.process(frame)
+        if hands:
+            samples.append(max((sample_hand(h, captured.timestamp) for h in hands), key=lambda s: s.scale))
+    return make_series(samples, start, end)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.tools.record_template", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--name", help="gesture name (the GestureEvent name)")
+    parser.add_argument("--examples", type=int, default=3, help="examples to record")
+    parser.add_argument("--duration", type=float, default=1.2, help="seconds per example")
+    parser.add_argument("--countdown", type=float, default=3.0, help="seconds before each example")
+    parser.add_argument("--margin", type=float, default=1.5,
+                        help="threshold = margin x largest distance between the examples")
+    parser.add_argument("--camera", type=int, default=0, help="camera device index")
+    parser.add_argument("--no-mirror", action="store_true", help="do not flip frames horizontally")
+    parser.add_argument("--library", default=os.environ.get("TOPINI_TEMPLATES") or default_library_path(),
+                        help="template library file")
+    parser.add_argument("--list", action="store_true", help="print the recorded gestures and exit")
+    parser.add_argument("--remove", metavar="NAME", help="delete a gesture's templates and exit")
+    args = parser.parse_args(argv)
+
+    library = _load(args.library)
+    if args.list:
+        counts = {name: sum(t.name == name for t in library.templates) for name in library.names()}
+        print(json.dumps({"library": args.library, "gestures": [
+            {"name": name, "templates": counts[name],
+             "duration_s": next(t.duration_s for t in library.templates if t.name == name),
+             "threshold": next(t.threshold for t in library.templates if t.name == name)}
+            for name in library.names()]}, indent=2))
+        return 0
+    if args.remove:
+        removed = library.remove(args.remove)
+        if not removed:
+            print(f"No gesture named {args.remove!r} in {args.library}", file=sys.stderr)
+            return 1
+        library.save(args.library)
+        print(f"Removed {removed} templates of {args.remove!r}")
+        return 0
+    if not args.name:
+        parser.error("--name is required to record")
+    if args.name in library.names():
+        print(f"{args.name!r} already recorded: new examples are added with their own threshold")
+
+    from src.core.hand_tracker import HandTracker  # import pesante di MediaPipe
+    from src.core.video_capture import VideoCaptureThread
+
+    capture = VideoCaptureThread(device_index=args.camera, fps=30)
+    tracker = HandTracker()
+    capture.start()
+    examples: List[np.ndarray] = []
+    try:
+        if capture.frame_size() is None:
+            print(f"Camera {args.camera} not opened", file=sys.stderr)
+            return 2
+        attempts = 0
+        while len(examples) < args.examples and attempts < args.examples * 3:
+            attempts += 1
+            print(f"Example {len(examples) + 1}/{args.examples}: make the gesture '{args.name}'")
+            series = record_example(capture, tracker, args.duration, args.countdown, not args.no_mirror)
+            if series is None:
+                print("  hand not tracked for the whole example, again")
+                continue
+            examples.append(series)
+    finally:
+        capture.stop()
+        tracker.close()
+    if not examples:
+        print("No example recorded", file=sys.stderr)
+        return 1
+
+    added = library.record(args.name, examples, args.duration, margin=args.margin)
+    library.save(args.library)
+    distances = [dtw_distance(a, b, library.band) for i, a in enumerate(examples) for b in examples[i + 1:]]
+    print(json.dumps({
+        "name": args.name,
+        "templates": len(added),
+        "threshold": added[0].threshold,
+        "max_example_distance": round(max(distances), 4) if distances else None,
+        "library": args.library,
+        "library_size": len(library),
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
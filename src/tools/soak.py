@@ -0,0 +1,253 @@
+"""
+Long-running soak test: drives GesturePage (offscreen Qt) from a looping video
+file and tracks memory and latency drift.
+
+    python -m src.tools.soak --file clip.mp4 --duration 4h --output soak.json
+
+Every ``--sample-interval`` it records RSS, live Python object counts (total
+and top types), tracemalloc top growing allocation sites and per-stage latency
+percentiles of the page's _on_tick. Every ``--cycle-interval`` the page is
+stopped and restarted, like a visitor going back to the home page, which
+reopens the capture source. The JSON report ends with a linear trend per
+metric and flags the ones growing faster than ``--growth-threshold``.
+"""
+
+from __future__ import annotations
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+if __package__ in (None, "") and __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from PySide6 import QtCore, QtWidgets
+
+from src.utils.metrics import TICK_STAGES
+
+
+def parse_duration(text: str) -> float:
+    """'90', '90s', '15m', '4h' -> seconds."""
+    text = text.strip().lower()
+    units = {"s": 1.0, "m": 60.0, "h": 3600.0}
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB (Linux /proc, else peak RSS if available)."""
+    try:
+        with open("/proc/self/statm", "r") as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return None
+
+
+def linear_trend(xs: List[float], ys: List[float]) -> Tuple[float, float]:
+    """Least-squares (slope, intercept) of ys over xs."""
+    n = len(xs)
+    if n < 2:
+        return 0.0, (ys[0] if ys else 0.0)
+    mx, my = sum(xs) / n, sum(ys) / n
+    var = sum((x - mx) ** 2 for x in xs)
+    if var == 0:
+        return 0.0, my
+    slope = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var
+    return slope, my - slope * mx
+
+
+class SoakRunner(QtCore.QObject):
+    def __init__(self, args: argparse.Namespace, app: QtWidgets.QApplication) -> None:
+        super().__init__()
+        import cv2
+        from src.ui.gesture_page import GesturePage
+        from src.ui.theme import STYLE_SHEET
+        from src.core.hand_tracker import HandTracker
+        from src.core.video_capture import VideoCaptureThread
+
+        self.args = args
+        self.app = app
+        self.window = QtWidgets.QMainWindow()
+        self.page = GesturePage()
+        self.window.setCentralWidget(self.page)
+        self.window.setStyleSheet(STYLE_SHEET)
+        self.window.resize(1100, 700)
+        self.window.show()
+
+        # stesso percorso dei componenti pronti dal BackgroundInitializer (tracker già scaldato)
+        capture = VideoCaptureThread(source=args.file, loop=True, fps=args.fps)
+        tracker = HandTracker()
+        probe = cv2.VideoCapture(args.file)
+        size = (int(probe.get(cv2.CAP_PROP_FRAME_WIDTH)), int(probe.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        probe.release()
+        if size[0] > 0 and size[1] > 0:
+            tracker.warm_up(*size)
+        self.page._on_hand_tracker_ready(tracker)
+        self.page._on_video_capture_ready(capture)
+        self.page._on_all_components_ready()
+        self.page.metrics.enabled = True
+
+        self.samples: List[Dict[str, Any]] = []
+        self.cycles = 0
+        self.started = time.perf_counter()
+        self._baseline_snapshot: Optional[tracemalloc.Snapshot] = None
+        if args.tracemalloc_frames > 0:
+            tracemalloc.start(args.tracemalloc_frames)
+
+        self._sample_timer = QtCore.QTimer(self)
+        self._sample_timer.timeout.connect(self.sample)
+        self._cycle_timer = QtCore.QTimer(self)
+        self._cycle_timer.timeout.connect(self.cycle)
+
+    def run(self) -> None:
+        # lascia assestare la finestra prima di avviare la pagina
+        QtCore.QTimer.singleShot(1000, self._begin)
+        QtCore.QTimer.singleShot(int(self.args.duration * 1000) + 1000, self.finish)
+
+    def _begin(self) -> None:
+        self.page.start()
+        self.started = time.perf_counter()
+        if self.args.tracemalloc_frames > 0:
+            self._baseline_snapshot = tracemalloc.take_snapshot()
+        self.sample()
+        self._sample_timer.start(int(self.args.sample_interval * 1000))
+        if self.args.cycle_interval > 0:
+            self._cycle_timer.start(int(self.args.cycle_interval * 1000))
+
+    def cycle(self) -> None:
+        """stop() + start() of the page, as when going back to the home page and in again."""
+        self.page.stop()
+        self.app.processEvents()
+        QtCore.QTimer.singleShot(200, self.page.start)
+        self.cycles += 1
+
+    def sample(self) -> None:
+        gc.collect()
+        objects = gc.get_objects()
+        top_types = Counter(type(o).__name__ for o in objects).most_common(self.args.top)
+        m = self.page.metrics
+        stages = {name: m.stages.get(name).summary() for name in TICK_STAGES + ("tick",) if m.stages.get(name)}
+        record: Dict[str, Any] = {
+            "t_s": round(time.perf_counter() - self.started, 1),
+            "rss_mb": rss_mb(),
+            "objects": len(objects),
+            "top_types": dict(top_types),
+            "cycles": self.cycles,
+            "frames_processed": m.inferences,
+            "capture_dropped": m.capture_dropped,
+            "stages": {k: {q: round(v, 3) for q, v in s.items()} for k, s in stages.items()},
+            "frame_age": {q: round(v, 3) for q, v in m.frame_age.summary().items()},
+        }
+        del objects
+        if self._baseline_snapshot is not None:
+            snapshot = tracemalloc.take_snapshot()
+            stats = snapshot.compare_to(self._baseline_snapshot, "lineno")[:self.args.top]
+            record["tracemalloc_top"] = [
+                {"where": str(s.traceback[0]), "size_diff_kb": round(s.size_diff / 1024, 1), "count_diff": s.count_diff}
+                for s in stats
+            ]
+        self.samples.append(record)
+        # finestre di latenza indipendenti per ogni campione
+        m.stages.clear()
+        m.frame_age.clear()
+        print(f"[soak] t={record['t_s']:.0f}s rss={record['rss_mb'] or 0:.1f}MB objects={record['objects']} "
+              f"tick_p95={record['stages'].get('tick', {}).get('p95', 0):.2f}ms cycles={self.cycles}",
+              file=sys.stderr)
+
+    def trends(self) -> Dict[str, Dict[str, Any]]:
+        """Linear growth per hour of each tracked series, flagged above the threshold."""
+        if len(self.samples) < 3:
+            return {}
+        series: Dict[str, List[Tuple[float, float]]] = {}
+
+        def add(name: str, t: float, value: Optional[float]) -> None:
+            if value is not None:
+                series.setdefault(name, []).append((t, value))
+
+        for s in self.samples[1:]:  # il primo campione include ancora il riscaldamento
+            t = s["t_s"] / 3600.0
+            add("rss_mb", t, s["rss_mb"])
+            add("objects", t, s["objects"])
+            add("frame_age_p95", t, s["frame_age"].get("p95"))
+            for stage, summary in s["stages"].items():
+                add(f"{stage}_p95", t, summary.get("p95"))
+
+        hours = max(1e-6, (self.samples[-1]["t_s"] - self.samples[1]["t_s"]) / 3600.0)
+        out: Dict[str, Dict[str, Any]] = {}
+        for name, points in series.items():
+            xs, ys = [p[0] for p in points], [p[1] for p in points]
+            slope, intercept = linear_trend(xs, ys)
+            start = intercept + slope * xs[0]
+            growth = (slope * hours) / start if start > 0 else 0.0
+            out[name] = {
+                "start": round(start, 3),
+                "per_hour": round(slope, 3),
+                "relative_growth": round(growth, 4),
+                "flagged": growth > self.args.growth_threshold,
+            }
+        return out
+
+    def finish(self) -> None:
+        self._sample_timer.stop()
+        self._cycle_timer.stop()
+        self.sample()
+        self.page.stop()
+        trends = self.trends()
+        report = {
+            "file": self.args.file,
+            "duration_s": round(time.perf_counter() - self.started, 1),
+            "cycles": self.cycles,
+            "samples": self.samples,
+            "trends": trends,
+            "flagged": sorted(name for name, t in trends.items() if t["flagged"]),
+        }
+        with open(self.args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"[soak] report written to {self.args.output}; flagged: {report['flagged'] or 'none'}",
+              file=sys.stderr)
+        if self.page.tracker is not None:
+            self.page.tracker.close()
+        self.app.exit(1 if report["flagged"] else 0)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.tools.soak", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", required=True, help="video file played in a loop as the camera")
+    parser.add_argument("--fps", type=int, default=30, help="playback rate of the file")
+    parser.add_argument("--duration", type=parse_duration, default=3600.0, help="e.g. 90s, 30m, 4h (default 1h)")
+    parser.add_argument("--sample-interval", type=parse_duration, default=60.0, help="seconds between samples")
+    parser.add_argument("--cycle-interval", type=parse_duration, default=300.0,
+                        help="stop/start the page this often (0 = never)")
+    parser.add_argument("--tracemalloc-frames", type=int, default=1,
+                        help="traceback depth for tracemalloc (0 disables it)")
+    parser.add_argument("--top", type=int, default=10, help="entries in the top types/allocators lists")
+    parser.add_argument("--growth-threshold", type=float, default=0.10,
+                        help="flag metrics growing more than this fraction over the run")
+    parser.add_argument("--output", default="soak_report.json", help="JSON report path")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.file):
+        parser.error(f"file not found: {args.file}")
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    runner = SoakRunner(args, app)
+    runner.run()
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
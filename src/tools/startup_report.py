@@ -0,0 +1,80 @@
+"""
+Summary of the startup log written by the app on every launch.
+
+    python -m src.tools.startup_report --last 20
+
+For each milestone (imports, window_shown, gesture_page_built, interactive,
+components_ready) prints median, p95 and the latest value over the selected
+launches next to the budget; exits with 1 when the p95 of a milestone is over
+its budget, so it can gate a CI job that launches the app a few times.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+if __package__ in (None, "") and __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.metrics import percentile
+from src.utils.startup import DEFAULT_BUDGET_MS, default_log_path, load_log, parse_budget
+
+
+def summarize(entries: List[Dict[str, Any]], budget: Dict[str, float]) -> Dict[str, Dict[str, Any]]:
+    series: Dict[str, List[float]] = {}
+    for entry in entries:
+        for name, ms in entry.get("marks_ms", {}).items():
+            series.setdefault(name, []).append(float(ms))
+    out: Dict[str, Dict[str, Any]] = {}
+    for name, values in series.items():
+        ordered = sorted(values)
+        p95 = percentile(ordered, 95)
+        limit = budget.get(name)
+        out[name] = {
+            "n": len(values),
+            "p50": round(percentile(ordered, 50), 1),
+            "p95": round(p95, 1),
+            "last": round(values[-1], 1),
+            "budget": limit,
+            "over": limit is not None and p95 > limit,
+        }
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.tools.startup_report", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", default=os.environ.get("TOPINI_STARTUP_LOG") or default_log_path(),
+                        help="startup log (JSON lines)")
+    parser.add_argument("--last", type=int, default=20, help="number of most recent launches (0 = all)")
+    parser.add_argument("--budget", default="", help="overrides, e.g. window_shown=500,interactive=1500")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    entries = load_log(args.log)
+    if args.last > 0:
+        entries = entries[-args.last:]
+    if not entries:
+        print(f"No launches recorded in {args.log}", file=sys.stderr)
+        return 2
+    budget = dict(DEFAULT_BUDGET_MS)
+    budget.update(parse_budget(args.budget))
+    summary = summarize(entries, budget)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"{len(entries)} launches from {args.log}")
+        print(f"{'milestone':<20}{'p50':>9}{'p95':>9}{'last':>9}{'budget':>9}")
+        for name, s in summary.items():
+            limit = f"{s['budget']:.0f}" if s["budget"] is not None else "-"
+            flag = "  OVER" if s["over"] else ""
+            print(f"{name:<20}{s['p50']:>9.0f}{s['p95']:>9.0f}{s['last']:>9.0f}{limit:>9}{flag}")
+    return 1 if any(s["over"] for s in summary.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+Train the learned gesture classifier and compare it with the threshold rules.
+
+    python -m src.tools.train_classifier --model mlp
+    python -m src.tools.train_classifier --sessions rec1.jsonl rec2.jsonl --model knn --output gestures.npz
+
+Training data are labelled JSON-lines recordings or landmark datasets
+(``--sessions``, formats in ``gesture_classifier.load_sessions`` and
+``landmark_dataset``) and/or ``--synthetic`` procedurally
+generated sessions. Sessions are split into train and test sets (whole
+sessions, never frames of the same one in both). The report printed as JSON
+has, on the test sessions:
+
+- per-hand accuracy of the classifier, overall and per class;
+- for the rules and for the classifier: events, event precision (event name
+  matches a label of the hands in that frame), recall (labelled gesture
+  sessions that produced at least one matching event) and per-frame cost;
+- the classifier's per-frame cost when a whole session is classified in
+  one batch.
+
+Use the saved model in the app with ``TOPINI_CLASSIFIER=<output>``.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+if __package__ in (None, "") and __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+
+from src.core.gesture_classifier import (
+    EVENT_GESTURES, ClassifierDetector, GestureClassifier, LabelledSession, load_sessions, session_features,
+)
+from src.core.gesture_detector import GestureDetector
+from src.utils.synthetic_hands import SyntheticHandGenerator
+
+
+def default_model_path() -> str:
+    return os.path.join(os.path.expanduser("~"), ".topini", "gestures.npz")
+
+
+def synthetic_sessions(count: int, seed: int = 0, frames: int = 90) -> List[LabelledSession]:
+    """Labelled sessions with randomised gesture parameters, frame rates,
+    noise and dropouts, one or two tracks each."""
+    rng = random.Random(seed)
+    sessions: List[LabelledSession] = []
+    for n in range(count):
+        gen = SyntheticHandGenerator(fps=rng.choice((15.0, 24.0, 30.0)), seed=seed * 100003 + n)
+        scale = rng.uniform(0.7, 1.3)
+        center = (rng.uniform(400, 880), rng.uniform(450, 600))
+        kind = rng.choice(("wave", "wave", "heart", "middle_finger", "open_palm", "idle"))
+        if kind == "wave":
+            if rng.random() < 0.5:
+                params = dict(frequency=rng.uniform(1.8, 3.5), amplitude=rng.uniform(45, 120),
+                              rotation=rng.uniform(0, 15))
+            else:  # saluto ruotando il palmo, quasi senza traslazione
+                params = dict(frequency=rng.uniform(1.8, 3.0), amplitude=rng.uniform(0, 15),
+                              rotation=rng.uniform(20, 35))
+            tracks = [gen.track("wave", center=center, scale=scale, phase=rng.uniform(0, 6.28), **params)]
+        elif kind == "heart":
+            tracks = [gen.track("heart", center=center, scale=scale, spacing=rng.uniform(0, 12))]
+        elif kind == "idle":
+            tracks = [gen.track("idle", center=center, scale=scale, drift=rng.uniform(0.5, 3.0))]
+        else:
+            tracks = [gen.track(kind, center=center, scale=scale)]
+        if kind != "heart" and rng.random() < 0.3:
+            # seconda mano ferma o a riposo dall'altra parte
+            other = (1280 - center[0], rng.uniform(450, 600))
+            tracks.append(gen.track(rng.choice(("idle", "open_palm")), center=other, scale=scale))
+        batch = gen.scene(frames, tracks, noise=rng.uniform(0.5, 2.5), dropout=rng.uniform(0.0, 0.04))
+        sessions.append(LabelledSession.from_batch(f"synthetic-{n}-{kind}", batch))
+    return sessions
+
+
+def dataset_sessions(path: str) -> List[LabelledSession]:
+    """Sessions of a ``landmark_dataset`` directory; like ``load_sessions``,
+    frames whose hands are not all labelled are skipped."""
+    from src.core.landmark_dataset import LandmarkDataset
+
+    dataset = LandmarkDataset.open(path)
+    sessions: List[LabelledSession] = []
+    for name in dataset.sessions:
+        session = LabelledSession(name)
+        for t, hands, labels in dataset.frames(name):
+            if None in labels:
+                continue
+            session.timestamps.append(t)
+            session.frames.append(hands)
+            session.labels.append([label for label in labels if label is not None])
+        if session.frames:
+            sessions.append(session)
+    return sessions
+
+
+def _event_scores(session: LabelledSession, events: List[Any]) -> Dict[str, Any]:
+    total = correct = 0
+    for labels, event in zip(session.labels, events):
+        if event is None:
+            continue
+        total += 1
+        correct += int(event.name in labels)
+    # gesti "attesi": etichetta presente in almeno metà dei frame
+    counts = Counter(name for labels in session.labels for name in set(labels))
+    expected = {name for name, c in counts.items() if name in EVENT_GESTURES and c >= len(session.labels) / 2}
+    fired = {e.name for e in events if e is not None}
+    return {"events": total, "correct": correct, "expected": len(expected), "found": len(expected & fired)}
+
+
+def _evaluate_detector(make: Callable[[], Any], sessions: List[LabelledSession]) -> Dict[str, Any]:
+    totals: Counter = Counter()
+    frames = 0
+    elapsed = 0.0
+    for session in sessions:
+        detector = make()
+        events = []
+        start = time.perf_counter()
+        for t, hands in zip(session.timestamps, session.frames):
+            events.append(detector.detect(hands, now=t))
+        elapsed += time.perf_counter() - start
+        frames += len(session.frames)
+        totals.update(_event_scores(session, events))
+    return {
+        "events": totals["events"],
+        "precision": round(totals["correct"] / totals["events"], 3) if totals["events"] else None,
+        "recall": round(totals["found"] / totals["expected"], 3) if totals["expected"] else None,
+        "us_per_frame": round(elapsed / max(1, frames) * 1e6, 1),
+    }
+
+
+def evaluate(classifier: GestureClassifier, sessions: List[LabelledSession], min_confidence: float) -> Dict[str, Any]:
+    xs, ys = [], []
+    for session in sessions:
+        x, labels = session_features(session)
+        xs.append(x)
+        ys.extend(labels)
+    x = np.concatenate(xs)
+    predicted, _ = classifier.predict(x)
+    hits = Counter()
+    support = Counter(ys)
+    for p, y in zip(predicted, ys):
+        hits[y] += int(p == y)
+
+    # tutta una sessione in un'unica chiamata al modello
+    offline_frames = 0
+    start = time.perf_counter()
+    for session in sessions:
+        ClassifierDetector(classifier, min_confidence).detect_offline(session.timestamps, session.frames)
+        offline_frames += len(session.frames)
+    offline_us = (time.perf_counter() - start) / max(1, offline_frames) * 1e6
+
+    classifier_report = _evaluate_detector(lambda: ClassifierDetector(classifier, min_confidence), sessions)
+    classifier_report["offline_us_per_frame"] = round(offline_us, 1)
+    return {
+        "test_sessions": len(sessions),
+        "test_hands": len(ys),
+        "accuracy": round(sum(hits.values()) / max(1, len(ys)), 4),
+        "per_class": {name: round(hits[name] / support[name], 4) for name in sorted(support)},
+        "rules": _evaluate_detector(GestureDetector, sessions),
+        "classifier": classifier_report,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.tools.train_classifier", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", nargs="*", default=[],
+                        help="labelled JSON-lines recordings or landmark dataset directories")
+    parser.add_argument("--synthetic", type=int, default=None,
+                        help="synthetic sessions to add (default 300 without --sessions, else 0)")
+    parser.add_argument("--model", choices=("knn", "mlp"), default="mlp", help="classifier type")
+    parser.add_argument("--k", type=int, default=7, help="neighbours for knn")
+    parser.add_argument("--hidden", type=int, default=64, help="hidden units for mlp")
+    parser.add_argument("--epochs", type=int, default=60, help="training epochs for mlp")
+    parser.add_argument("--test-fraction", type=float, default=0.25, help="sessions held out for the report")
+    parser.add_argument("--min-confidence", type=float, default=0.8, help="probability needed for a hand to vote")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the split and the synthetic data")
+    parser.add_argument("--output", default=default_model_path(), help="model file (.npz)")
+    args = parser.parse_args(argv)
+
+    sessions: List[LabelledSession] = []
+    for path in args.sessions:
+        sessions.extend(dataset_sessions(path) if os.path.isdir(path) else load_sessions(path))
+    n_synthetic = args.synthetic if args.synthetic is not None else (0 if args.sessions else 300)
+    sessions.extend(synthetic_sessions(n_synthetic, args.seed))
+    if len(sessions) < 2:
+        print("Need at least two labelled sessions")
+        return 1
+
+    random.Random(args.seed).shuffle(sessions)
+    n_test = max(1, int(len(sessions) * args.test_fraction))
+    test, train = sessions[:n_test], sessions[n_test:]
+
+    start = time.perf_counter()
+    xs, labels = [], []
+    for session in train:
+        x, y = session_features(session)
+        xs.append(x)
+        labels.extend(y)
+    params: Dict[str, Any] = ({"k": args.k} if args.model == "knn"
+                              else {"hidden": args.hidden, "epochs": args.epochs})
+    classifier = GestureClassifier.train(np.concatenate(xs), labels, args.model, seed=args.seed, **params)
+    train_s = time.perf_counter() - start
+    classifier.save(args.output)
+
+    report = {
+        "model": args.model,
+        "classes": classifier.classes,
+        "train_sessions": len(train),
+        "train_hands": len(labels),
+        "train_s": round(train_s, 2),
+        "output": args.output,
+        **evaluate(classifier, test, args.min_confidence),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,406 +1,653 @@
-from __future__ import annotations
-# pyright: reportUnknownMemberType=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false
-
-from typing import Any, cast
-import cv2
-from PySide6 import QtCore, QtGui, QtWidgets
-from .widgets import RippleButton
-from .video_widget import VideoWidget
-
-from src.core.background_initializer import BackgroundInitializer
-from src.core.gesture_detector import GestureDetector
-
-
-class GesturePage(QtWidgets.QWidget):
-    backRequested = QtCore.Signal()
-
-    def __init__(self) -> None:
-        super().__init__()
-        # Video card
-        self.video_label = VideoWidget()
-        self.video_label.setObjectName("video")
-        self.video_label.setCornerRadius(20)
-        vshadow = QtWidgets.QGraphicsDropShadowEffect(self.video_label)
-        vshadow.setBlurRadius(24)
-        vshadow.setOffset(0, 6)
-        vshadow.setColor(QtGui.QColor(0, 0, 0, 140))
-        self.video_label.setGraphicsEffect(vshadow)
-
-        # Banner overlay (glass pill)
-        self.overlay_banner = QtWidgets.QWidget()
-        self.overlay_banner.setObjectName("overlayBanner")
-        self.overlay_banner.setVisible(False)
-        self.overlay_banner.setSizePolicy(
-            QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Fixed
-        )
-        self._banner_h = 56
-        self.overlay_banner.setMinimumHeight(self._banner_h)
-        self.overlay_banner.setMaximumHeight(0)
-        # Root layout: vertical layout per separare contenuto da progress bar
-        banner_main_layout = QtWidgets.QVBoxLayout(self.overlay_banner)
-        banner_main_layout.setContentsMargins(0, 0, 0, 0)
-        banner_main_layout.setSpacing(0)
-        
-        # Top row: accent stripe + content
-        top_row = QtWidgets.QWidget()
-        banner_root = QtWidgets.QHBoxLayout(top_row)
-        banner_root.setContentsMargins(0, 0, 0, 0)
-        banner_root.setSpacing(0)
-        
-        # Accent stripe (3–4px), styled per-kind via QSS
-        self.overlay_accent = QtWidgets.QWidget(top_row)
-        self.overlay_accent.setObjectName("overlayAccent")
-        self.overlay_accent.setFixedWidth(4)
-        banner_root.addWidget(self.overlay_accent, 0)
-        
-        # Content area
-        content_container = QtWidgets.QWidget(top_row)
-        banner_vlayout = QtWidgets.QVBoxLayout(content_container)
-        banner_vlayout.setContentsMargins(16, 8, 16, 8)
-        banner_vlayout.setSpacing(6)
-        content_row = QtWidgets.QWidget(content_container)
-        banner_layout = QtWidgets.QHBoxLayout(content_row)
-        banner_layout.setContentsMargins(0, 0, 0, 0)
-        banner_layout.setSpacing(10)
-        # Icon chip (circular, styled via QSS)
-        self.overlay_icon = QtWidgets.QLabel("")
-        self.overlay_icon.setObjectName("overlayIcon")
-        self.overlay_icon.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-        self.overlay_icon.setFixedSize(30, 30)
-        # Text column: title + subtitle
-        text_col = QtWidgets.QWidget(content_row)
-        text_layout = QtWidgets.QVBoxLayout(text_col)
-        text_layout.setContentsMargins(0, 0, 0, 0)
-        text_layout.setSpacing(0)
-        self.overlay_title = QtWidgets.QLabel("")
-        self.overlay_title.setObjectName("overlayTitle")
-        self.overlay_title.setAlignment(
-            QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter
-        )
-        self.overlay_title.setSizePolicy(
-            QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Fixed
-        )
-        self.overlay_subtitle = QtWidgets.QLabel("")
-        self.overlay_subtitle.setObjectName("overlaySubtitle")
-        self.overlay_subtitle.setAlignment(
-            QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter
-        )
-        self.overlay_subtitle.setSizePolicy(
-            QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Fixed
-        )
-        self.overlay_subtitle.setVisible(False)  # Nascondi il subtitle dato che non lo usiamo più
-        text_layout.addWidget(self.overlay_title)
-        text_layout.addWidget(self.overlay_subtitle)
-        banner_layout.addWidget(self.overlay_icon, 0)
-        banner_layout.addWidget(text_col, 1)
-        banner_vlayout.addWidget(content_row)
-        
-        # Aggiungi content container al top row
-        banner_root.addWidget(content_container, 1)
-        
-        # Aggiungi top row al layout principale
-        banner_main_layout.addWidget(top_row)
-        
-        # Progress bar che si estende su tutta la larghezza del banner
-        self.overlay_progress = QtWidgets.QProgressBar()
-        self.overlay_progress.setObjectName("overlayProgress")
-        self.overlay_progress.setTextVisible(False)
-        self.overlay_progress.setFixedHeight(4)
-        self.overlay_progress.setSizePolicy(
-            QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Fixed
-        )
-        banner_main_layout.addWidget(self.overlay_progress)
-
-        self._banner_wrapper = QtWidgets.QWidget()
-        self._banner_wrapper.setAttribute(
-            QtCore.Qt.WidgetAttribute.WA_TransparentForMouseEvents, True
-        )
-        wrapper_layout = QtWidgets.QVBoxLayout(self._banner_wrapper)
-        wrapper_layout.setContentsMargins(0, 0, 0, 0)
-        wrapper_layout.setSpacing(0)
-        # Rimosso AlignHCenter - ora si estende per tutta la larghezza disponibile
-        wrapper_layout.addWidget(self.overlay_banner)
-
-        # Soft glow shadow (elevation 2–3)
-        shadow = QtWidgets.QGraphicsDropShadowEffect(self.overlay_banner)
-        shadow.setBlurRadius(20)
-        shadow.setOffset(0, 4)
-        shadow.setColor(QtGui.QColor(0, 0, 0, 160))
-        self.overlay_banner.setGraphicsEffect(shadow)
-
-        # Timers and animations
-        self.overlay_timer = QtCore.QTimer(self)
-        self.overlay_timer.setSingleShot(True)
-        self.overlay_timer.timeout.connect(self._hide_banner)
-        self._progress_timer = QtCore.QTimer(self)
-        self._progress_timer.timeout.connect(self._tick_progress)
-        self._progress_total = 3000  # Aggiornato a 3 secondi
-        self._progress_elapsed = 0
-        self._banner_anim = QtCore.QPropertyAnimation(
-            self.overlay_banner, b"maximumHeight", self
-        )
-        self._banner_anim.setEasingCurve(QtCore.QEasingCurve.Type.OutCubic)
-        self._banner_anim.setDuration(180)
-        self._banner_hide_anim = QtCore.QPropertyAnimation(
-            self.overlay_banner, b"maximumHeight", self
-        )
-        self._banner_hide_anim.setEasingCurve(QtCore.QEasingCurve.Type.InCubic)
-        self._banner_hide_anim.setDuration(160)
-        self._banner_hide_anim.finished.connect(
-            lambda: self._set_banner_visible(False)
-        )
-
-        # Core components - lazy initialization via background loader
-        self.capture = None  # Will be set by background initializer
-        self.tracker = None  # Will be set by background initializer
-        self.detector = GestureDetector()
-        self.mirror = True
-        
-        # Background initialization
-        self.bg_initializer = BackgroundInitializer()
-        self.bg_initializer.handTrackerReady.connect(self._on_hand_tracker_ready)
-        self.bg_initializer.videoCaptureReady.connect(self._on_video_capture_ready)
-        self.bg_initializer.allComponentsReady.connect(self._on_all_components_ready)
-
-        # Pre-initialization state
-        self._is_preinitializing = False
-        self._is_preinitialized = False
-        self._components_ready = False
-        self._gesture_detection_blocked = False  # Blocca rilevamento durante progress bar
-
-        self._build()
-        self._timer = QtCore.QTimer(self)
-        self._timer.timeout.connect(self._on_tick)
-
-    def _build(self) -> None:
-        layout = QtWidgets.QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-
-        topbar = QtWidgets.QHBoxLayout()
-        topbar.setContentsMargins(16, 16, 16, 16)
-        topbar.setSpacing(16)  # Spazio tra bottone e banner
-        
-        back_btn = RippleButton("← Indietro", elevation=1)
-        back_btn.clicked.connect(self.backRequested.emit)
-        topbar.addWidget(back_btn, 0, QtCore.Qt.AlignmentFlag.AlignLeft)
-        
-        # Aggiungi il banner nel topbar invece che nell'overlay
-        topbar.addWidget(self._banner_wrapper, 1)  # stretch per riempire lo spazio rimanente
-
-        main_page = QtWidgets.QWidget()
-        main_layout = QtWidgets.QVBoxLayout(main_page)
-        main_layout.setContentsMargins(0, 0, 0, 0)
-        main_layout.setSpacing(0)
-        main_layout.addLayout(topbar)
-
-        video_area = QtWidgets.QWidget(main_page)
-        video_area.setObjectName("videoArea")
-        video_area.setSizePolicy(
-            QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding
-        )
-        video_area_layout = QtWidgets.QVBoxLayout(video_area)
-        video_area_layout.setContentsMargins(16, 8, 16, 16)
-        video_area_layout.setSpacing(0)
-        video_area_layout.addWidget(self.video_label)
-
-        overlay_container = QtWidgets.QWidget(main_page)
-        overlay_container.setAttribute(
-            QtCore.Qt.WidgetAttribute.WA_StyledBackground, True
-        )
-        overlay_container.setStyleSheet("background: transparent;")
-        overlay_container.setAttribute(
-            QtCore.Qt.WidgetAttribute.WA_TransparentForMouseEvents, True
-        )
-        overlay_container.setSizePolicy(
-            QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding
-        )
-        overlay_layout = QtWidgets.QVBoxLayout(overlay_container)
-        overlay_layout.setContentsMargins(0, 0, 0, 0)
-        overlay_layout.setSpacing(0)
-        # Banner rimosso da qui - ora è nel topbar
-        overlay_layout.addStretch(1)
-
-        area = QtWidgets.QGridLayout()
-        area.setContentsMargins(0, 0, 0, 0)
-        area.setSpacing(0)
-        area.addWidget(video_area, 0, 0)
-        area.addWidget(overlay_container, 0, 0)
-        area.setRowStretch(0, 1)
-        area.setColumnStretch(0, 1)
-        main_layout.addLayout(area)
-
-        layout.addWidget(main_page)
-        overlay_container.raise_()
-
-    def _on_hand_tracker_ready(self, hand_tracker) -> None:
-        """Called when HandTracker is ready from background initialization."""
-        self.tracker = hand_tracker
-        
-    def _on_video_capture_ready(self, video_capture) -> None:
-        """Called when VideoCaptureThread is ready from background initialization."""
-        self.capture = video_capture
-        
-    def _on_all_components_ready(self) -> None:
-        """Called when all components are ready."""
-        self._components_ready = True
-        # Auto-start pre-initialization once components are loaded
-        self.preinitialize()
-
-    def start(self) -> None:
-        self._set_banner_visible(False)
-        self.overlay_progress.setValue(0)
-        
-        # Check if components are ready
-        if not self._components_ready or self.capture is None:
-            # Components not ready, show loading state
-            return
-            
-        # If already pre-initialized, start immediately
-        if self._is_preinitialized:
-            self.capture.start()  # Quick restart since camera is already initialized
-            if not self._timer.isActive():
-                self._timer.start(30)
-        else:
-            # Start normally (will be slower first time)
-            self.capture.start()
-            if not self._timer.isActive():
-                self._timer.start(30)
-
-    def preinitialize(self) -> None:
-        """Pre-initialize camera and MediaPipe in background for instant startup."""
-        if self._is_preinitializing or self._is_preinitialized or not self.capture or not self.tracker:
-            return
-            
-        self._is_preinitializing = True
-        # Start camera capture in background
-        self.capture.start()
-        
-        # Pre-warm MediaPipe by processing a dummy frame
-        QtCore.QTimer.singleShot(100, self._finish_preinitialize)
-    
-    def _finish_preinitialize(self) -> None:
-        """Complete pre-initialization by warming up MediaPipe."""
-        if not self.capture or not self.tracker:
-            self._is_preinitializing = False
-            return
-            
-        try:
-            # Get a frame to warm up the pipeline
-            frame = self.capture.read()
-            if frame is not None:
-                # Process once to initialize MediaPipe models
-                self.tracker.process(frame)
-            
-            self._is_preinitialized = True
-            self._is_preinitializing = False
-            # Stop capture until user actually needs it
-            self.capture.stop()
-        except Exception:
-            self._is_preinitializing = False
-
-    def stop(self) -> None:
-        if self._timer.isActive():
-            self._timer.stop()
-        if self.capture:
-            self.capture.stop()
-        self.video_label.clear()
-        self.video_label.setText("")
-
-    def _on_tick(self) -> None:
-        if not self.capture or not self.tracker:
-            return
-            
-        frame: Any = cast(Any, self.capture.read())
-        if frame is None:
-            return
-        
-        if self.mirror:
-            frame = cv2.flip(frame, 1)  # type: ignore
-            
-        try:
-            hands: Any = cast(Any, self.tracker.process(frame))
-        except Exception:
-            return
-        drawn: Any = cast(Any, self.tracker.draw(frame, hands))
-        self.video_label.show_frame(drawn)
-
-        # Blocca rilevamento gesti durante la progress bar
-        if self._gesture_detection_blocked:
-            return
-
-        event = self.detector.detect(hands)
-        if event:
-            if event.name == 'heart':
-                self._show_overlay('Anche Topino ti ama tanto!', ms=3000, kind='heart')
-            elif event.name == 'wave':
-                self._show_overlay('Anche Topino ti saluta!', ms=3000, kind='wave')
-            elif event.name == 'middle_finger':
-                self._show_overlay('No, non essere cattiva con Topino! Topino ti vuole bene!', ms=3000, kind='middle_finger')
-
-    def _set_banner_visible(self, visible: bool) -> None:
-        self._banner_wrapper.setVisible(visible)
-        self.overlay_banner.setVisible(visible)
-
-    def _tick_progress(self) -> None:
-        self._progress_elapsed += self._progress_timer.interval()
-        progress_value = min(self._progress_elapsed, self._progress_total)
-        self.overlay_progress.setValue(progress_value)
-        
-        if self._progress_elapsed >= self._progress_total:
-            self._progress_timer.stop()
-            self._gesture_detection_blocked = False  # Riabilita rilevamento gesti
-
-    def _hide_banner(self) -> None:
-        self._banner_hide_anim.stop()
-        self._banner_hide_anim.setStartValue(self.overlay_banner.maximumHeight())
-        self._banner_hide_anim.setEndValue(0)
-        self._banner_hide_anim.start()
-
-    def _show_overlay(self, text: str, ms: int = 3000, kind: str = 'info') -> None:
-        # Blocca rilevamento gesti durante l'overlay
-        self._gesture_detection_blocked = True
-        
-        # set kind on widgets and refresh style (for tinted glass and chip)
-        self.overlay_banner.setProperty('kind', kind)
-        self.overlay_progress.setProperty('kind', kind)
-        self.overlay_icon.setProperty('kind', kind)
-        self.overlay_accent.setProperty('kind', kind)
-        for w in (self.overlay_banner, self.overlay_progress, self.overlay_icon, self.overlay_accent):
-            w.style().unpolish(w)
-            w.style().polish(w)
-
-        # set texts and emoji chip
-        if kind == 'heart':
-            self.overlay_icon.setText('❤️')
-            self.overlay_title.setText('Anche Topino ti ama tanto!')
-            self.overlay_subtitle.setText('')  # Rimosso "Gesto: cuore"
-        elif kind == 'wave':
-            self.overlay_icon.setText('👋')
-            self.overlay_title.setText('Anche Topino ti saluta!')
-            self.overlay_subtitle.setText('')  # Rimosso "Gesto: saluto"
-        elif kind == 'middle_finger':
-            self.overlay_icon.setText('😡')  # Faccia arrabbiata e rossa
-            self.overlay_title.setText('No, non essere cattiva con Topino! Topino ti vuole bene!')
-            self.overlay_subtitle.setText('')
-        else:
-            self.overlay_icon.setText('')
-            self.overlay_title.setText(text)
-            self.overlay_subtitle.setText('')
-
-        # progress - fisso a 3000ms (3 secondi)
-        self._progress_total = 3000
-        self._progress_elapsed = 0
-        self.overlay_progress.setRange(0, 2000)
-        self.overlay_progress.setValue(0)
-
-        # animate show
-        self._banner_anim.stop()
-        self._set_banner_visible(True)
-        self._banner_anim.setStartValue(self.overlay_banner.maximumHeight())
-        self._banner_anim.setEndValue(self._banner_h)
-        self._banner_anim.start()
-
-        # timers - mantieni il timer di hiding al tempo specificato ma progress bar sempre 1.5s
-        self.overlay_timer.start(ms)
-        self._progress_timer.setInterval(30)
-        self._progress_timer.start()
+from __future__ import annotations
+# pyright: reportUnknownMemberType=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple, cast
+import cv2
+from PySide6 import QtCore, QtGui, QtWidgets
+from .widgets import RippleButton, BannerFace
+from .video_widget import VideoWidget
+from .perf_hud import PerfHud
+from .operator_window import OperatorWindow
+
+from src.core.background_initializer import BackgroundInitializer
+from src.core.camera_devices import CameraDeviceManager, DeviceListener
+from src.core.event_bus import EventBus
+from src.core.event_sinks import QtSink, sinks_from_env
+from src.core.frame_hub import FrameConsumer, FrameHub, FramePacket, read_only
+from src.core.frame_recorder import FrameRecorder, default_recording_path
+from src.core.gesture_classifier import detector_from_env
+from src.core.gesture_detector import default_decision_trace_path, find_rule_detector
+from src.core.presence import IdleManager, MotionDetector
+from src.core.quality_controller import QualityController, QualityLevel
+from src.utils.metrics import PipelineMetrics
+from src.utils.tracing import tracer, default_trace_path
+
+
+# kind -> (icona, titolo) del banner
+BANNER_KINDS: Dict[str, Tuple[str, str]] = {
+    'heart': ('❤️', 'Anche Topino ti ama tanto!'),
+    'wave': ('👋', 'Anche Topino ti saluta!'),
+    'middle_finger': ('😡', 'No, non essere cattiva con Topino! Topino ti vuole bene!'),
+    'info': ('', ''),
+}
+
+
+class _CameraSignals(QtCore.QObject):
+    """Camera manager and capture watchdog callbacks (background threads)
+    delivered on the GUI thread."""
+    removed = QtCore.Signal(object)
+    switched = QtCore.Signal(object)
+    status = QtCore.Signal(object)
+
+
+class _MainView(FrameConsumer):
+    name = "view"
+
+    def __init__(self, video: VideoWidget) -> None:
+        self.video = video
+
+    def handle(self, packet: FramePacket) -> None:
+        self.video.show_frame(packet.display_bgr, packet.timestamp, packet.seq)
+
+
+class GesturePage(QtWidgets.QWidget):
+    backRequested = QtCore.Signal()
+
+    def __init__(self, bg_initializer: Optional[BackgroundInitializer] = None) -> None:
+        super().__init__()
+        # Video card
+        self.video_label = VideoWidget()
+        self.video_label.setObjectName("video")
+        self.video_label.setCornerRadius(20)
+        vshadow = QtWidgets.QGraphicsDropShadowEffect(self.video_label)
+        vshadow.setBlurRadius(24)
+        vshadow.setOffset(0, 6)
+        vshadow.setColor(QtGui.QColor(0, 0, 0, 140))
+        self.video_label.setGraphicsEffect(vshadow)
+
+        # Banner overlay (glass pill)
+        self.overlay_banner = QtWidgets.QWidget()
+        self.overlay_banner.setObjectName("overlayBanner")
+        self.overlay_banner.setVisible(False)
+        self.overlay_banner.setSizePolicy(
+            QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Fixed
+        )
+        self._banner_h = 56
+        self.overlay_banner.setMinimumHeight(self._banner_h)
+        self.overlay_banner.setMaximumHeight(0)
+        # Una "faccia" precostruita per ogni tipo di banner: il cambio di tipo è
+        # solo un cambio di pagina, senza ricalcolare lo stylesheet (unpolish/polish).
+        self._banner_stack = QtWidgets.QStackedLayout(self.overlay_banner)
+        self._banner_stack.setContentsMargins(0, 0, 0, 0)
+        # Solo la faccia 'info' è costruita subito, le altre alla prima visualizzazione.
+        self._banner_faces: Dict[str, BannerFace] = {}
+        self._banner_primed = False
+        self._banner_face: BannerFace = self._add_banner_face('info')
+        self._banner_stack.setCurrentWidget(self._banner_face)
+        # durata (ms) di _show_overlay sugli ultimi frame con evento
+        self.overlay_stall_ms: Deque[float] = deque(maxlen=64)
+
+        self._banner_wrapper = QtWidgets.QWidget()
+        self._banner_wrapper.setAttribute(
+            QtCore.Qt.WidgetAttribute.WA_TransparentForMouseEvents, True
+        )
+        wrapper_layout = QtWidgets.QVBoxLayout(self._banner_wrapper)
+        wrapper_layout.setContentsMargins(0, 0, 0, 0)
+        wrapper_layout.setSpacing(0)
+        # Rimosso AlignHCenter - ora si estende per tutta la larghezza disponibile
+        wrapper_layout.addWidget(self.overlay_banner)
+
+        # Soft glow shadow (elevation 2–3)
+        shadow = QtWidgets.QGraphicsDropShadowEffect(self.overlay_banner)
+        shadow.setBlurRadius(20)
+        shadow.setOffset(0, 4)
+        shadow.setColor(QtGui.QColor(0, 0, 0, 160))
+        self.overlay_banner.setGraphicsEffect(shadow)
+
+        # Timers and animations
+        self.overlay_timer = QtCore.QTimer(self)
+        self.overlay_timer.setSingleShot(True)
+        self.overlay_timer.timeout.connect(self._hide_banner)
+        self._progress_timer = QtCore.QTimer(self)
+        self._progress_timer.timeout.connect(self._tick_progress)
+        self._progress_total = 3000  # Aggiornato a 3 secondi
+        self._progress_elapsed = 0
+        self._banner_anim = QtCore.QPropertyAnimation(
+            self.overlay_banner, b"maximumHeight", self
+        )
+        self._banner_anim.setEasingCurve(QtCore.QEasingCurve.Type.OutCubic)
+        self._banner_anim.setDuration(180)
+        self._banner_hide_anim = QtCore.QPropertyAnimation(
+            self.overlay_banner, b"maximumHeight", self
+        )
+        self._banner_hide_anim.setEasingCurve(QtCore.QEasingCurve.Type.InCubic)
+        self._banner_hide_anim.setDuration(160)
+        self._banner_hide_anim.finished.connect(
+            lambda: self._set_banner_visible(False)
+        )
+
+        # Core components - lazy initialization via background loader
+        self.capture = None  # Will be set by background initializer
+        # camere collegate/scollegate: cambio della camera senza fermare la pagina
+        self.cameras: Optional[CameraDeviceManager] = None
+        self._camera_signals = _CameraSignals(self)
+        self._camera_signals.removed.connect(self._on_camera_removed)
+        self._camera_signals.switched.connect(self._on_camera_switched)
+        self._camera_signals.status.connect(self._on_capture_status)
+        self.tracker = None  # Will be set by background initializer
+        self.detector = detector_from_env()
+        # TOPINI_DECISION_TRACE=file.jsonl: traccia delle decisioni mentre la pagina è attiva
+        self._decision_trace_path = os.environ.get("TOPINI_DECISION_TRACE")
+        self.mirror = True
+        self._last_seq = 0
+        # qualità adattiva: risoluzione/modello/frequenza di inferenza secondo la latenza misurata
+        self.quality = QualityController.from_env()
+        self._frame_index = 0
+        self._last_hands: Any = []
+        # risparmio energetico: senza nessuno davanti, cattura lenta e solo rilevamento di movimento
+        self.idle = IdleManager.from_env()
+        self.motion = MotionDetector()
+        self._active_fps = 30
+        self.attract_label = QtWidgets.QLabel("👋  Avvicinati e saluta Topino!")
+        self.attract_label.setObjectName("attractLabel")
+        self.attract_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        self.attract_label.setVisible(False)
+
+        # Eventi gesto pubblicati sul bus: banner, suoni, log e uscite esterne sono sottoscrittori
+        self.events = EventBus()
+        self._banner_sink = QtSink("banner", self)
+        self._banner_sink.eventReceived.connect(self._on_gesture_event)
+        self.events.subscribe(self._banner_sink)
+        for sink in sinks_from_env():
+            self.events.subscribe(sink)
+
+        # Un frame catturato ed elaborato una volta sola, condiviso da vista, finestra
+        # operatore, registratore e HUD (ognuno con la sua frequenza)
+        self.frames = FrameHub()
+        self.frames.subscribe(_MainView(self.video_label), inline=True)
+        self.operator_window: Optional[OperatorWindow] = None
+        self.recorder: Optional[FrameRecorder] = None
+        # TOPINI_RECORD=file.jsonl: registra i landmark mentre la pagina è attiva
+        self._record_path = os.environ.get("TOPINI_RECORD")
+
+        # Metriche di performance, raccolte solo con l'HUD visibile (F3)
+        self.metrics = PipelineMetrics()
+        self.perf_hud = PerfHud(
+            self.metrics,
+            lambda: (self.capture, self.video_label, self.overlay_stall_ms, self.quality, self.idle, self.events),
+            hub=self.frames,
+        )
+        self.video_label.frame_age_callback = self._on_frame_presented
+        hud_shortcut = QtGui.QShortcut(QtGui.QKeySequence(QtCore.Qt.Key.Key_F3), self)
+        hud_shortcut.activated.connect(self.perf_hud.toggle)
+        trace_shortcut = QtGui.QShortcut(QtGui.QKeySequence(QtCore.Qt.Key.Key_F4), self)
+        trace_shortcut.activated.connect(self._toggle_trace)
+        decisions_shortcut = QtGui.QShortcut(QtGui.QKeySequence(QtCore.Qt.Key.Key_F6), self)
+        decisions_shortcut.activated.connect(self._toggle_decision_trace)
+        operator_shortcut = QtGui.QShortcut(QtGui.QKeySequence(QtCore.Qt.Key.Key_F7), self)
+        operator_shortcut.activated.connect(self._toggle_operator_window)
+        record_shortcut = QtGui.QShortcut(QtGui.QKeySequence(QtCore.Qt.Key.Key_F8), self)
+        record_shortcut.activated.connect(self._toggle_recording)
+        
+        self._components_ready = False
+        self._gesture_detection_blocked = False  # Blocca rilevamento durante progress bar
+
+        # Background initialization (may already be running when the page is built lazily)
+        self.bg_initializer = bg_initializer or BackgroundInitializer()
+        self.bg_initializer.componentReady.connect(self._on_component_ready)
+        self.bg_initializer.handTrackerReady.connect(self._on_hand_tracker_ready)
+        self.bg_initializer.videoCaptureReady.connect(self._on_video_capture_ready)
+        self.bg_initializer.interactiveReady.connect(self._on_interactive_ready)
+        self.bg_initializer.allComponentsReady.connect(self._on_all_components_ready)
+
+        self._build()
+        self._adopt_ready_components()
+        self._timer = QtCore.QTimer(self)
+        self._timer.timeout.connect(self._on_tick)
+
+    def _build(self) -> None:
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        topbar = QtWidgets.QHBoxLayout()
+        topbar.setContentsMargins(16, 16, 16, 16)
+        topbar.setSpacing(16)  # Spazio tra bottone e banner
+        
+        back_btn = RippleButton("← Indietro", elevation=1)
+        back_btn.clicked.connect(self.backRequested.emit)
+        topbar.addWidget(back_btn, 0, QtCore.Qt.AlignmentFlag.AlignLeft)
+        
+        # Aggiungi il banner nel topbar invece che nell'overlay
+        topbar.addWidget(self._banner_wrapper, 1)  # stretch per riempire lo spazio rimanente
+
+        main_page = QtWidgets.QWidget()
+        main_layout = QtWidgets.QVBoxLayout(main_page)
+        main_layout.setContentsMargins(0, 0, 0, 0)
+        main_layout.setSpacing(0)
+        main_layout.addLayout(topbar)
+
+        video_area = QtWidgets.QWidget(main_page)
+        video_area.setObjectName("videoArea")
+        video_area.setSizePolicy(
+            QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding
+        )
+        video_area_layout = QtWidgets.QVBoxLayout(video_area)
+        video_area_layout.setContentsMargins(16, 8, 16, 16)
+        video_area_layout.setSpacing(0)
+        video_area_layout.addWidget(self.video_label)
+
+        overlay_container = QtWidgets.QWidget(main_page)
+        overlay_container.setAttribute(
+            QtCore.Qt.WidgetAttribute.WA_StyledBackground, True
+        )
+        overlay_container.setStyleSheet("background: transparent;")
+        overlay_container.setAttribute(
+            QtCore.Qt.WidgetAttribute.WA_TransparentForMouseEvents, True
+        )
+        overlay_container.setSizePolicy(
+            QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding
+        )
+        overlay_layout = QtWidgets.QVBoxLayout(overlay_container)
+        overlay_layout.setContentsMargins(0, 0, 0, 0)
+        overlay_layout.setSpacing(0)
+        # Banner rimosso da qui - ora è nel topbar
+        overlay_layout.setContentsMargins(28, 20, 28, 28)
+        overlay_layout.addWidget(
+            self.perf_hud, 0,
+            QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignTop,
+        )
+        overlay_layout.addStretch(1)
+        overlay_layout.addWidget(self.attract_label, 0, QtCore.Qt.AlignmentFlag.AlignHCenter)
+        overlay_layout.addStretch(1)
+
+        area = QtWidgets.QGridLayout()
+        area.setContentsMargins(0, 0, 0, 0)
+        area.setSpacing(0)
+        area.addWidget(video_area, 0, 0)
+        area.addWidget(overlay_container, 0, 0)
+        area.setRowStretch(0, 1)
+        area.setColumnStretch(0, 1)
+        main_layout.addLayout(area)
+
+        layout.addWidget(main_page)
+        overlay_container.raise_()
+        if os.environ.get("TOPINI_HUD") == "1":
+            self.perf_hud.set_active(True)
+
+    def _add_banner_face(self, kind: str) -> BannerFace:
+        face = self._banner_faces.get(kind)
+        if face is None:
+            icon, title = BANNER_KINDS[kind]
+            face = BannerFace(kind, icon, title)
+            self._banner_faces[kind] = face
+            self._banner_stack.addWidget(face)
+            if self._banner_primed:
+                face.prime()
+        return face
+
+    def _adopt_ready_components(self) -> None:
+        """Pick up components finished before this page was built (their signals are gone)."""
+        bg = self.bg_initializer
+        if bg.get_profile() is not None:
+            self._on_component_ready("profile", bg.get_profile(), 0.0)
+        if bg.get_video_capture() is not None:
+            self._on_video_capture_ready(bg.get_video_capture())
+        if bg.get_hand_tracker() is not None:
+            self._on_hand_tracker_ready(bg.get_hand_tracker())
+        if bg.all_ready:
+            self._on_all_components_ready()
+        elif bg.interactive:
+            self._on_interactive_ready()
+
+    def _on_component_ready(self, name: str, component: Any, elapsed_ms: float) -> None:
+        if name == "profile" and component is not None:
+            self.quality.apply_profile(component)
+            self._apply_quality(self.quality.level)
+
+    def _on_hand_tracker_ready(self, hand_tracker) -> None:
+        """Called when HandTracker is ready from background initialization."""
+        self.tracker = hand_tracker
+        self._apply_quality(self.quality.level)
+        
+    def _on_video_capture_ready(self, video_capture) -> None:
+        """Called when VideoCaptureThread is ready from background initialization."""
+        self.capture = video_capture
+        self._apply_quality(self.quality.level)
+        video_capture.on_status = self._camera_signals.status.emit
+        if self.cameras is None and os.environ.get("TOPINI_CAMERA_MANAGER", "1") != "0":
+            self.cameras = CameraDeviceManager(video_capture, DeviceListener(
+                on_removed=self._camera_signals.removed.emit,
+                on_switched=self._camera_signals.switched.emit,
+            ))
+            self.cameras.start()
+        
+    def _on_interactive_ready(self) -> None:
+        """Called when the minimal set (video capture) is ready: the page can start,
+        showing video without gesture recognition until the tracker arrives."""
+        self._components_ready = True
+
+    def _on_all_components_ready(self) -> None:
+        """Called when all components are ready (the tracker is already warmed up)."""
+        self._components_ready = True
+
+    def start(self) -> None:
+        self._set_banner_visible(False)
+        self._banner_face.progress.setValue(0)
+        
+        # Check if components are ready
+        if not self._components_ready or self.capture is None:
+            # Components not ready, show loading state
+            return
+            
+        # La camera si apre solo qui: il modello è già stato scaldato in background
+        self.quality.reset()
+        self.idle.reset()
+        self.motion.reset()
+        self._active_fps = self.capture.fps
+        rules = find_rule_detector(self.detector)
+        if self._decision_trace_path and rules is not None and rules.trace is None:
+            rules.enable_trace()
+        if self._record_path and self.recorder is None:
+            self._start_recording(self._record_path)
+        # una calibrazione al primo avvio ancora in corso non salva tempi presi sotto carico
+        self.bg_initializer.session_started.set()
+        self.capture.start()
+        if not self._timer.isActive():
+            self._timer.start(30)
+
+    def stop(self) -> None:
+        if self._timer.isActive():
+            self._timer.stop()
+        if self.idle.idle:
+            self._leave_idle()
+        if self.capture:
+            self.capture.stop()
+        if self.recorder is not None:
+            self._stop_recording()
+        rules = find_rule_detector(self.detector)
+        if self._decision_trace_path and rules is not None and rules.trace is not None:
+            self._write_decision_trace(rules.disable_trace(), self._decision_trace_path)
+        self.video_label.clear()
+        self.video_label.setText("")
+
+    def _on_tick(self) -> None:
+        if not self.capture:
+            return
+            
+        t0 = time.perf_counter()
+        captured = self.capture.read_frame()
+        if captured is None or captured.seq == self._last_seq:
+            return  # nessun frame nuovo dall'ultimo tick
+        self._last_seq = captured.seq
+        frame: Any = captured.frame_bgr
+        t1 = time.perf_counter()
+
+        if self.mirror:
+            frame = cv2.flip(frame, 1)  # type: ignore
+        t2 = time.perf_counter()
+
+        if self.idle.idle:
+            # solo movimento su un frame minuscolo; MediaPipe resta fermo
+            if self.motion.update(captured.frame_bgr):
+                self._wake(captured.timestamp)
+            self._publish(captured, frame)
+            return
+
+        if not self.tracker:
+            # tracker ancora in caricamento: solo video
+            self._publish(captured, frame)
+            return
+
+        level = self.quality.update()
+        if level is not None:
+            print(f"Quality: {level.name} ({self.quality.last_reason})")
+            self._apply_quality(level)
+        self._frame_index += 1
+        if self._frame_index % self.quality.level.inference_every:
+            # frame senza inferenza: ridisegna gli ultimi landmark
+            drawn_skip: Any = cast(Any, self.tracker.draw(frame, self._last_hands))
+            self._publish(captured, frame, self._last_hands, drawn_skip)
+            return
+
+        try:
+            hands: Any = cast(Any, self.tracker.process(frame))
+        except Exception:
+            return
+        self._last_hands = hands
+        t3 = time.perf_counter()
+        self._update_presence(captured, hands)
+        drawn: Any = cast(Any, self.tracker.draw(frame, hands))
+        t4 = time.perf_counter()
+        self._publish(captured, frame, hands, drawn, inferred=True)
+        t5 = time.perf_counter()
+
+        # Blocca rilevamento gesti durante la progress bar
+        if self._gesture_detection_blocked:
+            if self.metrics.enabled:
+                self.metrics.record_tick(captured.seq, (t0, t1, t2, t3, t4, t5))
+            if tracer.enabled:
+                self._trace_tick(captured.seq, (t0, t1, t2, t3, t4, t5))
+            return
+
+        event = self.detector.detect(hands)
+        if self.metrics.enabled or tracer.enabled:
+            stamps = (t0, t1, t2, t3, t4, t5, time.perf_counter())
+            if self.metrics.enabled:
+                self.metrics.record_tick(captured.seq, stamps)
+            if tracer.enabled:
+                self._trace_tick(captured.seq, stamps)
+        if event:
+            # blocca subito i gesti successivi: il banner arriva dal bus in modo asincrono
+            self._gesture_detection_blocked = True
+            self.events.publish(event)
+
+    def _publish(self, captured: Any, frame: Any, hands: Any = (), drawn: Any = None,
+                 inferred: bool = False) -> None:
+        # riferimenti condivisi fra i consumer: in sola lettura, nessuna copia
+        self.frames.publish(FramePacket(captured.seq, captured.timestamp, read_only(frame), tuple(hands),
+                                        read_only(drawn), inferred))
+
+    def _toggle_operator_window(self) -> None:
+        """F7: finestra operatore, abbonata al flusso dei frame solo mentre è aperta."""
+        if self.operator_window is None:
+            self.operator_window = OperatorWindow(self.frames, self)
+        self.operator_window.toggle()
+
+    def _toggle_recording(self) -> None:
+        """F8: registra i landmark dei frame elaborati e gli eventi (JSON-lines)."""
+        if self.recorder is None:
+            self._start_recording(default_recording_path())
+        else:
+            self._stop_recording()
+
+    def _start_recording(self, path: str) -> None:
+        self.recorder = FrameRecorder(path, label=os.environ.get("TOPINI_RECORD_LABEL") or None)
+        # coda lunga e scarto dei nuovi: la registrazione resta contigua se il disco rallenta
+        self.frames.subscribe(self.recorder, maxsize=256, drop="newest", only_inferred=True)
+        self.events.subscribe(self.recorder.events)
+        print(f"Recording landmarks to {path}")
+
+    def _stop_recording(self) -> None:
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return
+        self.events.unsubscribe(recorder.events)
+        # svuota la coda e chiude il file
+        self.frames.unsubscribe(recorder)
+        print(f"Recording written: {recorder.path} ({recorder.frames} frames)")
+
+    def _on_gesture_event(self, event: Any) -> None:
+        """Banner subscriber of the event bus (GUI thread)."""
+        kind = event.name if event.name in BANNER_KINDS else 'info'
+        self._show_overlay(BANNER_KINDS[kind][1] or event.name, ms=3000, kind=kind)
+
+    _TRACE_SPANS = ("tick.read", "tick.flip", "tracker.process", "tracker.draw", "publish", "detector.detect")
+
+    def _trace_tick(self, seq: int, stamps: Tuple[float, ...]) -> None:
+        tracer.complete("tick", stamps[0], stamps[-1], seq)
+        for i in range(len(stamps) - 1):
+            tracer.complete(self._TRACE_SPANS[i], stamps[i], stamps[i + 1], seq, flow="step" if i == 0 else None)
+
+    def _toggle_trace(self) -> None:
+        """F4: registra una traccia Chrome/Perfetto per TOPINI_TRACE_SECONDS secondi."""
+        if tracer.toggle(default_trace_path(), float(os.environ.get("TOPINI_TRACE_SECONDS", "10"))):
+            print("Tracing started")
+
+    def _toggle_decision_trace(self) -> None:
+        """F6: registra ogni valore e condizione valutati dalle regole dei gesti;
+        al secondo F6 scrive il buffer in un file JSON-lines."""
+        rules = find_rule_detector(self.detector)
+        if rules is None:
+            print("Decision trace is only available with the rule detector")
+            return
+        if rules.trace is None:
+            rules.enable_trace()
+            print("Decision trace started")
+            return
+        self._write_decision_trace(rules.disable_trace(), default_decision_trace_path())
+
+    @staticmethod
+    def _write_decision_trace(trace: Any, path: str) -> None:
+        # decodifica e scrittura fuori dal thread GUI: il buffer non viene più scritto
+        def write() -> None:
+            try:
+                print(f"Decision trace written: {path} ({trace.dump(path)} records)")
+            except OSError as e:
+                print(f"Decision trace write error: {e}")
+        threading.Thread(target=write, daemon=True, name="decision-trace-writer").start()
+
+    def _on_camera_removed(self, info: Any) -> None:
+        if self.cameras is not None and info.index == self.cameras.active_index and self._timer.isActive():
+            self._show_overlay(f"Camera scollegata: {info.name}", ms=3000)
+
+    def _on_camera_switched(self, report: Any) -> None:
+        if not self._timer.isActive():
+            return
+        if report.ok:
+            self._show_overlay(f"Camera {report.to_index} ({report.first_frame_ms:.0f} ms)", ms=2000)
+        else:
+            self._show_overlay(f"Nessuna camera disponibile ({report.error})", ms=3000)
+
+    def _on_capture_status(self, status: Any) -> None:
+        """Watchdog of the capture thread: camera without frames, reopen attempts, recovery."""
+        if not self._timer.isActive():
+            return
+        if status.state == "stalled":
+            self._show_overlay("Camera bloccata, riconnessione...", ms=10000)
+        elif status.state == "reopening":
+            self._show_overlay(f"Camera non disponibile, nuovo tentativo tra {status.retry_s:.0f} s "
+                               f"({status.attempts})", ms=int(status.retry_s * 1000) + 10000)
+        elif status.state == "recovered":
+            self._show_overlay(f"Camera ripristinata ({status.outage_s:.1f} s)", ms=2000)
+
+    def _update_presence(self, captured: Any, hands: Any) -> None:
+        if not self.idle.enabled:
+            return
+        # il movimento aggiorna anche lo sfondo, che resta pronto per lo stato di riposo
+        moving = self.motion.update(captured.frame_bgr)
+        if hands or moving:
+            self.idle.note_presence()
+        wake_ms = self.idle.frame_processed(captured.timestamp)
+        if wake_ms is not None:
+            print(f"Idle: full rate again {wake_ms:.0f} ms after motion")
+        if self.idle.should_sleep():
+            self._enter_idle()
+
+    def _enter_idle(self) -> None:
+        print(f"Idle: nobody in frame for {self.idle.idle_after_s:.0f}s, capture at {self.idle.idle_fps} fps")
+        if self.capture is not None:
+            self.capture.set_fps(self.idle.idle_fps)
+        # tick a metà intervallo di cattura: limita la latenza di risveglio
+        self._timer.setInterval(max(30, 500 // max(1, self.idle.idle_fps)))
+        self._last_hands = []
+        self.attract_label.setVisible(True)
+
+    def _leave_idle(self) -> None:
+        if self.capture is not None:
+            self.capture.set_fps(self._active_fps)
+        self._timer.setInterval(30)
+        self.attract_label.setVisible(False)
+        self.quality.reset()
+
+    def _wake(self, trigger_ts: float) -> None:
+        self.idle.wake(trigger_ts)
+        self._leave_idle()
+
+    def _apply_quality(self, level: QualityLevel) -> None:
+        if self.tracker is not None:
+            self.tracker.inference_width = level.inference_width
+            self.tracker.set_model_complexity(level.model_complexity)
+        if self.capture is not None:
+            self.capture.set_resolution(level.capture_resolution)
+
+    def _on_frame_presented(self, age_ms: float) -> None:
+        if not self.idle.idle:
+            self.quality.observe(age_ms)
+        if self.metrics.enabled:
+            self.metrics.record_frame_age(age_ms)
+
+    def _set_banner_visible(self, visible: bool) -> None:
+        self._banner_wrapper.setVisible(visible)
+        self.overlay_banner.setVisible(visible)
+
+    def _tick_progress(self) -> None:
+        self._progress_elapsed += self._progress_timer.interval()
+        progress_value = min(self._progress_elapsed, self._progress_total)
+        self._banner_face.progress.setValue(progress_value)
+        
+        if self._progress_elapsed >= self._progress_total:
+            self._progress_timer.stop()
+            self._gesture_detection_blocked = False  # Riabilita rilevamento gesti
+
+    def _hide_banner(self) -> None:
+        self._banner_hide_anim.stop()
+        self._banner_hide_anim.setStartValue(self.overlay_banner.maximumHeight())
+        self._banner_hide_anim.setEndValue(0)
+        self._banner_hide_anim.start()
+
+    def _show_overlay(self, text: str, ms: int = 3000, kind: str = 'info') -> None:
+        # Blocca rilevamento gesti durante l'overlay
+        self._gesture_detection_blocked = True
+        
+        start = time.perf_counter()
+        # switch to the prebuilt face for this kind (styles already resolved)
+        face = self._add_banner_face(kind if kind in BANNER_KINDS else 'info')
+        if face.kind == 'info':
+            face.title.setText(text)
+        if face is not self._banner_face:
+            self._banner_face = face
+            self._banner_stack.setCurrentWidget(face)
+
+        # progress - fisso a 3000ms (3 secondi)
+        self._progress_total = 3000
+        self._progress_elapsed = 0
+        face.progress.setRange(0, 2000)
+        face.progress.setValue(0)
+
+        # animate show
+        self._banner_anim.stop()
+        self._set_banner_visible(True)
+        self._banner_anim.setStartValue(self.overlay_banner.maximumHeight())
+        self._banner_anim.setEndValue(self._banner_h)
+        self._banner_anim.start()
+
+        # timers - mantieni il timer di hiding al tempo specificato ma progress bar sempre 1.5s
+        self.overlay_timer.start(ms)
+        self._progress_timer.setInterval(30)
+        self._progress_timer.start()
+        self.overlay_stall_ms.append((time.perf_counter() - start) * 1000.0)
+
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        super().showEvent(event)
+        if not self._banner_primed:
+            # costruisce le facce mancanti e ne risolve lo stylesheet una volta
+            # sola, prima del primo evento gesto
+            self._banner_primed = True
+            for kind in BANNER_KINDS:
+                self._add_banner_face(kind)
+            for face in self._banner_faces.values():
+                face.prime()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+# pyright: reportUnknownMemberType=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false
+
+import time
+from typing import Any, Optional
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from src.core.frame_hub import FrameConsumer, FrameHub, FramePacket
+from .video_widget import VideoWidget
+
+
+class _OperatorView(FrameConsumer):
+    name = "operator"
+
+    def __init__(self, window: "OperatorWindow") -> None:
+        self.window = window
+
+    def handle(self, packet: FramePacket) -> None:
+        self.window.show_packet(packet)
+
+
+class OperatorWindow(QtWidgets.QWidget):
+    """Secondary window for the operator (F7 in the gesture page): the same
+    frames and landmarks as the main view, at a lower rate, with the tracker's
+    per-hand details. It is a hub subscriber only while open, so it adds no
+    capture or inference work."""
+
+    MAX_FPS = 15.0
+
+    def __init__(self, hub: FrameHub, parent: Optional[QtWidgets.QWidget] = None) -> None:
+        super().__init__(parent, QtCore.Qt.WindowType.Window)
+        self.setWindowTitle("Topini - operatore")
+        self.resize(640, 460)
+        self.hub = hub
+        self._view = _OperatorView(self)
+        self.video = VideoWidget()
+        self.info = QtWidgets.QLabel()
+        self.info.setTextFormat(QtCore.Qt.TextFormat.PlainText)
+        font = QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont)
+        self.info.setFont(font)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.video, 1)
+        layout.addWidget(self.info)
+        self._last_info = 0.0
+
+    def toggle(self) -> None:
+        if self.isVisible():
+            self.close()
+        else:
+            self.show()
+            self.raise_()
+
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        super().showEvent(event)
+        if not self.hub.is_subscribed(self._view):
+            # consumer nel thread GUI: show_frame è solo un riferimento in coda
+            self.hub.subscribe(self._view, max_fps=self.MAX_FPS, inline=True)
+
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+        self.hub.unsubscribe(self._view)
+        self.video.clear()
+        super().closeEvent(event)
+
+    def show_packet(self, packet: FramePacket) -> None:
+        self.video.show_frame(packet.display_bgr, packet.timestamp, packet.seq)
+        now = time.perf_counter()
+        if now - self._last_info < 0.25:
+            return
+        self._last_info = now
+        lines = [f"frame {packet.seq}  age {(now - packet.timestamp) * 1000.0:.0f} ms  "
+                 f"{'inferred' if packet.inferred else 'carried over'}"]
+        for i, hand in enumerate(packet.hands):
+            x, y = hand.points[0]
+            lines.append(f"hand {i}  {hand.handedness:<5}  score {hand.score:.2f}  wrist {x},{y}")
+        stats: Any = self.hub.stats()
+        lines.append("  ".join(f"{name} {s['delivered']}/{s['skipped']}/{s['dropped']}"
+                               for name, s in stats.items()) + "  (delivered/skipped/dropped)")
+        self.info.setText("\n".join(lines))
@@ -0,0 +1,139 @@
+from __future__ import annotations
+# pyright: reportUnknownMemberType=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false
+
+import time
+from typing import Any, Callable, List, Optional
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from src.core.frame_hub import FrameConsumer, FrameHub, FramePacket
+from src.utils.metrics import PipelineMetrics, RateMeter, TICK_STAGES
+
+
+class _HudFrames(FrameConsumer):
+    """Keeps the latest packet seen by the HUD (a low-rate hub subscriber)."""
+
+    name = "hud"
+
+    def __init__(self) -> None:
+        self.last: Optional[FramePacket] = None
+
+    def handle(self, packet: FramePacket) -> None:
+        self.last = packet
+
+
+class PerfHud(QtWidgets.QLabel):
+    """Toggleable overlay with FPS, per-stage latency percentiles and drop counters.
+
+    The HUD only enables metric collection while it is visible; ``sources``
+    returns the objects it reads from (capture thread, video widget, banner stall
+    times, quality controller, idle manager and event bus). With a frame
+    ``hub`` it subscribes to it while visible and shows every consumer's
+    delivered, skipped and dropped frames.
+    """
+
+    REFRESH_MS = 500
+
+    def __init__(self, metrics: PipelineMetrics, sources: Callable[[], Any], parent: Optional[QtWidgets.QWidget] = None,
+                 hub: Optional[FrameHub] = None) -> None:
+        super().__init__(parent)
+        self.setObjectName("perfHud")
+        self.setAttribute(QtCore.Qt.WidgetAttribute.WA_TransparentForMouseEvents, True)
+        self.setAlignment(QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignTop)
+        self.setTextFormat(QtCore.Qt.TextFormat.PlainText)
+        font = QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont)
+        font.setPointSize(10)
+        self.setFont(font)
+        self.setVisible(False)
+
+        self._metrics = metrics
+        self._sources = sources
+        self._hub = hub
+        self._frames = _HudFrames()
+        self._capture_rate = RateMeter()
+        self._infer_rate = RateMeter()
+        self._display_rate = RateMeter()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(self.REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+
+    def toggle(self) -> None:
+        self.set_active(not self.isVisible())
+
+    def set_active(self, active: bool) -> None:
+        if active:
+            self._metrics.reset()
+            for meter in (self._capture_rate, self._infer_rate, self._display_rate):
+                meter.reset()
+            self._metrics.enabled = True
+            if self._hub is not None and not self._hub.is_subscribed(self._frames):
+                self._hub.subscribe(self._frames, max_fps=1000.0 / self.REFRESH_MS, inline=True)
+            self.setVisible(True)
+            self.raise_()
+            self.refresh()
+            self._timer.start()
+        else:
+            self._timer.stop()
+            self._metrics.enabled = False
+            if self._hub is not None:
+                self._hub.unsubscribe(self._frames)
+            self.setVisible(False)
+
+    def refresh(self) -> None:
+        now = time.perf_counter()
+        capture, video, stall_ms, quality, idle, events = self._sources()
+        m = self._metrics
+        captured = capture.frames_captured if capture is not None else 0
+        stats = video.frame_stats()
+        cap_fps = self._capture_rate.update(captured, now)
+        inf_fps = self._infer_rate.update(m.inferences, now)
+        disp_fps = self._display_rate.update(stats.presented, now)
+
+        lines: List[str] = [
+            f"fps  capture {cap_fps:5.1f}  inference {inf_fps:5.1f}  display {disp_fps:5.1f}",
+            f"{'stage':<8}{'p50':>8}{'p95':>8}{'p99':>8}  ms",
+        ]
+        for name in TICK_STAGES + ("tick",):
+            stage = m.stages.get(name)
+            if stage is None:
+                continue
+            p50, p95, p99 = stage.percentiles(50, 95, 99)
+            lines.append(f"{name:<8}{p50:8.2f}{p95:8.2f}{p99:8.2f}")
+        p50, p95, p99 = m.frame_age.percentiles(50, 95, 99)
+        lines.append(f"{'age':<8}{p50:8.2f}{p95:8.2f}{p99:8.2f}")
+        lines.append(
+            f"dropped  capture {m.capture_dropped}  display {stats.dropped}  coalesced {stats.coalesced}"
+        )
+        outages = getattr(capture, "outages", None)
+        if outages is not None and outages.outages:
+            o = outages.summary()
+            state = "  (now)" if o["in_outage"] else ""
+            lines.append(f"camera   outages {o['outages']}  total {o['total_s']:.1f} s  "
+                         f"longest {o['longest_s']:.1f} s  reopens {o['reopen_attempts']}{state}")
+        if self._hub is not None:
+            last = self._frames.last
+            if last is not None:
+                lines.append(f"frames   seq {last.seq}  hands {len(last.hands)}  published {self._hub.published}")
+            for name, s in self._hub.stats().items():
+                lines.append(f"consumer {name:<8} sent {s['delivered']}  skipped {s['skipped']}  "
+                             f"dropped {s['dropped']}  p95 {s['latency_p95']:.1f} ms")
+        if stall_ms:
+            lines.append(f"banner   last {stall_ms[-1]:.2f} ms  max {max(stall_ms):.2f} ms")
+        if quality is not None:
+            level = quality.level
+            mode = "auto" if quality.enabled else "fixed"
+            lines.append(
+                f"quality  {level.name} ({mode})  infer {level.inference_width or 'full'}px  "
+                f"model {level.model_complexity}  every {level.inference_every}  "
+                f"target {quality.target_ms:.0f} ms  cpu free {quality.last_headroom:.0%}"
+            )
+        if idle is not None and idle.enabled:
+            state = "idle" if idle.idle else "active"
+            wake = (f"  wake last {idle.last_wake_ms:.0f} ms  max {idle.wake_ms.summary()['max']:.0f} ms"
+                    if idle.last_wake_ms is not None else "")
+            lines.append(f"power    {state}  sleeps {idle.sleeps}{wake}")
+        if events is not None:
+            for name, s in events.stats().items():
+                lines.append(f"sink     {name:<7} sent {s['delivered']}  dropped {s['dropped']}  "
+                             f"failed {s['failed']}  p95 {s['latency_p95']:.1f} ms")
+        self.setText("\n".join(lines))
+        self.adjustSize()
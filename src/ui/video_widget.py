@@ -1,95 +1,208 @@
-from __future__ import annotations
-# pyright: reportUnknownMemberType=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false
-
-from typing import Optional, Any
-import cv2
-from PySide6 import QtCore, QtGui, QtWidgets
-
-
-class VideoWidget(QtWidgets.QLabel):
-    """Widget for displaying video frames with 16:9 aspect ratio that fills available space."""
-    
-    def __init__(self) -> None:
-        super().__init__()
-        # Expand to fill available space while maintaining 16:9
-        self.setMinimumSize(480, 270)  # Minimum 16:9 size
-        self.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-        self.setSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding)
-        self._radius: int = 0
-        self._pixmap: Optional[QtGui.QPixmap] = None
-        self._render_size: QtCore.QSize = QtCore.QSize(1280, 720)  # Default HD 16:9 size
-
-    def setCornerRadius(self, radius: int) -> None:
-        self._radius = max(0, int(radius))
-        self.update()
-
-    def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
-        """Maintain camera's native aspect ratio when widget is resized."""
-        super().resizeEvent(event)
-        # Use camera's actual aspect ratio (now 16:9 HD)
-        new_size = event.size()
-        width = new_size.width()
-        height = new_size.height()
-        
-        # Calculate the optimal size maintaining 16:9 (camera actual ratio)
-        camera_ratio = 16.0 / 9.0  # 1280x720 = 16:9
-        current_ratio = width / height if height > 0 else camera_ratio
-        
-        if current_ratio > camera_ratio:
-            # Too wide, limit by height (letterbox left/right)
-            optimal_width = int(height * camera_ratio)
-            optimal_height = height
-        else:
-            # Too tall, limit by width (letterbox top/bottom)
-            optimal_width = width
-            optimal_height = int(width / camera_ratio)
-        
-        # Store the optimal rendering size for 16:9
-        self._render_size = QtCore.QSize(optimal_width, optimal_height)
-
-    def show_frame(self, frame_bgr: Any) -> None:
-        if frame_bgr is None:
-            return
-        
-        # Convert frame to RGB without cropping (preserve all content)
-        rgb: Any = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)  # type: ignore
-        h, w = rgb.shape[:2]
-        qimg: QtGui.QImage = QtGui.QImage(rgb.data, w, h, 3 * w, QtGui.QImage.Format.Format_RGB888)  # type: ignore
-        
-        # Scale maintaining aspect ratio (no cropping, may add letterbox)
-        render_w = self._render_size.width()
-        render_h = self._render_size.height()
-        self._pixmap = QtGui.QPixmap.fromImage(qimg).scaled(
-            render_w, render_h,
-            QtCore.Qt.AspectRatioMode.KeepAspectRatio,  # Preserve original content
-            QtCore.Qt.TransformationMode.SmoothTransformation,
-        )
-        self.update()
-
-    def paintEvent(self, arg__1: QtGui.QPaintEvent) -> None:
-        painter = QtGui.QPainter(self)
-        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing, True)
-        
-        # Fill background with black (for letterbox effect)
-        widget_rect = self.rect()
-        painter.fillRect(widget_rect, QtGui.QColor(0, 0, 0))
-        
-        if self._pixmap:
-            # Center the video maintaining its aspect ratio
-            pixmap_w = self._pixmap.width()
-            pixmap_h = self._pixmap.height()
-            
-            x = (widget_rect.width() - pixmap_w) // 2
-            y = (widget_rect.height() - pixmap_h) // 2
-            video_rect = QtCore.QRect(x, y, pixmap_w, pixmap_h)
-            
-            # Apply rounded corners to the entire widget area
-            if self._radius > 0:
-                path = QtGui.QPainterPath()
-                path.addRoundedRect(QtCore.QRectF(widget_rect), float(self._radius), float(self._radius))
-                painter.setClipPath(path)
-            
-            # Draw video centered (may have letterbox bars)
-            painter.drawPixmap(video_rect, self._pixmap)
-        else:
-            QtWidgets.QLabel.paintEvent(self, arg__1)
+from __future__ import annotations
+# pyright: reportUnknownMemberType=false, reportUnknownVariableType=false, reportUnknownArgumentType=false, reportUnknownParameterType=false
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Any
+import cv2
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from src.utils.tracing import tracer
+
+
+@dataclass
+class PresentationStats:
+    """Frame counters of a VideoWidget since the last reset."""
+    presented: int = 0   # frames converted, scaled and painted
+    dropped: int = 0     # frames discarded because the widget was not visible
+    coalesced: int = 0   # frames replaced by a newer one before being presented
+
+
+class VideoWidget(QtWidgets.QLabel):
+    """Widget for displaying video frames with 16:9 aspect ratio that fills available space."""
+    
+    def __init__(self) -> None:
+        super().__init__()
+        # Expand to fill available space while maintaining 16:9
+        self.setMinimumSize(480, 270)  # Minimum 16:9 size
+        self.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        self.setSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding)
+        self._radius: int = 0
+        self._pixmap: Optional[QtGui.QPixmap] = None
+        self._render_size: QtCore.QSize = QtCore.QSize(1280, 720)  # Default HD 16:9 size
+
+        # Presentation pacing: only the newest pending frame is converted, at most
+        # once per display refresh interval.
+        self._pending_frame: Optional[Any] = None
+        self._pending_ts: Optional[float] = None
+        self._pending_seq: Optional[int] = None
+        # chiamato con l'età (ms) del frame presentato, se il chiamante ne ha fornito il timestamp
+        self.frame_age_callback: Optional[Callable[[float], None]] = None
+        self._last_present: float = 0.0
+        self._stats = PresentationStats()
+        self._present_timer = QtCore.QTimer(self)
+        self._present_timer.setSingleShot(True)
+        self._present_timer.setTimerType(QtCore.Qt.TimerType.PreciseTimer)
+        self._present_timer.timeout.connect(self._present_pending)
+
+    def setCornerRadius(self, radius: int) -> None:
+        self._radius = max(0, int(radius))
+        self.update()
+
+    def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
+        """Maintain camera's native aspect ratio when widget is resized."""
+        super().resizeEvent(event)
+        # Use camera's actual aspect ratio (now 16:9 HD)
+        new_size = event.size()
+        width = new_size.width()
+        height = new_size.height()
+        
+        # Calculate the optimal size maintaining 16:9 (camera actual ratio)
+        camera_ratio = 16.0 / 9.0  # 1280x720 = 16:9
+        current_ratio = width / height if height > 0 else camera_ratio
+        
+        if current_ratio > camera_ratio:
+            # Too wide, limit by height (letterbox left/right)
+            optimal_width = int(height * camera_ratio)
+            optimal_height = height
+        else:
+            # Too tall, limit by width (letterbox top/bottom)
+            optimal_width = width
+            optimal_height = int(width / camera_ratio)
+        
+        # Store the optimal rendering size for 16:9
+        self._render_size = QtCore.QSize(optimal_width, optimal_height)
+
+    def show_frame(self, frame_bgr: Any, timestamp: Optional[float] = None, seq: Optional[int] = None) -> None:
+        """Queue a frame for presentation.
+
+        ``timestamp`` is the ``time.perf_counter()`` capture time of the frame,
+        used to report the frame age at presentation to ``frame_age_callback``;
+        ``seq`` is only used to label trace spans.
+
+        Frames arriving faster than the display refresh are coalesced (only the
+        newest is converted and painted); frames arriving while the widget is
+        hidden or its window minimised are dropped without any conversion.
+        """
+        if frame_bgr is None:
+            return
+        if not self._is_presentable():
+            self._stats.dropped += 1
+            self._pending_frame = None
+            return
+        if self._pending_frame is not None:
+            self._stats.coalesced += 1
+        self._pending_frame = frame_bgr
+        self._pending_ts = timestamp
+        self._pending_seq = seq
+        self._schedule_present()
+
+    def frame_stats(self) -> PresentationStats:
+        """Return a copy of the presented/dropped/coalesced counters."""
+        return PresentationStats(self._stats.presented, self._stats.dropped, self._stats.coalesced)
+
+    def reset_frame_stats(self) -> None:
+        self._stats = PresentationStats()
+
+    def clear(self) -> None:
+        """Drop the pending and the last presented frame."""
+        self._present_timer.stop()
+        self._pending_frame = None
+        self._pixmap = None
+        super().clear()
+
+    def _is_presentable(self) -> bool:
+        if not self.isVisible():
+            return False
+        window = self.window()
+        return window is None or not window.isMinimized()
+
+    def _refresh_interval(self) -> float:
+        screen = self.screen()
+        rate = screen.refreshRate() if screen is not None else 0.0
+        return 1.0 / rate if rate and rate > 1.0 else 1.0 / 60.0
+
+    def _schedule_present(self) -> None:
+        delay = self._last_present + self._refresh_interval() - time.perf_counter()
+        if delay <= 0:
+            # the refresh slot is already due: present now rather than queueing a
+            # zero timer that a busy event loop may starve behind the next tick
+            self._present_timer.stop()
+            self._present_pending()
+        elif not self._present_timer.isActive():
+            # wait for the next refresh slot; the newest pending frame will be used
+            self._present_timer.start(max(1, int(delay * 1000.0)))
+
+    def _present_pending(self) -> None:
+        frame_bgr = self._pending_frame
+        self._pending_frame = None
+        if frame_bgr is None:
+            return
+        if not self._is_presentable():
+            self._stats.dropped += 1
+            return
+        self._last_present = start = time.perf_counter()
+
+        # Convert frame to RGB without cropping (preserve all content)
+        rgb: Any = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)  # type: ignore
+        h, w = rgb.shape[:2]
+        # pass the array itself: QImage(rgb.data, ...) leaks one memoryview per frame in PySide6
+        qimg: QtGui.QImage = QtGui.QImage(rgb, w, h, 3 * w, QtGui.QImage.Format.Format_RGB888)  # type: ignore
+        
+        # Scale maintaining aspect ratio (no cropping, may add letterbox)
+        render_w = self._render_size.width()
+        render_h = self._render_size.height()
+        self._pixmap = QtGui.QPixmap.fromImage(qimg).scaled(
+            render_w, render_h,
+            QtCore.Qt.AspectRatioMode.KeepAspectRatio,  # Preserve original content
+            QtCore.Qt.TransformationMode.SmoothTransformation,
+        )
+        self._stats.presented += 1
+        self.update()
+        if tracer.enabled:
+            tracer.complete("present", start, time.perf_counter(), self._pending_seq, flow="in")
+        if self._pending_ts is not None and self.frame_age_callback is not None:
+            self.frame_age_callback((time.perf_counter() - self._pending_ts) * 1000.0)
+
+    def hideEvent(self, event: QtGui.QHideEvent) -> None:
+        # nothing to present while hidden: release the pending frame right away
+        self._present_timer.stop()
+        if self._pending_frame is not None:
+            self._pending_frame = None
+            self._stats.dropped += 1
+        super().hideEvent(event)
+
+    def paintEvent(self, arg__1: QtGui.QPaintEvent) -> None:
+        if tracer.enabled:
+            with tracer.span("paint"):
+                self._paint(arg__1)
+        else:
+            self._paint(arg__1)
+
+    def _paint(self, arg__1: QtGui.QPaintEvent) -> None:
+        painter = QtGui.QPainter(self)
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing, True)
+        
+        # Fill background with black (for letterbox effect)
+        widget_rect = self.rect()
+        painter.fillRect(widget_rect, QtGui.QColor(0, 0, 0))
+        
+        if self._pixmap:
+            # Center the video maintaining its aspect ratio
+            pixmap_w = self._pixmap.width()
+            pixmap_h = self._pixmap.height()
+            
+            x = (widget_rect.width() - pixmap_w) // 2
+            y = (widget_rect.height() - pixmap_h) // 2
+            video_rect = QtCore.QRect(x, y, pixmap_w, pixmap_h)
+            
+            # Apply rounded corners to the entire widget area
+            if self._radius > 0:
+                path = QtGui.QPainterPath()
+                path.addRoundedRect(QtCore.QRectF(widget_rect), float(self._radius), float(self._radius))
+                painter.setClipPath(path)
+            
+            # Draw video centered (may have letterbox bars)
+            painter.drawPixmap(video_rect, self._pixmap)
+        else:
+            QtWidgets.QLabel.paintEvent(self, arg__1)
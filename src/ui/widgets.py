@@ -1,102 +1,171 @@
-from __future__ import annotations
-
-from typing import Optional
-from PySide6 import QtCore, QtGui, QtWidgets
-
-
-def apply_elevation(widget: QtWidgets.QWidget, level: int = 1) -> None:
-    """Apply a soft drop shadow to simulate elevation.
-    Levels: 1 (low), 2 (medium), 3 (high)
-    """
-    blur = {1: 8, 2: 16, 3: 24}.get(level, 8)
-    offset_y = {1: 2, 2: 3, 3: 6}.get(level, 2)
-    alpha = {1: 120, 2: 150, 3: 170}.get(level, 120)
-    effect = QtWidgets.QGraphicsDropShadowEffect(widget)
-    effect.setBlurRadius(blur)
-    effect.setOffset(0, offset_y)
-    effect.setColor(QtGui.QColor(0, 0, 0, alpha))
-    widget.setGraphicsEffect(effect)
-
-
-class RippleButton(QtWidgets.QPushButton):
-    """QPushButton with a simple material-like ripple on click."""
-
-    def __init__(self, text: str = "", parent: Optional[QtWidgets.QWidget] = None, elevation: int = 1) -> None:
-        super().__init__(text, parent)
-        self.setCursor(QtCore.Qt.CursorShape.PointingHandCursor)
-        self.setFocusPolicy(QtCore.Qt.FocusPolicy.StrongFocus)
-        self.setMouseTracking(True)
-
-        self._ripple_active: bool = False
-        self._r_center: QtCore.QPointF = QtCore.QPointF(0, 0)
-        self._r_radius: float = 0.0
-        self._r_opacity: float = 0.0
-
-        self._radius_anim = QtCore.QVariantAnimation(self)
-        self._radius_anim.valueChanged.connect(self._on_radius_changed)
-        self._opacity_anim = QtCore.QVariantAnimation(self)
-        self._opacity_anim.valueChanged.connect(self._on_opacity_changed)
-        self._group = QtCore.QParallelAnimationGroup(self)
-        self._group.addAnimation(self._radius_anim)
-        self._group.addAnimation(self._opacity_anim)
-        self._group.finished.connect(self._on_anim_finished)
-
-        apply_elevation(self, elevation)
-
-    def _on_radius_changed(self, val: object) -> None:
-        try:
-            self._r_radius = float(val)  # type: ignore[arg-type]
-        except Exception:
-            self._r_radius = 0.0
-        self.update()
-
-    def _on_opacity_changed(self, val: object) -> None:
-        try:
-            self._r_opacity = float(val)  # type: ignore[arg-type]
-        except Exception:
-            self._r_opacity = 0.0
-        self.update()
-
-    def _on_anim_finished(self) -> None:
-        self._ripple_active = False
-        self.update()
-
-    def mousePressEvent(self, e: QtGui.QMouseEvent) -> None:
-        self._start_ripple(e.position())
-        QtWidgets.QPushButton.mousePressEvent(self, e)
-
-    def _start_ripple(self, pos: QtCore.QPointF) -> None:
-        self._r_center = QtCore.QPointF(pos)
-        r = self.rect()
-        corners = [QtCore.QPointF(r.topLeft()), QtCore.QPointF(r.topRight()), QtCore.QPointF(r.bottomLeft()), QtCore.QPointF(r.bottomRight())]
-        max_dist = 0.0
-        for c in corners:
-            d = c - self._r_center
-            dist = (d.x() ** 2 + d.y() ** 2) ** 0.5
-            if dist > max_dist:
-                max_dist = dist
-        self._radius_anim.stop()
-        self._opacity_anim.stop()
-        self._group.stop()
-        self._radius_anim.setStartValue(0.0)
-        self._radius_anim.setEndValue(max_dist)
-        self._radius_anim.setDuration(300)
-        self._radius_anim.setEasingCurve(QtCore.QEasingCurve.Type.OutCubic)
-        self._opacity_anim.setStartValue(0.28)
-        self._opacity_anim.setEndValue(0.0)
-        self._opacity_anim.setDuration(380)
-        self._opacity_anim.setEasingCurve(QtCore.QEasingCurve.Type.OutCubic)
-        self._ripple_active = True
-        self._group.start()
-
-    def paintEvent(self, arg__1: QtGui.QPaintEvent) -> None:
-        QtWidgets.QPushButton.paintEvent(self, arg__1)
-        if not self._ripple_active:
-            return
-        painter = QtGui.QPainter(self)
-        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing, True)
-        color = QtGui.QColor(255, 255, 255)
-        color.setAlphaF(max(0.0, min(1.0, self._r_opacity)))
-        painter.setPen(QtCore.Qt.PenStyle.NoPen)
-        painter.setBrush(color)
-        painter.drawEllipse(self._r_center, self._r_radius, self._r_radius)
+from __future__ import annotations
+
+from typing import Optional
+from PySide6 import QtCore, QtGui, QtWidgets
+
+
+def apply_elevation(widget: QtWidgets.QWidget, level: int = 1) -> None:
+    """Apply a soft drop shadow to simulate elevation.
+    Levels: 1 (low), 2 (medium), 3 (high)
+    """
+    blur = {1: 8, 2: 16, 3: 24}.get(level, 8)
+    offset_y = {1: 2, 2: 3, 3: 6}.get(level, 2)
+    alpha = {1: 120, 2: 150, 3: 170}.get(level, 120)
+    effect = QtWidgets.QGraphicsDropShadowEffect(widget)
+    effect.setBlurRadius(blur)
+    effect.setOffset(0, offset_y)
+    effect.setColor(QtGui.QColor(0, 0, 0, alpha))
+    widget.setGraphicsEffect(effect)
+
+
+class RippleButton(QtWidgets.QPushButton):
+    """QPushButton with a simple material-like ripple on click."""
+
+    def __init__(self, text: str = "", parent: Optional[QtWidgets.QWidget] = None, elevation: int = 1) -> None:
+        super().__init__(text, parent)
+        self.setCursor(QtCore.Qt.CursorShape.PointingHandCursor)
+        self.setFocusPolicy(QtCore.Qt.FocusPolicy.StrongFocus)
+        self.setMouseTracking(True)
+
+        self._ripple_active: bool = False
+        self._r_center: QtCore.QPointF = QtCore.QPointF(0, 0)
+        self._r_radius: float = 0.0
+        self._r_opacity: float = 0.0
+
+        self._radius_anim = QtCore.QVariantAnimation(self)
+        self._radius_anim.valueChanged.connect(self._on_radius_changed)
+        self._opacity_anim = QtCore.QVariantAnimation(self)
+        self._opacity_anim.valueChanged.connect(self._on_opacity_changed)
+        self._group = QtCore.QParallelAnimationGroup(self)
+        self._group.addAnimation(self._radius_anim)
+        self._group.addAnimation(self._opacity_anim)
+        self._group.finished.connect(self._on_anim_finished)
+
+        apply_elevation(self, elevation)
+
+    def _on_radius_changed(self, val: object) -> None:
+        try:
+            self._r_radius = float(val)  # type: ignore[arg-type]
+        except Exception:
+            self._r_radius = 0.0
+        self.update()
+
+    def _on_opacity_changed(self, val: object) -> None:
+        try:
+            self._r_opacity = float(val)  # type: ignore[arg-type]
+        except Exception:
+            self._r_opacity = 0.0
+        self.update()
+
+    def _on_anim_finished(self) -> None:
+        self._ripple_active = False
+        self.update()
+
+    def mousePressEvent(self, e: QtGui.QMouseEvent) -> None:
+        self._start_ripple(e.position())
+        QtWidgets.QPushButton.mousePressEvent(self, e)
+
+    def _start_ripple(self, pos: QtCore.QPointF) -> None:
+        self._r_center = QtCore.QPointF(pos)
+        r = self.rect()
+        corners = [QtCore.QPointF(r.topLeft()), QtCore.QPointF(r.topRight()), QtCore.QPointF(r.bottomLeft()), QtCore.QPointF(r.bottomRight())]
+        max_dist = 0.0
+        for c in corners:
+            d = c - self._r_center
+            dist = (d.x() ** 2 + d.y() ** 2) ** 0.5
+            if dist > max_dist:
+                max_dist = dist
+        self._radius_anim.stop()
+        self._opacity_anim.stop()
+        self._group.stop()
+        self._radius_anim.setStartValue(0.0)
+        self._radius_anim.setEndValue(max_dist)
+        self._radius_anim.setDuration(300)
+        self._radius_anim.setEasingCurve(QtCore.QEasingCurve.Type.OutCubic)
+        self._opacity_anim.setStartValue(0.28)
+        self._opacity_anim.setEndValue(0.0)
+        self._opacity_anim.setDuration(380)
+        self._opacity_anim.setEasingCurve(QtCore.QEasingCurve.Type.OutCubic)
+        self._ripple_active = True
+        self._group.start()
+
+    def paintEvent(self, arg__1: QtGui.QPaintEvent) -> None:
+        QtWidgets.QPushButton.paintEvent(self, arg__1)
+        if not self._ripple_active:
+            return
+        painter = QtGui.QPainter(self)
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing, True)
+        color = QtGui.QColor(255, 255, 255)
+        color.setAlphaF(max(0.0, min(1.0, self._r_opacity)))
+        painter.setPen(QtCore.Qt.PenStyle.NoPen)
+        painter.setBrush(color)
+        painter.drawEllipse(self._r_center, self._r_radius, self._r_radius)
+
+
+class BannerFace(QtWidgets.QWidget):
+    """Content of the gesture banner for a single kind (accent, icon chip, title, time bar).
+
+    The ``kind`` dynamic property is set once at construction, so the per-kind
+    QSS rules are resolved when the face is first polished and switching between
+    prebuilt faces never needs an unpolish/polish round trip.
+    """
+
+    def __init__(self, kind: str, icon: str = "", title: str = "", parent: Optional[QtWidgets.QWidget] = None) -> None:
+        super().__init__(parent)
+        self.kind = kind
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        # Top row: accent stripe + content
+        top_row = QtWidgets.QWidget(self)
+        row_layout = QtWidgets.QHBoxLayout(top_row)
+        row_layout.setContentsMargins(0, 0, 0, 0)
+        row_layout.setSpacing(0)
+
+        # Accent stripe (3–4px), styled per-kind via QSS
+        self.accent = QtWidgets.QWidget(top_row)
+        self.accent.setObjectName("overlayAccent")
+        self.accent.setFixedWidth(4)
+        row_layout.addWidget(self.accent, 0)
+
+        # Content area: icon chip + text column
+        content = QtWidgets.QWidget(top_row)
+        content_layout = QtWidgets.QHBoxLayout(content)
+        content_layout.setContentsMargins(16, 8, 16, 8)
+        content_layout.setSpacing(10)
+        self.icon = QtWidgets.QLabel(icon, content)
+        self.icon.setObjectName("overlayIcon")
+        self.icon.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        self.icon.setFixedSize(30, 30)
+        self.title = QtWidgets.QLabel(title, content)
+        self.title.setObjectName("overlayTitle")
+        self.title.setAlignment(
+            QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter
+        )
+        self.title.setSizePolicy(
+            QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Fixed
+        )
+        content_layout.addWidget(self.icon, 0)
+        content_layout.addWidget(self.title, 1)
+        row_layout.addWidget(content, 1)
+        layout.addWidget(top_row)
+
+        # Time bar spanning the whole banner width
+        self.progress = QtWidgets.QProgressBar(self)
+        self.progress.setObjectName("overlayProgress")
+        self.progress.setTextVisible(False)
+        self.progress.setFixedHeight(4)
+        self.progress.setSizePolicy(
+            QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Fixed
+        )
+        layout.addWidget(self.progress)
+
+        for w in (self.accent, self.icon, self.progress):
+            w.setProperty("kind", kind)
+
+    def prime(self) -> None:
+        """Resolve the style sheet for the whole face ahead of its first use."""
+        self.ensurePolished()
+        for child in self.findChildren(QtWidgets.QWidget):
+            child.ensurePolished()
@@ -0,0 +1,167 @@
+"""
+Ring buffer of per-frame decision records: the intermediate values and the
+pass/fail of every condition a detector evaluated, to find out why a gesture
+did not trigger.
+
+Usage on the hot path (a single ``None`` check while tracing is off: no
+formatting, no dicts, no tuples)::
+
+    trace = self.trace
+    ...
+    if trace is not None:
+        trace.record(KIND_WAVE, now, flags(ok_changes, ok_amp), changes, amp)
+
+Each record kind has a schema (value names and condition names, condition i
+being bit i of ``flags``). Records are fixed-width float64 rows in a
+preallocated NumPy array, so memory stays fixed and the buffer keeps the last
+``capacity`` records; ``rows()`` decodes them into dicts for viewing and
+``dump()`` writes them as JSON lines.
+"""
+
+from __future__ import annotations
+import json
+import math
+import os
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# nome, valori, condizioni
+Schema = Tuple[str, Sequence[str], Sequence[str]]
+
+_HEAD = 3  # tipo, timestamp, flag
+
+
+def flags(*conditions: bool) -> int:
+    """Bit mask of condition results, the first condition in bit 0."""
+    mask = 0
+    for i, ok in enumerate(conditions):
+        if ok:
+            mask |= 1 << i
+    return mask
+
+
+class DecisionTrace:
+    def __init__(self, schemas: Sequence[Schema], capacity: int = 8192, symbol_fields: Sequence[str] = ()) -> None:
+        self.schemas = list(schemas)
+        # valori che sono numeri di ``symbol()``, decodificati come testo
+        self.symbol_fields = frozenset(symbol_fields)
+        self.capacity = capacity
+        width = _HEAD + max((len(values) for _, values, _ in self.schemas), default=0)
+        self._rows = np.zeros((capacity, width), dtype=np.float64)
+        self._next = 0  # numero di record scritti dall'inizio
+        self._symbols: Dict[str, int] = {}
+        self._names: List[str] = []
+        self.started = time.time()
+
+    def __len__(self) -> int:
+        return min(self._next, self.capacity)
+
+    @property
+    def total(self) -> int:
+        """Records written since the start, including the ones overwritten."""
+        return self._next
+
+    def symbol(self, text: str) -> int:
+        """Number standing for ``text`` in a record value (rule names, states)."""
+        code = self._symbols.get(text)
+        if code is None:
+            code = self._symbols[text] = len(self._names)
+            self._names.append(text)
+        return code
+
+    def record(self, kind: int, t: float, mask: int, *values: float) -> None:
+        row = self._rows[self._next % self.capacity]
+        row[0] = kind
+        row[1] = t
+        row[2] = mask
+        row[_HEAD:_HEAD + len(values)] = values
+        self._next += 1
+
+    def clear(self) -> None:
+        self._next = 0
+
+    def rows(self, since: int = 0) -> List[Dict[str, Any]]:
+        """Decoded records with sequence number >= ``since`` (still in the buffer)."""
+        first = max(since, self._next - self.capacity, 0)
+        out: List[Dict[str, Any]] = []
+        for seq in range(first, self._next):
+            row = self._rows[seq % self.capacity]
+            name, values, conditions = self.schemas[int(row[0])]
+            decoded: Dict[str, Any] = {"seq": seq, "kind": name, "t": float(row[1])}
+            for i, field in enumerate(values):
+                value = float(row[_HEAD + i])
+                if field in self.symbol_fields:
+                    decoded[field] = self._names[int(value)]
+                else:
+                    decoded[field] = None if math.isnan(value) else value
+            if conditions:
+                mask = int(row[2])
+                decoded["failed"] = [c for i, c in enumerate(conditions) if not mask & (1 << i)]
+            out.append(decoded)
+        return out
+
+    def dump(self, path: str, rows: Optional[List[Dict[str, Any]]] = None) -> int:
+        """Write the buffered records as JSON lines (after a header line with the
+        schemas); returns the number of records written."""
+        rows = self.rows() if rows is None else rows
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            header = {"kind": "schema", "started": self.started, "total": self._next,
+                      "schemas": {name: {"values": list(v), "conditions": list(c)} for name, v, c in self.schemas}}
+            fh.write(json.dumps(header) + "\n")
+            for row in rows:
+                fh.write(json.dumps(row, separators=(",", ":")) + "\n")
+        return len(rows)
+
+
+def load_rows(path: str) -> List[Dict[str, Any]]:
+    """Records of a file written by ``DecisionTrace.dump`` (header skipped)."""
+    rows: List[Dict[str, Any]] = []
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                row = json.loads(line)
+                if row.get("kind") != "schema":
+                    rows.append(row)
+    return rows
+
+
+def format_row(row: Dict[str, Any]) -> str:
+    """One-line text of a decoded record, failed conditions marked with !."""
+    parts = [f"{row['t']:.3f}", row["kind"]]
+    for key, value in row.items():
+        if key in ("seq", "kind", "t", "failed"):
+            continue
+        if isinstance(value, float):
+            value = f"{value:.4g}"
+        parts.append(f"{key}={value}")
+    failed = row.get("failed")
+    if failed:
+        parts.append("!" + ",!".join(failed))
+    elif failed is not None:
+        parts.append("ok")
+    return " ".join(parts)
+
+
+def failure_summary(rows: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per record kind: records, records passing every condition, how often
+    each condition failed and how often it was the only one failing."""
+    summary: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        failed = row.get("failed")
+        if failed is None:
+            continue
+        entry = summary.setdefault(row["kind"], {"records": 0, "passed": 0, "failed": Counter(), "only": Counter()})
+        entry["records"] += 1
+        if not failed:
+            entry["passed"] += 1
+        entry["failed"].update(failed)
+        if len(failed) == 1:
+            entry["only"][failed[0]] += 1
+    return {kind: {**e, "failed": dict(e["failed"].most_common()), "only": dict(e["only"].most_common())}
+            for kind, e in summary.items()}
@@ -0,0 +1,142 @@
+"""
+Lightweight latency statistics shared by the UI and the command line tools.
+"""
+
+from __future__ import annotations
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    k = int(round((p / 100.0) * (len(sorted_values) - 1)))
+    return sorted_values[max(0, min(len(sorted_values) - 1, k))]
+
+
+class RollingStats:
+    """Rolling window of samples (milliseconds) with percentile summaries."""
+
+    def __init__(self, maxlen: int = 300) -> None:
+        self._values: Deque[float] = deque(maxlen=maxlen)
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self._values.append(value)
+        self.count += 1
+
+    def extend(self, values: Iterable[float]) -> None:
+        for v in values:
+            self.add(v)
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def percentiles(self, *ps: float) -> List[float]:
+        ordered = sorted(self._values)
+        return [percentile(ordered, p) for p in ps]
+
+    def summary(self) -> Dict[str, float]:
+        ordered = sorted(self._values)
+        n = len(ordered)
+        return {
+            "n": n,
+            "mean": (sum(ordered) / n) if n else 0.0,
+            "p50": percentile(ordered, 50),
+            "p95": percentile(ordered, 95),
+            "p99": percentile(ordered, 99),
+            "max": ordered[-1] if n else 0.0,
+        }
+
+
+class StageStats:
+    """A RollingStats per named pipeline stage."""
+
+    def __init__(self, stages: Iterable[str], maxlen: int = 300) -> None:
+        self._maxlen = maxlen
+        self.stages: Dict[str, RollingStats] = {name: RollingStats(maxlen) for name in stages}
+
+    def add(self, stage: str, value_ms: float) -> None:
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = RollingStats(self._maxlen)
+        stats.add(value_ms)
+
+    def get(self, stage: str) -> Optional[RollingStats]:
+        return self.stages.get(stage)
+
+    def clear(self) -> None:
+        for stats in self.stages.values():
+            stats.clear()
+
+    def summary(self, digits: int = 3) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {k: round(v, digits) for k, v in stats.summary().items()}
+            for name, stats in self.stages.items()
+        }
+
+
+class RateMeter:
+    """Rate (per second) of a monotonically increasing counter between two updates."""
+
+    def __init__(self) -> None:
+        self._last_total: Optional[int] = None
+        self._last_t = 0.0
+        self.value = 0.0
+
+    def update(self, total: int, now: float) -> float:
+        if self._last_total is not None and now > self._last_t:
+            self.value = (total - self._last_total) / (now - self._last_t)
+        self._last_total = total
+        self._last_t = now
+        return self.value
+
+    def reset(self) -> None:
+        self._last_total = None
+        self.value = 0.0
+
+
+# stadi di GesturePage._on_tick, nell'ordine in cui vengono misurati
+TICK_STAGES = ("read", "flip", "process", "draw", "show", "detect")
+
+
+class PipelineMetrics:
+    """Per-stage latencies, frame age and drop counters of the GUI pipeline.
+
+    Recording is skipped entirely while ``enabled`` is False, so the only cost
+    left on the hot path is a handful of ``perf_counter()`` calls.
+    """
+
+    def __init__(self, window: int = 300) -> None:
+        self.enabled = False
+        self.stages = StageStats(TICK_STAGES + ("tick",), window)
+        self.frame_age = RollingStats(window)
+        self.inferences = 0
+        self.capture_dropped = 0  # frames captured but never processed
+        self._last_seq = 0
+
+    def reset(self) -> None:
+        self.stages.clear()
+        self.frame_age.clear()
+        self.inferences = 0
+        self.capture_dropped = 0
+        self._last_seq = 0
+
+    def record_tick(self, seq: int, stamps: Iterable[float]) -> None:
+        """Record one processed frame from the ``perf_counter()`` stamps taken
+        before the first and after each stage of TICK_STAGES."""
+        stamps = list(stamps)
+        for i, name in enumerate(TICK_STAGES[:len(stamps) - 1]):
+            self.stages.add(name, (stamps[i + 1] - stamps[i]) * 1000.0)
+        self.stages.add("tick", (stamps[-1] - stamps[0]) * 1000.0)
+        if self._last_seq and seq > self._last_seq + 1:
+            self.capture_dropped += seq - self._last_seq - 1
+        self._last_seq = seq
+        self.inferences += 1
+
+    def record_frame_age(self, age_ms: float) -> None:
+        self.frame_age.add(age_ms)
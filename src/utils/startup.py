@@ -0,0 +1,151 @@
+"""
+Startup timeline: milestones of every launch, measured from process start and
+compared against a budget.
+
+    from src.utils.startup import timeline
+    timeline.mark("window_shown")
+    ...
+    timeline.finish()   # prints a summary, appends a JSON line to the startup log
+
+Budgets (ms from process start) can be overridden with
+``TOPINI_STARTUP_BUDGET="window_shown=500,interactive=1500"``; the log path with
+``TOPINI_STARTUP_LOG`` (empty string disables the log).
+"""
+
+from __future__ import annotations
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Budget predefinito (ms dall'avvio del processo) per ogni tappa
+DEFAULT_BUDGET_MS: Dict[str, float] = {
+    "imports": 400.0,
+    "window_shown": 800.0,
+    "interactive": 1500.0,
+    "components_ready": 4000.0,
+}
+
+
+def process_age_s() -> Optional[float]:
+    """Seconds since the OS created this process (Linux /proc), or None."""
+    try:
+        with open("/proc/self/stat", "r") as fh:
+            # il nome del processo può contenere spazi: i campi seguono l'ultima ')'
+            fields = fh.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])  # campo 22: starttime
+        with open("/proc/uptime", "r") as fh:
+            uptime = float(fh.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def parse_budget(text: str) -> Dict[str, float]:
+    """'window_shown=500,interactive=1500' -> {name: ms}."""
+    budget: Dict[str, float] = {}
+    for item in text.split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            budget[name.strip()] = float(value)
+    return budget
+
+
+def default_log_path() -> str:
+    return os.path.join(os.path.expanduser("~"), ".topini", "startup.jsonl")
+
+
+class StartupTimeline:
+    def __init__(self, budget_ms: Optional[Dict[str, float]] = None) -> None:
+        now = time.perf_counter()
+        age = process_age_s()
+        # senza /proc l'origine è il primo import di questo modulo
+        self.origin = now - age if age is not None else now
+        self.origin_known = age is not None
+        self.budget_ms: Dict[str, float] = dict(DEFAULT_BUDGET_MS if budget_ms is None else budget_ms)
+        self.marks: List[Tuple[str, float]] = []
+        self.extra: Dict[str, Any] = {}
+        self.finished = False
+
+    def configure_from_env(self) -> None:
+        text = os.environ.get("TOPINI_STARTUP_BUDGET")
+        if text:
+            self.budget_ms.update(parse_budget(text))
+
+    def mark(self, name: str) -> float:
+        """Record milestone ``name`` (first occurrence wins); returns ms since start."""
+        elapsed = (time.perf_counter() - self.origin) * 1000.0
+        if not any(n == name for n, _ in self.marks):
+            self.marks.append((name, elapsed))
+        return elapsed
+
+    def get(self, name: str) -> Optional[float]:
+        for n, ms in self.marks:
+            if n == name:
+                return ms
+        return None
+
+    def over_budget(self) -> Dict[str, Tuple[float, float]]:
+        """{milestone: (ms, budget_ms)} for milestones slower than their budget."""
+        out: Dict[str, Tuple[float, float]] = {}
+        for name, ms in self.marks:
+            limit = self.budget_ms.get(name)
+            if limit is not None and ms > limit:
+                out[name] = (ms, limit)
+        return out
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "origin": "process" if self.origin_known else "first_import",
+            "marks_ms": {name: round(ms, 1) for name, ms in self.marks},
+            "budget_ms": self.budget_ms,
+            "over_budget": sorted(self.over_budget()),
+            **self.extra,
+        }
+
+    def finish(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """Print the timeline and append it to the startup log (once per launch)."""
+        report = self.report()
+        if self.finished:
+            return report
+        self.finished = True
+        steps = " → ".join(f"{name} {ms:.0f}ms" for name, ms in self.marks)
+        print(f"Startup: {steps}", file=sys.stderr)
+        for name, (ms, limit) in self.over_budget().items():
+            print(f"Startup: '{name}' over budget ({ms:.0f}ms > {limit:.0f}ms)", file=sys.stderr)
+
+        if path is None:
+            path = os.environ.get("TOPINI_STARTUP_LOG", default_log_path())
+        if path:
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(path, "a", encoding="utf-8") as fh:
+                    fh.write(json.dumps(report) + "\n")
+            except OSError as e:
+                print(f"Startup: cannot write log {path}: {e}", file=sys.stderr)
+        return report
+
+
+def load_log(path: str) -> List[Dict[str, Any]]:
+    """Past launches from a startup log, oldest first."""
+    entries: List[Dict[str, Any]] = []
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+    except OSError:
+        pass
+    return entries
+
+
+# timeline del processo, creata al primo import (il prima possibile in main.py)
+timeline = StartupTimeline()
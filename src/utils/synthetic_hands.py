@@ -0,0 +1,249 @@
+"""
+Procedural 21-point hand landmark generator (no MediaPipe, no camera).
+
+Gestures are produced as vectorized NumPy batches: every generator returns
+``(frames, 21, 2)`` float32 pixel coordinates (heart returns two hands), and
+``SyntheticHandGenerator.scene()`` stacks several hand tracks (``track()``)
+into a ``LandmarkBatch`` of shape ``(frames, hands, 21, 2)`` with noise,
+dropouts and per-frame timestamps::
+
+    gen = SyntheticHandGenerator(seed=1)
+    batch = gen.scene(300, [gen.track("wave", frequency=3.0), gen.track("idle")], noise=1.5)
+    for t, hands in batch.iter_frames():
+        detector.detect(hands, now=t)
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.types import HandLandmarks
+
+GESTURES = ("wave", "heart", "middle_finger", "open_palm", "idle")
+
+# Pose di riferimento in pixel relativi al polso (y verso il basso), mano sinistra
+# nell'immagine; distanza polso -> punta del medio ~190px.
+OPEN_HAND = np.array([
+    (0, 0), (-30, -20), (-55, -45), (-75, -70), (-90, -95),
+    (-30, -90), (-38, -130), (-42, -155), (-45, -180),
+    (0, -95), (0, -140), (0, -165), (0, -190),
+    (25, -88), (30, -128), (33, -150), (35, -172),
+    (48, -78), (58, -105), (64, -122), (68, -140),
+], dtype=np.float32)
+
+MIDDLE_FINGER_HAND = np.array([
+    (0, 0), (-30, -20), (-45, -45), (-45, -55), (-20, -60),
+    (-30, -90), (-34, -105), (-28, -92), (-22, -80),
+    (0, -95), (0, -140), (0, -165), (0, -190),
+    (25, -88), (28, -100), (24, -88), (20, -78),
+    (48, -78), (52, -88), (48, -78), (42, -68),
+], dtype=np.float32)
+
+RELAXED_HAND = np.array([
+    (0, 0), (-28, -18), (-48, -40), (-58, -60), (-62, -78),
+    (-28, -85), (-36, -112), (-34, -122), (-28, -118),
+    (0, -90), (-2, -120), (-4, -128), (-4, -122),
+    (24, -84), (26, -110), (24, -116), (20, -110),
+    (45, -74), (50, -94), (48, -100), (44, -96),
+], dtype=np.float32)
+
+# Mano sinistra del cuore, relativa al centro del cuore: indice in alto e pollice
+# in basso verso il centro, medio/anulare/mignolo piegati.
+HEART_LEFT_HAND = np.array([
+    (-110, 120), (-80, 105), (-55, 85), (-30, 68), (-10, 50),
+    (-95, 40), (-70, 0), (-40, -30), (-10, -40),
+    (-110, 35), (-90, 10), (-75, 0), (-65, -5),
+    (-120, 40), (-102, 18), (-90, 12), (-82, 10),
+    (-128, 50), (-115, 32), (-105, 28), (-98, 27),
+], dtype=np.float32)
+
+
+@dataclass
+class HandTrack:
+    """One hand (or, for "heart", one pair of hands) in a synthetic scene."""
+    gesture: str
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def n_hands(self) -> int:
+        return 2 if self.gesture == "heart" else 1
+
+
+@dataclass
+class LandmarkBatch:
+    points: np.ndarray      # (frames, hands, 21, 2) float32, pixel
+    valid: np.ndarray       # (frames, hands) bool, False = mano assente (dropout)
+    timestamps: np.ndarray  # (frames,) float64, secondi
+    labels: List[str]       # gesto di ogni colonna mano
+    handedness: List[str]   # "Left" | "Right" per colonna mano
+
+    @property
+    def n_frames(self) -> int:
+        return int(self.points.shape[0])
+
+    def hands_at(self, i: int) -> List[HandLandmarks]:
+        """HandLandmarks of the visible hands in frame ``i``."""
+        pts = np.rint(self.points[i]).astype(np.int32).tolist()
+        return [
+            HandLandmarks(points=[(p[0], p[1]) for p in pts[h]], handedness=self.handedness[h], score=0.95)
+            for h in range(len(pts)) if self.valid[i, h]
+        ]
+
+    def iter_frames(self) -> Iterator[Tuple[float, List[HandLandmarks]]]:
+        for i in range(self.n_frames):
+            yield float(self.timestamps[i]), self.hands_at(i)
+
+
+def _transform(template: np.ndarray, angles_deg: np.ndarray, offsets: np.ndarray, scale: float,
+               pivot: Optional[np.ndarray] = None) -> np.ndarray:
+    """Rotate ``template`` (21, 2) by per-frame angles around ``pivot`` (default wrist),
+    scale it and translate by per-frame offsets (F, 2) -> (F, 21, 2)."""
+    base = template * scale
+    if pivot is not None:
+        base = base - pivot * scale
+    a = np.radians(angles_deg.astype(np.float32))
+    cos, sin = np.cos(a), np.sin(a)
+    rot = np.stack([np.stack([cos, -sin], -1), np.stack([sin, cos], -1)], -2)  # (F, 2, 2)
+    out = np.einsum("fij,pj->fpi", rot, base)
+    if pivot is not None:
+        out = out + pivot * scale
+    return (out + offsets[:, None, :]).astype(np.float32)
+
+
+def render_hand_image(width: int, height: int, template: np.ndarray = OPEN_HAND,
+                      center: Optional[Tuple[float, float]] = None, scale: Optional[float] = None,
+                      skin: Tuple[int, int, int] = (140, 170, 215),
+                      background: Tuple[int, int, int] = (60, 70, 80)) -> np.ndarray:
+    """Flat BGR drawing of a hand pose, good enough for MediaPipe's palm detector
+    to find it (used to warm up the tracking path without a camera).
+
+    The default scale keeps the hand at the size the detector reliably picks up
+    relative to the longer side of the frame.
+    """
+    import cv2  # solo per il disegno: il generatore di landmark resta NumPy puro
+
+    if scale is None:
+        scale = max(width, height) / 1067.0
+    if center is None:
+        center = (width * 0.5, height * 0.83)
+    img = np.empty((height, width, 3), dtype=np.uint8)
+    img[:] = background
+    pts = np.rint(template * scale + np.asarray(center, dtype=np.float32)).astype(np.int32)
+    palm = pts[[0, 1, 2, 5, 9, 13, 17]]
+    cv2.fillConvexPoly(img, cv2.convexHull(palm), skin)
+    thickness = max(2, int(round(18 * scale)))
+    for chain in ((1, 2, 3, 4), (5, 6, 7, 8), (9, 10, 11, 12), (13, 14, 15, 16), (17, 18, 19, 20)):
+        for a, b in zip(chain, chain[1:]):
+            cv2.line(img, (int(pts[a][0]), int(pts[a][1])), (int(pts[b][0]), int(pts[b][1])),
+                     skin, thickness, cv2.LINE_AA)
+    return img
+
+
+class SyntheticHandGenerator:
+    def __init__(self, fps: float = 30.0, width: int = 1280, height: int = 720, seed: int = 0) -> None:
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.rng = np.random.default_rng(seed)
+
+    def _t(self, frames: int) -> np.ndarray:
+        return np.arange(frames, dtype=np.float32) / np.float32(self.fps)
+
+    def _center(self, center: Optional[Tuple[float, float]]) -> np.ndarray:
+        if center is None:
+            center = (self.width * 0.5, self.height * 0.8)
+        return np.asarray(center, dtype=np.float32)
+
+    # --- gesture primitives -------------------------------------------------
+
+    def wave(self, frames: int, frequency: float = 3.0, amplitude: float = 80.0, rotation: float = 0.0,
+             center: Optional[Tuple[float, float]] = None, scale: float = 1.0, phase: float = 0.0) -> np.ndarray:
+        """Open hand oscillating sideways (``amplitude`` px) and/or rotating around the
+        wrist (``rotation`` degrees) at ``frequency`` Hz."""
+        s = np.sin(2 * np.pi * frequency * self._t(frames) + phase)
+        offsets = np.zeros((frames, 2), dtype=np.float32) + self._center(center)
+        offsets[:, 0] += amplitude * s
+        return _transform(OPEN_HAND, rotation * s, offsets, scale)
+
+    def open_palm(self, frames: int, center: Optional[Tuple[float, float]] = None, scale: float = 1.0,
+                  sway: float = 3.0) -> np.ndarray:
+        """Open hand held still, with a slow sway of ``sway`` px."""
+        s = np.sin(2 * np.pi * 0.3 * self._t(frames))
+        offsets = np.zeros((frames, 2), dtype=np.float32) + self._center(center)
+        offsets[:, 0] += sway * s
+        return _transform(OPEN_HAND, np.zeros(frames, dtype=np.float32), offsets, scale)
+
+    def middle_finger(self, frames: int, center: Optional[Tuple[float, float]] = None,
+                      scale: float = 1.0) -> np.ndarray:
+        offsets = np.zeros((frames, 2), dtype=np.float32) + self._center(center)
+        return _transform(MIDDLE_FINGER_HAND, np.zeros(frames, dtype=np.float32), offsets, scale)
+
+    def heart(self, frames: int, spacing: float = 0.0, center: Optional[Tuple[float, float]] = None,
+              scale: float = 1.0) -> np.ndarray:
+        """Two hands forming a heart; ``spacing`` (px) moves them apart horizontally.
+        Returns (frames, 2, 21, 2), left hand first."""
+        c = self._center(center) - np.array([0.0, 60.0 * scale], dtype=np.float32)
+        zeros = np.zeros(frames, dtype=np.float32)
+        left_off = np.zeros((frames, 2), dtype=np.float32) + c - np.array([spacing / 2, 0], dtype=np.float32)
+        right_off = np.zeros((frames, 2), dtype=np.float32) + c + np.array([spacing / 2, 0], dtype=np.float32)
+        right_template = HEART_LEFT_HAND * np.array([-1.0, 1.0], dtype=np.float32)
+        left = _transform(HEART_LEFT_HAND, zeros, left_off, scale)
+        right = _transform(right_template, zeros, right_off, scale)
+        return np.stack([left, right], axis=1)
+
+    def idle(self, frames: int, center: Optional[Tuple[float, float]] = None, scale: float = 1.0,
+             drift: float = 1.5, max_angle: float = 15.0) -> np.ndarray:
+        """Relaxed hand wandering with a random walk (``drift`` px/frame) and slow
+        random rotation."""
+        steps = self.rng.normal(0.0, drift, size=(frames, 2)).astype(np.float32)
+        offsets = np.cumsum(steps, axis=0) + self._center(center)
+        angles = np.clip(np.cumsum(self.rng.normal(0.0, 0.8, size=frames)), -max_angle, max_angle)
+        return _transform(RELAXED_HAND, angles.astype(np.float32), offsets, scale)
+
+    # --- scenes ---------------------------------------------------------------
+
+    @staticmethod
+    def track(gesture: str, **params: Any) -> HandTrack:
+        if gesture not in GESTURES:
+            raise ValueError(f"Unknown gesture {gesture!r}, expected one of {GESTURES}")
+        return HandTrack(gesture, params)
+
+    def scene(self, frames: int, tracks: List[HandTrack], noise: float = 0.0,
+              dropout: float = 0.0, dropout_len: int = 5, start_time: float = 0.0) -> LandmarkBatch:
+        """Stack ``tracks`` into one batch.
+
+        ``noise`` is the std-dev (px) of per-point Gaussian jitter; ``dropout`` is the
+        fraction of frames in which each hand is missing, in runs of about
+        ``dropout_len`` frames (like tracking losses).
+        """
+        columns: List[np.ndarray] = []
+        labels: List[str] = []
+        handedness: List[str] = []
+        for track in tracks:
+            pts = getattr(self, track.gesture)(frames, **track.params)
+            if pts.ndim == 3:
+                pts = pts[:, None]
+            for h in range(pts.shape[1]):
+                columns.append(pts[:, h])
+                labels.append(track.gesture)
+                handedness.append("Right" if track.gesture == "heart" and h == 1 else "Left")
+        if columns:
+            points = np.stack(columns, axis=1)
+        else:
+            points = np.zeros((frames, 0, 21, 2), dtype=np.float32)
+        if noise > 0 and points.size:
+            points = points + self.rng.normal(0.0, noise, size=points.shape).astype(np.float32)
+
+        valid = np.ones(points.shape[:2], dtype=bool)
+        if dropout > 0 and points.size:
+            run = max(1, int(dropout_len))
+            starts = self.rng.random(valid.shape) < (dropout / run)
+            # ogni inizio di dropout nasconde la mano per ``run`` frame
+            kernel = np.ones(run, dtype=np.int32)
+            hidden = np.apply_along_axis(lambda col: np.convolve(col, kernel)[:frames], 0, starts.astype(np.int32))
+            valid = hidden == 0
+
+        timestamps = start_time + np.arange(frames, dtype=np.float64) / self.fps
+        return LandmarkBatch(points.astype(np.float32), valid, timestamps, labels, handedness)
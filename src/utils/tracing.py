@@ -0,0 +1,152 @@
+"""
+Per-frame span tracing exported in Chrome trace / Perfetto JSON format.
+
+Usage on the hot path (no allocation at all while tracing is off)::
+
+    from src.utils.tracing import tracer
+    t0 = time.perf_counter()
+    ...
+    if tracer.enabled:
+        tracer.complete("tracker.process", t0, time.perf_counter(), seq)
+
+Tracing is started for a fixed window with ``tracer.start(path, seconds)``,
+from the environment (``TOPINI_TRACE=path``, ``TOPINI_TRACE_SECONDS``) or with
+F4 on the gesture page. The file opens in https://ui.perfetto.dev or
+chrome://tracing; spans carry the frame ``seq`` and flow arrows link the
+capture of a frame to its processing on the GUI thread.
+"""
+
+from __future__ import annotations
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+_FLOW_PHASES = {"out": "s", "step": "t", "in": "f"}
+
+
+class Tracer:
+    def __init__(self, max_events: int = 500_000) -> None:
+        self.enabled = False
+        self.max_events = max_events
+        self._events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._deadline = 0.0
+        self._path: Optional[str] = None
+        self._pid = os.getpid()
+
+    def start(self, path: str, duration_s: float = 10.0) -> None:
+        """Start recording; the trace is written to ``path`` after ``duration_s`` seconds."""
+        with self._lock:
+            self._events = []
+            self._threads = {}
+            self._path = path
+            self._deadline = time.perf_counter() + max(0.1, duration_s)
+            self.enabled = True
+
+    def stop(self, wait: bool = False) -> Optional[str]:
+        """Stop recording and write the trace file (in a background thread unless ``wait``).
+
+        Returns the path being written, or None if tracing was not active.
+        """
+        with self._lock:
+            if not self.enabled:
+                return None
+            self.enabled = False
+            events, threads, path = self._events, self._threads, self._path
+            self._events, self._threads = [], {}
+        if path is None:
+            return None
+        if wait:
+            self._write(path, events, threads)
+        else:
+            threading.Thread(target=self._write, args=(path, events, threads), daemon=True, name="trace-writer").start()
+        return path
+
+    def toggle(self, path: str, duration_s: float = 10.0) -> bool:
+        """Start tracing if idle, otherwise stop and write. Returns the new state."""
+        if self.enabled:
+            self.stop()
+            return False
+        self.start(path, duration_s)
+        return True
+
+    def configure_from_env(self) -> None:
+        path = os.environ.get("TOPINI_TRACE")
+        if path:
+            self.start(path, float(os.environ.get("TOPINI_TRACE_SECONDS", "10")))
+
+    def complete(self, name: str, start: float, end: float, seq: Optional[int] = None,
+                 flow: Optional[str] = None, cat: str = "pipeline") -> None:
+        """Record a span from two ``perf_counter()`` stamps.
+
+        ``flow`` is "out" on the span producing frame ``seq``, "step" on the
+        spans processing it and "in" on the span that finally presents it, so
+        viewers draw arrows across threads.
+        """
+        if not self.enabled:
+            return
+        if end >= self._deadline:
+            self.stop()
+            return
+        thread = threading.current_thread()
+        tid = thread.native_id or 0
+        ts = start * 1e6
+        event: Dict[str, Any] = {
+            "name": name, "cat": cat, "ph": "X", "ts": ts, "dur": (end - start) * 1e6,
+            "pid": self._pid, "tid": tid,
+        }
+        if seq is not None:
+            event["args"] = {"seq": seq}
+        with self._lock:
+            if len(self._events) >= self.max_events:
+                return
+            if tid not in self._threads:
+                self._threads[tid] = thread.name
+            self._events.append(event)
+            if flow is not None and seq is not None:
+                self._events.append({
+                    "name": "frame", "cat": "frame", "ph": _FLOW_PHASES[flow],
+                    "bp": "e", "id": seq, "ts": ts, "pid": self._pid, "tid": tid,
+                })
+
+    @contextmanager
+    def span(self, name: str, seq: Optional[int] = None, cat: str = "pipeline") -> Iterator[None]:
+        """Context manager variant of complete() for code off the per-frame path."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.complete(name, start, time.perf_counter(), seq, cat=cat)
+
+    def _write(self, path: str, events: List[Dict[str, Any]], threads: Dict[int, str]) -> None:
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        meta.append({"name": "process_name", "ph": "M", "pid": self._pid, "tid": 0, "args": {"name": "topini"}})
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump({"traceEvents": meta + events, "displayTimeUnit": "ms"}, fh)
+            print(f"Trace written: {path} ({len(events)} events)", file=sys.stderr)
+        except OSError as e:
+            print(f"Trace write error: {e}", file=sys.stderr)
+
+
+def default_trace_path() -> str:
+    directory = os.environ.get("TOPINI_TRACE_DIR", os.getcwd())
+    return os.path.join(directory, time.strftime("topini-trace-%Y%m%d-%H%M%S.json"))
+
+
+# tracer di processo condiviso da thread di cattura, GUI e inizializzazione
+tracer = Tracer()